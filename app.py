@@ -1,22 +1,34 @@
 import os
 import sys
-import certifi
-import pymongo
 import pandas as pd
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Dict, Literal, Optional
 
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
-from networksecurity.pipeline.training_pipeline import TrainingPipeline
-from networksecurity.utils.main_utils.utils import load_object
-from networksecurity.constants.training_pipeline import DATA_INGESTION_DATABASE_NAME, DATA_INGESTION_COLLECTION_NAME
-from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.constants.training_pipeline import (
+    DATA_INGESTION_DATABASE_NAME, DATA_INGESTION_COLLECTION_NAME,
+    MODEL_SERVING_BATCH_MAX_SIZE, MODEL_SERVING_BATCH_MAX_WAIT_MS, MODEL_SERVING_PREDICTION_CACHE_SIZE,
+    MODEL_SERVING_CSV_CHUNK_SIZE, MODEL_SERVING_HTML_PREVIEW_ROWS,
+    MODEL_SERVING_PREDICTION_OUTPUT_FILE_PATH, SCHEMA_FILE_PATH, TARGET_COLUMN)
+from networksecurity.utils.mongo_utils.client import get_mongo_client_factory
+from networksecurity.serving.model_registry import ModelRegistry
+from networksecurity.serving.prediction_batcher import PredictionBatcher
+from networksecurity.serving.drift_monitor import DriftMonitor
+from networksecurity.serving.training_jobs import TrainingJobManager, JOB_REJECTED
+from networksecurity.serving.csv_scoring import (
+    iter_scored_chunks, iter_csv, iter_ndjson, ChunkedPredictionWriter, check_csv, write_scored_chunks
+)
+from networksecurity.utils.main_utils.schema_validator import SchemaValidator, SchemaValidationError
 
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, UploadFile, File, Request
+from fastapi import FastAPI, UploadFile, File, Request, Body
 from uvicorn import run as app_run
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse, JSONResponse
 from starlette.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 
 templates = Jinja2Templates(directory="./templates")
@@ -24,17 +36,64 @@ templates = Jinja2Templates(directory="./templates")
 from dotenv import load_dotenv
 load_dotenv()
 
-# MongoDB Configuration
-mongo_db_url = os.getenv("MONGO_DB_URL")
-print(mongo_db_url)
+# MongoDB: one pooled client for the process, connected on first use so the api starts without the database
+mongo_client_factory = get_mongo_client_factory()
+
+
+def get_collection():
+    return mongo_client_factory.get_collection(DATA_INGESTION_DATABASE_NAME, DATA_INGESTION_COLLECTION_NAME)
+
+
+# Model loaded once and hot-swapped when final_models/ changes
+model_registry = ModelRegistry(
+    cache_size=int(os.getenv("PREDICTION_CACHE_SIZE", MODEL_SERVING_PREDICTION_CACHE_SIZE))
+)
+
+# Inputs are checked against the features of schema.yaml before the model runs
+schema_validator = SchemaValidator.from_schema_file(SCHEMA_FILE_PATH, exclude_columns=[TARGET_COLUMN])
+
+
+def schema_error_response(error: SchemaValidationError) -> JSONResponse:
+    return JSONResponse(status_code=422, content={"message": "Input does not match the schema", "errors": error.errors})
+
+
+# Scored rows are counted off the request path and compared against the model's training histogram
+drift_monitor = DriftMonitor(model_registry)
+
+# Single-row JSON predictions are micro-batched into one model call
+prediction_batcher = PredictionBatcher(
+    model_registry,
+    max_batch_size=int(os.getenv("PREDICT_BATCH_MAX_SIZE", MODEL_SERVING_BATCH_MAX_SIZE)),
+    max_wait_ms=float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", MODEL_SERVING_BATCH_MAX_WAIT_MS)),
+    drift_monitor=drift_monitor
+)
+
+# Training runs in a separate process, a finished job hot-swaps the served model.
+# With SERVING_ONLY=1 the training endpoints are disabled and nothing of training is ever imported
+serving_only = os.getenv("SERVING_ONLY", "0").lower() in ("1", "true", "yes")
+training_job_manager = None if serving_only else TrainingJobManager(on_success=lambda job: model_registry.reload())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        model_registry.reload()
+    except Exception as e:
+        logging.warning(f"Starting without a model: {e}")
+    model_registry.start_watcher()
+    drift_monitor.start()
+    await prediction_batcher.start()
+    yield
+    await prediction_batcher.stop()
+    drift_monitor.stop()
+    model_registry.stop_watcher()
+    if training_job_manager is not None:
+        training_job_manager.shutdown()
+    mongo_client_factory.close()
 
-ca = certifi.where()
-client = pymongo.MongoClient(mongo_db_url, tlsCAFile=ca)
-database = client[DATA_INGESTION_DATABASE_NAME]
-collection = database[DATA_INGESTION_COLLECTION_NAME]
 
 # FastAPI Application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 origins = ["*"]
 
 app.add_middleware(
@@ -49,39 +108,147 @@ app.add_middleware(
 async def index():
     return RedirectResponse(url="/docs")
 
+def training_disabled_response() -> JSONResponse:
+    return JSONResponse(status_code=403, content={"message": "Training is disabled, the api runs with SERVING_ONLY"})
+
+
 @app.get("/train")
 async def train():
     try:
-        training_pipeline = TrainingPipeline()
-        training_pipeline.run_pipeline()
-        return Response("Training successful..")
+        if training_job_manager is None:
+            return training_disabled_response()
+
+        job, created = training_job_manager.submit()
+        if not created:
+            return JSONResponse(status_code=409, content={
+                "message": "A training job is already running",
+                "job_id": job.job_id,
+                "status": job.status
+            })
+        return JSONResponse(status_code=202, content={"job_id": job.job_id, "status": job.status})
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+@app.get("/train/{job_id}")
+async def train_status(job_id: str):
+    if training_job_manager is None:
+        return training_disabled_response()
+
+    job = training_job_manager.get_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"message": f"Unknown training job: {job_id}"})
+    return asdict(job)
+
+
+@app.get("/train/{job_id}/result")
+async def train_result(job_id: str):
+    if training_job_manager is None:
+        return training_disabled_response()
+
+    job = training_job_manager.get_job(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"message": f"Unknown training job: {job_id}"})
+    if not job.finished:
+        return JSONResponse(status_code=409, content={"message": "Training job has not finished",
+                                                      "status": job.status, "stage": job.stage})
+    if job.error is not None:
+        status_code = 409 if job.status == JOB_REJECTED else 500
+        return JSONResponse(status_code=status_code, content={"status": job.status, "error": job.error})
+    return job.result
+
+
+@app.get("/health/db")
+async def database_health():
+    ## pings from a worker thread, server selection can block for its whole timeout
+    health = await run_in_threadpool(mongo_client_factory.health_check)
+    health["client"] = mongo_client_factory.metrics()
+    return JSONResponse(status_code=200 if health["status"] == "ok" else 503, content=health)
+
+
+@app.post("/reload")
+async def reload_model():
+    try:
+        ## unpickling and mapping a bundle blocks, keep the event loop serving meanwhile
+        await run_in_threadpool(model_registry.reload)
+        return model_registry.status()
     except Exception as e:
         raise NetworkSecurityException(e, sys)
-    
+
+
+@app.get("/model")
+async def model_status():
+    return model_registry.status()
+
+
+@app.get("/drift")
+async def drift():
+    ## the kolmogorov p-values can take a while for strongly drifted columns
+    report = await run_in_threadpool(drift_monitor.report)
+    if report is None:
+        return JSONResponse(status_code=404, content={"message": "The served model has no baseline histogram"})
+    return report
+
+
+@app.post("/predict/json")
+async def predict_json(features: Dict[str, Optional[float]] = Body(...)):
+    try:
+        schema_validator.check_record(features)
+        prediction = await prediction_batcher.predict(features)
+        return {"prediction": prediction}
+    except SchemaValidationError as e:
+        return schema_error_response(e)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+@app.get("/predict/json/stats")
+async def predict_json_stats():
+    return prediction_batcher.stats()
+
 
 @app.post("/predict")
 async def predict(request:Request, file:UploadFile=File(...)):
     try:
-        df = pd.read_csv(file.file)
+        network_model = model_registry.get_model()
+        await run_in_threadpool(check_csv, file.file, schema_validator, MODEL_SERVING_CSV_CHUNK_SIZE)
+
+        ## score in chunks so the upload never has to fit in memory, only a preview is rendered.
+        ## scoring and writing run in a worker thread, the event loop keeps serving meanwhile
+        writer = ChunkedPredictionWriter(MODEL_SERVING_PREDICTION_OUTPUT_FILE_PATH, MODEL_SERVING_HTML_PREVIEW_ROWS)
+        await run_in_threadpool(write_scored_chunks, network_model, file.file, writer,
+                                MODEL_SERVING_CSV_CHUNK_SIZE, drift_monitor)
 
-        preprocessor = load_object("final_models/preprocessor.pkl")
-        model = load_object("final_models/model.pkl")
+        table_html = writer.preview().to_html(classes="table table-striped")
 
-        network_model = NetworkModel(preprocessor=preprocessor, model=model)
-        print(df.iloc[0])
+        return templates.TemplateResponse("table.html", {"request": request, "table": table_html,
+                                                         "preview_rows": len(writer.preview()),
+                                                         "total_rows": writer.total_rows})
 
-        y_pred = network_model.predict(df)
-        print(y_pred)
+    except SchemaValidationError as e:
+        return schema_error_response(e)
 
-        df["predicted_column"] = y_pred
-        print(df["predicted_column"])
-        df.to_csv("predicted_output/output.csv")
+    except Exception as e:
+        raise NetworkSecurityException(e,sys)
 
-        table_html = df.to_html(classes="table table-striped")
 
-        return templates.TemplateResponse("table.html", {"request": request, "table": table_html} )
+@app.post("/predict/stream")
+async def predict_stream(file:UploadFile=File(...), format: Literal["csv", "ndjson"] = "csv",
+                         chunksize: int = MODEL_SERVING_CSV_CHUNK_SIZE):
+    ## any other format is rejected by FastAPI with a 422 before the upload is read
+    try:
+        network_model = model_registry.get_model()
+        ## the whole upload is checked first, a stream cannot report an error once it has started
+        await run_in_threadpool(check_csv, file.file, schema_validator, chunksize)
+        chunks = iter_scored_chunks(network_model, file.file, chunksize=chunksize, drift_monitor=drift_monitor)
 
+        if format == "ndjson":
+            return StreamingResponse(iter_ndjson(chunks), media_type="application/x-ndjson")
+        return StreamingResponse(iter_csv(chunks), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=predictions.csv"})
 
+    except SchemaValidationError as e:
+        return schema_error_response(e)
 
     except Exception as e:
         raise NetworkSecurityException(e,sys)
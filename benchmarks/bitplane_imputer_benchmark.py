@@ -0,0 +1,61 @@
+"""
+    Scaling of KNN imputation at training time: KNNImputer against BitPlaneKNNImputer, the
+    step of the data transformation pipeline, on growing tables resampled from the phishing
+    data with a share of the values removed. Reports fit_transform seconds, the peak memory
+    numpy allocated while it ran, and that both give the same imputed values. KNNImputer is
+    quadratic in the rows, so it is only run up to SKLEARN_MAX_ROWS.
+
+    Run from the repository root:  python benchmarks/bitplane_imputer_benchmark.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import TARGET_COLUMN, DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.utils.ml_utils.model.bitplane_imputer import BitPlaneKNNImputer
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+ROW_COUNTS = [2500, 5000, 10000, 20000, 40000, 80000]
+MISSING_RATE = 0.01
+SKLEARN_MAX_ROWS = 20000
+
+
+def run(imputer, X: pd.DataFrame) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    imputed = imputer.fit_transform(X)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20, imputed
+
+
+if __name__ == "__main__":
+    features = pd.read_csv(DATA_FILE_PATH).drop(columns=[TARGET_COLUMN]).astype(float)
+    rng = np.random.default_rng(0)
+    print(f"{MISSING_RATE:.0%} of the values missing, n_neighbors={DATA_TRANSFORMATION_IMPUTER_PARAMS['n_neighbors']}, "
+          f"{os.cpu_count()} cpus")
+    print(f"{'rows':>7} {'imputer':>20} {'seconds':>8} {'peak MB':>8} {'same output':>12}")
+
+    for n_rows in ROW_COUNTS:
+        X = features.sample(n_rows, replace=True, random_state=n_rows).reset_index(drop=True)
+        X = X.mask(rng.random(X.shape) < MISSING_RATE)
+
+        reference = None
+        if n_rows <= SKLEARN_MAX_ROWS:
+            seconds, peak, reference = run(KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS), X)
+            print(f"{n_rows:>7} {'KNNImputer':>20} {seconds:>8.2f} {peak:>8.0f} {'':>12}")
+
+        for n_jobs in (1, -1):
+            seconds, peak, imputed = run(BitPlaneKNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS, n_jobs=n_jobs), X)
+            same = "" if reference is None else str(np.array_equal(imputed, reference))
+            print(f"{n_rows:>7} {f'bit-plane n_jobs={n_jobs}':>20} {seconds:>8.2f} {peak:>8.0f} {same:>12}")
@@ -0,0 +1,113 @@
+"""
+    Loading Network_Data/phisingData.csv into MongoDB: the old json conversion with one
+    insert_many against the streaming bulk loader with 1, 2 and 4 concurrent inserts.
+    Reports docs/s, the peak memory traced while loading, and that every row arrived once.
+
+    Runs against an in-process stand-in that BSON-encodes every document, as the driver does,
+    and charges each insert_many a round trip plus its bytes over one connection. Set
+    BENCHMARK_MONGO_DB_URL to run against a real server instead (the benchmark writes to, and
+    drops, benchmark.NetworkData there).
+    Run from the repository root:  python benchmarks/bulk_load_benchmark.py
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import tracemalloc
+
+import bson
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import DATA_INGESTION_BULK_LOAD_CHUNK_SIZE
+from networksecurity.utils.mongo_utils.bulk_loader import bulk_load_csv
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+N_COPIES = 10
+WORKER_COUNTS = [1, 2, 4]
+## modelled network: round trip per insert_many and bandwidth of one connection
+ROUND_TRIP_SECONDS = 0.005
+CONNECTION_MB_PER_SECOND = 50.0
+
+
+class BsonCollection:
+    name = "NetworkData"
+
+    def __init__(self):
+        self._ids = set()
+
+    def insert_many(self, documents: list, ordered: bool = True):
+        raw_documents = [bson.encode(document) for document in documents]
+        ## sleeping releases the GIL, as waiting on a socket does
+        time.sleep(ROUND_TRIP_SECONDS + sum(map(len, raw_documents)) / (CONNECTION_MB_PER_SECOND * 2**20))
+        self._ids.update(document.get("_id", id(document)) for document in documents)
+
+    def count_documents(self, query: dict) -> int:
+        return len(self._ids)
+
+    def drop(self):
+        self._ids = set()
+
+
+def json_load(collection, file_path: str):
+    ## what push_data.py did before
+    data = pd.read_csv(file_path)
+    data.reset_index(drop=True, inplace=True)
+    records = list(json.loads(data.T.to_json()).values())
+    collection.insert_many(records)
+
+
+def measure(load, collection) -> tuple:
+    collection.drop()
+    start = time.perf_counter()
+    load()
+    seconds = time.perf_counter() - start
+    documents = collection.count_documents({})
+
+    collection.drop()
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return documents, seconds, peak
+
+
+if __name__ == "__main__":
+    work_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(work_dir, "phisingData.csv")
+        df = pd.read_csv(DATA_FILE_PATH)
+        pd.concat([df] * N_COPIES, ignore_index=True).to_csv(file_path, index=False)
+        n_rows = len(df) * N_COPIES
+
+        mongo_db_url = os.getenv("BENCHMARK_MONGO_DB_URL")
+        if mongo_db_url:
+            import pymongo
+            collection = pymongo.MongoClient(mongo_db_url)["benchmark"]["NetworkData"]
+        else:
+            collection = BsonCollection()
+
+        loads = {"json + insert_many": lambda: json_load(collection, file_path)}
+        for max_workers in WORKER_COUNTS:
+            def bulk_load(max_workers=max_workers):
+                checkpoint_file_path = os.path.join(work_dir, "checkpoint.yaml")
+                if os.path.exists(checkpoint_file_path):
+                    os.remove(checkpoint_file_path)
+                bulk_load_csv(collection, file_path, checkpoint_file_path,
+                              chunk_size=DATA_INGESTION_BULK_LOAD_CHUNK_SIZE, max_workers=max_workers)
+            loads[f"bulk, {max_workers} workers"] = bulk_load
+
+        print(f"{n_rows} rows, chunks of {DATA_INGESTION_BULK_LOAD_CHUNK_SIZE}")
+        print(f"{'load':>20} {'seconds':>8} {'docs/s':>8} {'peak MB':>8}  all rows once")
+        for name, load in loads.items():
+            documents, seconds, peak = measure(load, collection)
+            print(f"{name:>20} {seconds:>8.2f} {n_rows / seconds:>8.0f} {peak / 2**20:>8.1f}  {documents == n_rows}")
+        collection.drop()
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
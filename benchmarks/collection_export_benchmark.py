@@ -0,0 +1,154 @@
+"""
+    Exporting the NetworkData collection into a DataFrame: the old list(find()) export against
+    the streaming export into typed column arrays. Reports rows/s and the peak memory traced
+    while exporting, and checks both give the same values.
+
+    Runs against an in-process BSON stand-in and mongomock, or against a real server when
+    BENCHMARK_MONGO_DB_URL is set (the benchmark writes to, and drops, benchmark.NetworkData there).
+    mongomock is not in requirements.txt; without it that run is skipped (pip install mongomock).
+    Run from the repository root:  python benchmarks/collection_export_benchmark.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import bson
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import (
+    SCHEMA_FILE_PATH,
+    DATA_INGESTION_EXPORT_BATCH_SIZE,
+    DATA_INGESTION_NA_VALUES
+)
+from networksecurity.utils.main_utils.utils import read_yaml_file
+from networksecurity.utils.mongo_utils.collection_export import schema_column_dtypes, export_collection
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+N_ROWS = 55275
+NA_RATE = 0.01
+
+
+class BsonCursor:
+    def __init__(self, raw_documents: list, drop_id: bool):
+        self._documents = (self._decode(raw, drop_id) for raw in raw_documents)
+
+    @staticmethod
+    def _decode(raw: bytes, drop_id: bool) -> dict:
+        document = bson.decode(raw)
+        if drop_id:
+            del document["_id"]
+        return document
+
+    def __iter__(self):
+        return self._documents
+
+    def close(self):
+        self._documents.close()
+
+
+class BsonCollection:
+    """
+    Stand-in for a server collection: documents are kept as BSON and decoded one by one
+    while iterating, which is the per-document work a pymongo cursor does.
+    mongomock copies and filters every document in Python, which hides the export itself.
+    """
+
+    name = "NetworkData"
+
+    def __init__(self):
+        self._raw_documents = []
+
+    def insert_many(self, documents: list):
+        self._raw_documents.extend(bson.encode({"_id": bson.ObjectId(), **document}) for document in documents)
+
+    def estimated_document_count(self) -> int:
+        return len(self._raw_documents)
+
+    def find(self, query: dict = None, projection: dict = None, batch_size: int = 0) -> BsonCursor:
+        return BsonCursor(self._raw_documents, drop_id=bool(projection) and projection.get("_id") == 0)
+
+    def drop(self):
+        self._raw_documents = []
+
+
+def get_collections() -> dict:
+    mongo_db_url = os.getenv("BENCHMARK_MONGO_DB_URL")
+    if mongo_db_url:
+        import pymongo
+        client = pymongo.MongoClient(mongo_db_url)
+        collections = {"mongod": client["benchmark"]["NetworkData"]}
+    else:
+        collections = {"bson": BsonCollection()}
+        try:
+            import mongomock
+            collections["mongomock"] = mongomock.MongoClient()["benchmark"]["NetworkData"]
+        except ImportError:
+            print("mongomock is not installed, skipping the mongomock run (pip install mongomock)")
+    for collection in collections.values():
+        collection.drop()
+    return collections
+
+
+def make_documents() -> list:
+    df = pd.read_csv(DATA_FILE_PATH)
+    df = pd.concat([df] * (N_ROWS // len(df) + 1), ignore_index=True).head(N_ROWS).astype(object)
+    rng = np.random.default_rng(0)
+    df = df.mask(rng.random(df.shape) < NA_RATE, "na")
+    ## plain ints, as documents decoded from BSON hold
+    return [{key: value if value == "na" else int(value) for key, value in document.items()}
+            for document in df.to_dict(orient="records")]
+
+
+def list_export(collection) -> pd.DataFrame:
+    ## what DataIngestion did before
+    df = pd.DataFrame(list(collection.find()))
+    if "_id" in df.columns.to_list():
+        df = df.drop(columns=["_id"])
+    df.replace({"na": np.nan}, inplace=True)
+    return df
+
+
+def streaming_export(collection) -> pd.DataFrame:
+    column_dtypes = schema_column_dtypes(read_yaml_file(SCHEMA_FILE_PATH))
+    return export_collection(collection, column_dtypes, batch_size=DATA_INGESTION_EXPORT_BATCH_SIZE,
+                             na_values=DATA_INGESTION_NA_VALUES).to_dataframe()
+
+
+def measure(export, collection) -> tuple:
+    start = time.perf_counter()
+    df = export(collection)
+    seconds = time.perf_counter() - start
+
+    ## tracing slows the export down, so memory gets a run of its own
+    tracemalloc.start()
+    export(collection)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, seconds, peak
+
+
+if __name__ == "__main__":
+    documents = make_documents()
+
+    print(f"{N_ROWS} documents, {NA_RATE:.0%} of the values are \"na\"")
+    print(f"{'source':>10} {'export':>10} {'seconds':>8} {'rows/s':>10} {'peak MB':>8} {'frame MB':>9}  identical")
+    for source, collection in get_collections().items():
+        collection.insert_many([dict(document) for document in documents])
+        frames = {}
+        for name, export in (("list", list_export), ("streaming", streaming_export)):
+            df, seconds, peak = measure(export, collection)
+            frames[name] = df
+            same = name == "list" or (
+                frames["list"].columns.equals(df.columns)
+                and np.array_equal(frames["list"].to_numpy(dtype=np.float64), df.to_numpy(dtype=np.float64),
+                                   equal_nan=True)
+            )
+            print(f"{source:>10} {name:>10} {seconds:>8.2f} {len(df) / seconds:>10.0f} {peak / 2**20:>8.1f} "
+                  f"{df.memory_usage(deep=True).sum() / 2**20:>9.1f}  {same}")
+        collection.drop()
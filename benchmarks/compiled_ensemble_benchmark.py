@@ -0,0 +1,61 @@
+"""
+    Throughput of the compiled tree ensemble against sklearn predict.
+
+    Run from the repository root:  python benchmarks/compiled_ensemble_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import TARGET_COLUMN
+from networksecurity.utils.ml_utils.model.compiled_ensemble import CompiledTreeEnsemble
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+BATCH_SIZES = [1, 64, 512, 4096]
+MIN_SECONDS = 1.0
+
+
+def rows_per_second(predict, X) -> float:
+    predict(X)
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        predict(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return calls * len(X) / elapsed
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH)
+    X = df.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=np.float64)
+    y = df[TARGET_COLUMN].replace(-1, 0).to_numpy(dtype=np.float64)
+
+    models = {
+        "Random Forest (128 trees)": RandomForestClassifier(n_estimators=128, random_state=42),
+        "Gradient Boost (256 stages)": GradientBoostingClassifier(n_estimators=256, subsample=0.8, random_state=42)
+    }
+
+    for name, model in models.items():
+        model.fit(X, y)
+        compiled_model = CompiledTreeEnsemble.from_estimator(model)
+
+        mismatches = int((compiled_model.predict(X) != model.predict(X)).sum())
+        print(f"\n{name}: {compiled_model.n_trees} trees, {len(compiled_model.feature)} nodes, "
+              f"{mismatches} mismatching predictions")
+        print(f"{'batch':>8} {'sklearn rows/s':>16} {'compiled rows/s':>16} {'speedup':>8}")
+
+        for batch_size in BATCH_SIZES + [len(X)]:
+            batch = X[:batch_size]
+            sklearn_rate = rows_per_second(model.predict, batch)
+            compiled_rate = rows_per_second(compiled_model.predict, batch)
+            print(f"{batch_size:>8} {sklearn_rate:>16.0f} {compiled_rate:>16.0f} {compiled_rate / sklearn_rate:>7.1f}x")
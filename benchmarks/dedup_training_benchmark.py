@@ -0,0 +1,74 @@
+"""
+    Training on every row against training on deduplicated rows weighted by their counts.
+    Reports how much smaller the data gets, and per model the fit time (grid search included)
+    and f1 / accuracy on the full, not deduplicated, test split.
+
+    Run from the repository root:  python benchmarks/dedup_training_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.impute import KNNImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import TARGET_COLUMN, DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.utils.main_utils.utils import deduplicate_rows
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+
+MODELS = {
+    "Random Forest": (RandomForestClassifier(random_state=0), {"n_estimators": [32, 64, 128]}),
+    "Gradient Boost": (GradientBoostingClassifier(random_state=0), {"n_estimators": [32, 64, 128]}),
+    "Logistic Regression": (LogisticRegression(max_iter=1000), {})
+}
+
+
+def split_xy(df: pd.DataFrame) -> tuple:
+    return df.drop(columns=[TARGET_COLUMN]), df[TARGET_COLUMN].replace(-1, 0)
+
+
+def fit(model, params: dict, X, y, sample_weight=None) -> float:
+    fit_params = {} if sample_weight is None else {"sample_weight": sample_weight}
+    start = time.perf_counter()
+    gs = GridSearchCV(model, params, cv=3).fit(X, y, **fit_params)
+    model.set_params(**gs.best_params_)
+    model.fit(X, y, **fit_params)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH)
+    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42)
+    unique_train_df, train_weight = deduplicate_rows(train_df)
+    print(f"train rows {len(train_df)} -> {len(unique_train_df)} unique "
+          f"({len(unique_train_df) / len(train_df):.1%}), largest count {int(train_weight.max())}")
+
+    X_train, y_train = split_xy(train_df)
+    X_unique, y_unique = split_xy(unique_train_df)
+    X_test, y_test = split_xy(test_df)
+
+    preprocessors = {}
+    for name, X in (("all rows", X_train), ("deduplicated", X_unique)):
+        start = time.perf_counter()
+        preprocessors[name] = Pipeline([("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]).fit(X)
+        print(f"imputer fit on {name}: {time.perf_counter() - start:.3f}s")
+
+    print(f"{'model':>20} {'data':>13} {'fit s':>7} {'test f1':>8} {'test acc':>9}")
+    for model_name, (model, params) in MODELS.items():
+        for name, X, y, weight in (("all rows", X_train, y_train, None),
+                                   ("deduplicated", X_unique, y_unique, train_weight)):
+            preprocessor = preprocessors[name]
+            seconds = fit(model, params, preprocessor.transform(X), y, weight)
+            y_pred = model.predict(preprocessor.transform(X_test))
+            print(f"{model_name:>20} {name:>13} {seconds:>7.2f} {f1_score(y_test, y_pred):>8.4f} "
+                  f"{accuracy_score(y_test, y_pred):>9.4f}")
@@ -0,0 +1,63 @@
+"""
+    Cost of live drift monitoring: what DriftMonitor.record adds to a scored batch, how many
+    rows per second the background aggregation counts, for JSON micro-batches of feature dicts
+    and for csv upload chunks, and how long a /drift report takes. The JSON batches repeat the
+    same 64 rows, so every window drifts strongly and the report pays for kstwo's far tail.
+
+    Run from the repository root:  python benchmarks/drift_monitor_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import TARGET_COLUMN, MODEL_SERVING_BATCH_MAX_SIZE, MODEL_SERVING_CSV_CHUNK_SIZE
+from networksecurity.serving.drift_monitor import DriftMonitor
+from networksecurity.utils.ml_utils.metric.drift_metric import get_value_histogram
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+N_RECORDS = 100000
+
+
+class StaticRegistry:
+    def __init__(self, baseline_histogram: dict):
+        self.baseline_histogram = baseline_histogram
+
+    def get_baseline_histogram(self) -> tuple:
+        return 1, self.baseline_histogram
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH)
+    features = df.drop(columns=[TARGET_COLUMN])
+    monitor = DriftMonitor(StaticRegistry(get_value_histogram(features)), max_pending_batches=N_RECORDS)
+
+    json_batch = features.head(MODEL_SERVING_BATCH_MAX_SIZE).astype(float).to_dict(orient="records")
+    csv_chunk = pd.concat([features] * (MODEL_SERVING_CSV_CHUNK_SIZE // len(features) + 1),
+                          ignore_index=True).head(MODEL_SERVING_CSV_CHUNK_SIZE)
+
+    start = time.perf_counter()
+    for _ in range(N_RECORDS):
+        monitor.record(json_batch)
+    record_seconds = time.perf_counter() - start
+    monitor._pending.clear()
+    print(f"record: {record_seconds / N_RECORDS * 1e9:.0f} ns per scored batch")
+
+    for name, batch, n_batches in (("json batches of %d" % len(json_batch), json_batch, 2000),
+                                   ("csv chunks of %d" % len(csv_chunk), csv_chunk, 20)):
+        for _ in range(n_batches):
+            monitor.record(batch)
+        start = time.perf_counter()
+        monitor.flush()
+        seconds = time.perf_counter() - start
+        print(f"aggregate {name}: {n_batches * len(batch) / seconds:,.0f} rows/s")
+
+    start = time.perf_counter()
+    report = monitor.report()
+    print(f"report over {report['rows_counted']} rows and {len(report['windows'])} windows: "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,58 @@
+"""
+    Latency of the serving fast imputer against the fitted KNNImputer pipeline.
+
+    Run from the repository root:  python benchmarks/fast_imputer_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import TARGET_COLUMN, DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.utils.ml_utils.model.fast_imputer import FastKNNImputer
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+BATCH_SIZES = [1, 64, 1000]
+MISSING_RATES = [0.0, 0.01, 0.05, 0.3]
+MIN_SECONDS = 1.0
+
+
+def milliseconds_per_call(transform, X) -> float:
+    transform(X)
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        transform(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / calls * 1000
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH).drop(columns=[TARGET_COLUMN]).astype(np.float64)
+    train_df = df.sample(frac=0.8, random_state=42)
+    test_df = df.drop(train_df.index)
+
+    preprocessor = Pipeline([("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]).fit(train_df)
+    fast_imputer = FastKNNImputer(preprocessor)
+    rng = np.random.default_rng(42)
+
+    print(f"{'batch':>6} {'missing':>8} {'sklearn ms':>11} {'fast ms':>9} {'speedup':>8} {'identical':>10}")
+    for batch_size in BATCH_SIZES:
+        batch = test_df.sample(batch_size, random_state=batch_size)
+        for missing_rate in MISSING_RATES:
+            X = batch.mask(rng.random(batch.shape) < missing_rate)
+            identical = np.array_equal(preprocessor.transform(X), fast_imputer.transform(X))
+            sklearn_ms = milliseconds_per_call(preprocessor.transform, X)
+            fast_ms = milliseconds_per_call(fast_imputer.transform, X)
+            print(f"{batch_size:>6} {missing_rate:>8.2f} {sklearn_ms:>11.2f} {fast_ms:>9.2f} "
+                  f"{sklearn_ms / fast_ms:>7.1f}x {str(identical):>10}")
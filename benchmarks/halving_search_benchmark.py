@@ -0,0 +1,99 @@
+"""
+    The model search of ModelTrainer over its full grids, on the deduplicated training split of
+    the phishing data: grid_search_models, which fits every candidate to completion, against
+    halving_search_models with no budget and with compute and time budgets. Reports seconds,
+    fits, and work in full fits (a fit on a third of the rows or with a third of the estimators
+    counts as a third). For every model, it prints where the halving pick ranks in the full
+    grid and the gap between its mean cv score and the grid's best, plus the test accuracy of
+    both picks. The estimators are seeded, so both searches score the same candidates alike.
+
+    Run from the repository root:  python benchmarks/halving_search_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import ParameterGrid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import (
+    TARGET_COLUMN, DATA_INGESTION_TRAIN_TEST_SPLIT_RATION, MODEL_TRAINER_SEARCH_CV_FOLDS
+)
+from networksecurity.components.model_trainer import ModelTrainer
+from networksecurity.utils.main_utils.utils import hash_split, deduplicate_rows
+from networksecurity.utils.ml_utils.model.model_search import (
+    grid_search_models, halving_search_models, compare_search_results
+)
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+## (label, halving_search_models keyword arguments)
+BUDGETS = [("no budget", {}), ("budget 30 full fits", {"budget_fits": 30}), ("budget 20 seconds", {"budget_seconds": 20})]
+
+
+def seeded_models() -> tuple:
+    models, params = ModelTrainer.get_models_and_params()
+    for model in models.values():
+        model.set_params(**{name: value for name, value in (("verbose", 0), ("random_state", 0))
+                            if name in model.get_params()})
+    return models, params
+
+
+def split(df: pd.DataFrame) -> tuple:
+    X = df.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=np.int8)
+    y = df[TARGET_COLUMN].replace(-1, 0).to_numpy(dtype=np.float64)
+    return X, y
+
+
+def grid_full_fits(params: dict) -> float:
+    ## the cross validation work of the full grid in the units halving_search_models counts
+    full_fits = 0.0
+    for grid in params.values():
+        max_estimators = max(grid.get("n_estimators", [1]))
+        full_fits += sum(candidate.get("n_estimators", max_estimators) / max_estimators
+                         for candidate in ParameterGrid(grid)) * MODEL_TRAINER_SEARCH_CV_FOLDS
+    return full_fits
+
+
+def run(search, models: dict, params: dict, X, y, sample_weight, **kwargs) -> tuple:
+    stats = {}
+    start = time.perf_counter()
+    results = search(models, params, X, y, sample_weight=sample_weight, scheduler_stats=stats, **kwargs)
+    return results, stats, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH)
+    train_df, test_df = hash_split(df, DATA_INGESTION_TRAIN_TEST_SPLIT_RATION,
+                                   key_columns=[column for column in df.columns if column != TARGET_COLUMN])
+    train_df, sample_weight = deduplicate_rows(train_df)
+    (X, y), (X_test, y_test) = split(train_df), split(test_df)
+    models, params = seeded_models()
+    print(f"{len(X)} deduplicated training rows, {len(X_test)} test rows, {os.cpu_count()} cpus")
+
+    grid_results, grid_stats, grid_seconds = run(grid_search_models, models, params, X, y, sample_weight)
+    print(f"\n{'search':>28} {'seconds':>8} {'fits':>5} {'full fits':>10} {'speedup':>8}")
+    print(f"{'full grid':>28} {grid_seconds:>8.1f} {grid_stats['fits']:>5} {grid_full_fits(params):>10.1f} {1.0:>8.2f}")
+
+    halving_runs = []
+    for label, budget in BUDGETS:
+        results, stats, seconds = run(halving_search_models, models, params, X, y, sample_weight, **budget)
+        halving_runs.append((label, results))
+        print(f"{f'halving, {label}':>28} {seconds:>8.1f} {stats['fits']:>5} {stats['full_fits']:>10.1f} "
+              f"{grid_seconds / seconds:>8.2f}")
+
+    for label, results in halving_runs:
+        print(f"\nhalving, {label}")
+        print(f"{'model':>26} {'rank in grid':>13} {'cv score':>9} {'grid best':>10} {'gap':>8} "
+              f"{'test acc':>9} {'grid test acc':>14}")
+        comparison = compare_search_results(results, grid_results)
+        for model_name, row in comparison.items():
+            test_accuracy = results[model_name].best_estimator.score(X_test, y_test)
+            grid_test_accuracy = grid_results[model_name].best_estimator.score(X_test, y_test)
+            rank = f"{row['rank']}/{len(grid_results[model_name].candidate_params)}"
+            print(f"{model_name:>26} {rank:>13} {row['score']:>9.4f} {row['best_score']:>10.4f} "
+                  f"{row['score'] - row['best_score']:>+8.4f} {test_accuracy:>9.4f} {grid_test_accuracy:>14.4f}")
@@ -0,0 +1,99 @@
+"""
+    Cold-start time of the served model: pickles against a model bundle.
+
+    Every load runs in a fresh interpreter, after the imports, and ends with the first
+    prediction so lazily mapped pages are counted. Files are in the page cache.
+
+    Run from the repository root:  python benchmarks/model_bundle_load_benchmark.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import (
+    TARGET_COLUMN,
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    MODEL_FILE_NAME,
+    PREPROCESSING_OBJECT_FILE_NAME
+)
+from networksecurity.utils.main_utils.utils import save_object, load_object
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.model_bundle import ModelBundle, save_model_bundle
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+N_ESTIMATORS = 128
+REPEATS = 5
+
+LOAD_MODES = {
+    "pickle, sklearn only": "pickle",
+    "pickle + compile": "pickle_compiled",
+    "bundle, read into memory": "bundle",
+    "bundle, memory-mapped": "bundle_mmap"
+}
+
+
+def load(mode: str, model_dir: str) -> NetworkModel:
+    if mode.startswith("pickle"):
+        network_model = NetworkModel(
+            preprocessor=load_object(os.path.join(model_dir, PREPROCESSING_OBJECT_FILE_NAME)),
+            model=load_object(os.path.join(model_dir, MODEL_FILE_NAME))
+        )
+        if mode == "pickle_compiled":
+            network_model.compile()
+            network_model.compile_imputer()
+        return network_model
+
+    mmap_mode = "r" if mode == "bundle_mmap" else None
+    return ModelBundle(os.path.join(model_dir, "bundle"), mmap_mode=mmap_mode).load_network_model()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--load":
+        X = pd.read_csv(DATA_FILE_PATH).drop(columns=[TARGET_COLUMN]).head(1)
+        start = time.perf_counter()
+        load(sys.argv[2], sys.argv[3]).predict(X)
+        ## last line of the output, load_object prints the files it opens
+        print(time.perf_counter() - start)
+        sys.exit(0)
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        df = pd.read_csv(DATA_FILE_PATH)
+        X = df.drop(columns=[TARGET_COLUMN])
+        y = df[TARGET_COLUMN].replace(-1, 0)
+
+        preprocessor = Pipeline([("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]).fit(X)
+        model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=42).fit(preprocessor.transform(X), y)
+        save_object(os.path.join(work_dir, PREPROCESSING_OBJECT_FILE_NAME), preprocessor)
+        save_object(os.path.join(work_dir, MODEL_FILE_NAME), model)
+
+        network_model = NetworkModel(preprocessor=preprocessor, model=model)
+        network_model.compile()
+        network_model.compile_imputer()
+        save_model_bundle(os.path.join(work_dir, "bundle"), network_model)
+
+        print(f"Random forest with {N_ESTIMATORS} trees, seconds from load to first prediction")
+        print(f"{'load':>26} {'median':>8} {'min':>8}")
+        for name, mode in LOAD_MODES.items():
+            timings = [
+                float(subprocess.run([sys.executable, os.path.abspath(__file__), "--load", mode, work_dir],
+                                     check=True, capture_output=True, text=True).stdout.split()[-1])
+                for _ in range(REPEATS)
+            ]
+            print(f"{name:>26} {np.median(timings):>8.3f} {np.min(timings):>8.3f}")
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,85 @@
+"""
+    Wall clock of the model search of ModelTrainer over its full grids, on the deduplicated
+    training split of the phishing data: the old loop of one GridSearchCV after another
+    followed by a second refit of each best model, against the SearchScheduler running every
+    (model, params, fold) fit on one process pool with 1, 2, 4, ... processes up to the cpu
+    count. Reports seconds, the speedup over the old loop and how busy the processes were,
+    and whether the best params agree (the forests and boosting are unseeded, so close
+    candidates may swap). From the fit seconds of the first run it also projects the wall
+    clock on more cores: no less than the fitting spread evenly, nor than the longest fit.
+
+    Run from the repository root:  python benchmarks/model_search_scaling_benchmark.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import GridSearchCV
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import TARGET_COLUMN, DATA_INGESTION_TRAIN_TEST_SPLIT_RATION
+from networksecurity.components.model_trainer import ModelTrainer
+from networksecurity.utils.main_utils.utils import hash_split, deduplicate_rows
+from networksecurity.utils.ml_utils.model.model_search import grid_search_models
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+
+
+def quiet_models() -> tuple:
+    models, params = ModelTrainer.get_models_and_params()
+    return {name: model.set_params(verbose=0) if "verbose" in model.get_params() else model
+            for name, model in models.items()}, params
+
+
+def grid_search_loop(models: dict, params: dict, X, y, sample_weight) -> dict:
+    ## what evaluate_models did before: GridSearchCV per model, then a refit of the best params
+    best_params = {}
+    for name, model in models.items():
+        gs = GridSearchCV(model, params.get(name, {}), cv=3)
+        gs.fit(X, y, sample_weight=sample_weight)
+        clone(model).set_params(**gs.best_params_).fit(X, y, sample_weight=sample_weight)
+        best_params[name] = gs.best_params_
+    return best_params
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH)
+    train_df, _ = hash_split(df, DATA_INGESTION_TRAIN_TEST_SPLIT_RATION,
+                             key_columns=[column for column in df.columns if column != TARGET_COLUMN])
+    train_df, sample_weight = deduplicate_rows(train_df)
+    X = train_df.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=np.int8)
+    y = train_df[TARGET_COLUMN].replace(-1, 0).to_numpy(dtype=np.float64)
+    models, params = quiet_models()
+    n_fits = sum(3 * max(1, int(np.prod([len(v) for v in params.get(name, {}).values()]))) + 1 for name in models)
+    print(f"{len(X)} deduplicated training rows, {n_fits} fits, {os.cpu_count()} cpus")
+    print(f"{'search':>26} {'seconds':>8} {'speedup':>8} {'busy':>6} {'same best params':>17}")
+
+    start = time.perf_counter()
+    loop_best_params = grid_search_loop(models, params, X, y, sample_weight)
+    loop_seconds = time.perf_counter() - start
+    print(f"{'GridSearchCV loop + refit':>26} {loop_seconds:>8.1f} {1.0:>8.2f} {'':>6} {'':>17}")
+
+    n_jobs_list = [n for n in (1, 2, 4, 8, 16, 32, 64) if n < (os.cpu_count() or 1)] + [os.cpu_count() or 1]
+    for n_jobs in n_jobs_list:
+        stats = {}
+        start = time.perf_counter()
+        results = grid_search_models(models, params, X, y, sample_weight=sample_weight, n_jobs=n_jobs,
+                                     scheduler_stats=stats)
+        seconds = time.perf_counter() - start
+
+        busy = stats["fit_seconds"] / (stats["wall_seconds"] * stats["workers"])
+        same = sum(results[name].best_params == loop_best_params[name] for name in models)
+        print(f"{f'scheduler, {n_jobs} processes':>26} {seconds:>8.1f} {loop_seconds / seconds:>8.2f} "
+              f"{busy:>6.0%} {f'{same}/{len(models)}':>17}")
+        if n_jobs == 1:
+            fit_seconds, max_fit_seconds = stats["fit_seconds"], stats["max_fit_seconds"]
+
+    for n_cores in (2, 4, 8, 16, 32, 64):
+        projected = max(fit_seconds / n_cores, max_fit_seconds)
+        print(f"{f'projected, {n_cores} cores':>26} {projected:>8.1f} {loop_seconds / projected:>8.2f}")
@@ -0,0 +1,69 @@
+"""
+    Checks the model search's fold scores against GridSearchCV fit with sample_weight, on the
+    deduplicated training split of the phishing data where the weights are the duplicate
+    counts. Runs grid_search_models with weighted_scores off and on over seeded grids, and
+    reports for each the largest difference of the mean cv scores from GridSearchCV's and
+    whether the best params agree. Which setting matches depends on how the installed
+    scikit-learn scores GridSearchCV's folds; MODEL_TRAINER_SEARCH_WEIGHTED_SCORES picks one.
+
+    Run from the repository root:  python benchmarks/model_search_weighting_check.py
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import (
+    TARGET_COLUMN, DATA_INGESTION_TRAIN_TEST_SPLIT_RATION, MODEL_TRAINER_SEARCH_CV_FOLDS
+)
+from networksecurity.utils.main_utils.utils import hash_split, deduplicate_rows
+from networksecurity.utils.ml_utils.model.model_search import grid_search_models
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+MODELS = {
+    "Decision Tree": DecisionTreeClassifier(random_state=0),
+    "Logistic Regression": LogisticRegression(max_iter=1000)
+}
+PARAMS = {
+    "Decision Tree": {"criterion": ["gini", "entropy"], "max_depth": [3, 6, 9, None]},
+    "Logistic Regression": {"C": [0.01, 0.1, 1.0, 10.0]}
+}
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH)
+    train_df, _ = hash_split(df, DATA_INGESTION_TRAIN_TEST_SPLIT_RATION,
+                             key_columns=[column for column in df.columns if column != TARGET_COLUMN])
+    train_df, sample_weight = deduplicate_rows(train_df)
+    X = train_df.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=np.int8)
+    y = train_df[TARGET_COLUMN].replace(-1, 0).to_numpy(dtype=np.float64)
+    print(f"scikit-learn {sklearn.__version__}, {len(X)} deduplicated rows, weights up to {sample_weight.max():.0f}")
+
+    reference = {}
+    for name, model in MODELS.items():
+        gs = GridSearchCV(model, PARAMS[name], cv=MODEL_TRAINER_SEARCH_CV_FOLDS).fit(X, y, sample_weight=sample_weight)
+        reference[name] = gs
+
+    print(f"{'weighted_scores':>16} {'model':>20} {'max score diff':>15} {'same best params':>17}")
+    matches = {}
+    for weighted_scores in (False, True):
+        results = grid_search_models(MODELS, PARAMS, X, y, sample_weight=sample_weight, n_jobs=1,
+                                     weighted_scores=weighted_scores)
+        matches[weighted_scores] = True
+        for name, result in results.items():
+            diff = np.max(np.abs(np.array(result.mean_test_scores) - reference[name].cv_results_["mean_test_score"]))
+            same = result.best_params == reference[name].best_params_
+            matches[weighted_scores] &= bool(diff < 1e-12 and same)
+            print(f"{str(weighted_scores):>16} {name:>20} {diff:>15.2e} {str(same):>17}")
+
+    print("GridSearchCV with sample_weight matches weighted_scores="
+          + (", ".join(str(setting) for setting, match in matches.items() if match) or "neither"))
@@ -0,0 +1,175 @@
+"""
+    Partitioned export of the NetworkData collection: rows/s for 1, 2, 4 and 8 _id ranges
+    read at the same time, and a check that every partition count returns the same frame
+    as the single cursor export.
+
+    Runs against an in-process BSON stand-in, once as is and once with a modelled network
+    where every cursor batch costs a round trip plus its bytes over one connection, and checks
+    the result on mongomock. Set BENCHMARK_MONGO_DB_URL to run against a real server instead
+    (the benchmark writes to, and drops, benchmark.NetworkData there). mongomock is not in
+    requirements.txt; without it the mongomock check is skipped (pip install mongomock).
+    Run from the repository root:  python benchmarks/partitioned_export_benchmark.py
+"""
+
+import os
+import sys
+import time
+import random
+import bisect
+
+import bson
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import (
+    SCHEMA_FILE_PATH,
+    DATA_INGESTION_EXPORT_BATCH_SIZE,
+    DATA_INGESTION_NA_VALUES
+)
+from networksecurity.utils.main_utils.utils import read_yaml_file
+from networksecurity.utils.mongo_utils.collection_export import (
+    schema_column_dtypes,
+    export_collection,
+    export_collection_partitioned
+)
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+N_ROWS = 110550
+PARTITION_COUNTS = [1, 2, 4, 8]
+## modelled network: round trip per cursor batch and bandwidth of one connection
+ROUND_TRIP_SECONDS = 0.005
+CONNECTION_MB_PER_SECOND = 50.0
+
+
+class BsonCursor:
+    def __init__(self, collection, raw_documents: list, drop_id: bool, batch_size: int):
+        self._documents = self._read(collection, raw_documents, drop_id, batch_size or 101)
+
+    @staticmethod
+    def _read(collection, raw_documents: list, drop_id: bool, batch_size: int):
+        for start in range(0, len(raw_documents), batch_size):
+            batch = raw_documents[start:start + batch_size]
+            if collection.network:
+                ## sleeping releases the GIL, as waiting on a socket does
+                time.sleep(ROUND_TRIP_SECONDS + sum(map(len, batch)) / (CONNECTION_MB_PER_SECOND * 2**20))
+            for raw in batch:
+                document = bson.decode(raw)
+                if drop_id:
+                    del document["_id"]
+                yield document
+
+    def sort(self, sort: list):
+        ## documents are kept in _id order already
+        return self
+
+    def __iter__(self):
+        return self._documents
+
+    def close(self):
+        self._documents.close()
+
+
+class BsonCollection:
+    """
+    Stand-in for a server collection: documents are kept as BSON in _id order, decoded one by
+    one while iterating, and $sample and _id range queries are answered like a server would.
+    """
+
+    name = "NetworkData"
+
+    def __init__(self):
+        self.network = False
+        self._ids = []
+        self._raw_documents = []
+
+    def insert_many(self, documents: list):
+        for document in documents:
+            document_id = bson.ObjectId()
+            self._ids.append(document_id)
+            self._raw_documents.append(bson.encode({"_id": document_id, **document}))
+
+    def estimated_document_count(self) -> int:
+        return len(self._raw_documents)
+
+    def aggregate(self, pipeline: list) -> list:
+        size = next(stage["$sample"]["size"] for stage in pipeline if "$sample" in stage)
+        return [{"_id": document_id} for document_id in random.sample(self._ids, min(size, len(self._ids)))]
+
+    def find(self, query: dict = None, projection: dict = None, batch_size: int = 0) -> BsonCursor:
+        id_range = (query or {}).get("_id", {})
+        start = bisect.bisect_left(self._ids, id_range["$gte"]) if "$gte" in id_range else 0
+        end = bisect.bisect_left(self._ids, id_range["$lt"]) if "$lt" in id_range else len(self._ids)
+        drop_id = bool(projection) and projection.get("_id") == 0
+        return BsonCursor(self, self._raw_documents[start:end], drop_id, batch_size)
+
+    def drop(self):
+        self._ids, self._raw_documents = [], []
+
+
+def make_documents(n_rows: int) -> list:
+    df = pd.read_csv(DATA_FILE_PATH)
+    df = pd.concat([df] * (n_rows // len(df) + 1), ignore_index=True).head(n_rows)
+    records = df.to_dict(orient="records")
+    rng = np.random.default_rng(0)
+    return [{key: "na" if rng.random() < 0.01 else int(value) for key, value in record.items()}
+            for record in records]
+
+
+def export(collection, n_partitions: int) -> pd.DataFrame:
+    column_dtypes = schema_column_dtypes(read_yaml_file(SCHEMA_FILE_PATH))
+    if n_partitions == 1:
+        column_arrays = export_collection(collection, column_dtypes, batch_size=DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                          na_values=DATA_INGESTION_NA_VALUES)
+    else:
+        column_arrays = export_collection_partitioned(collection, column_dtypes, n_partitions,
+                                                      batch_size=DATA_INGESTION_EXPORT_BATCH_SIZE,
+                                                      na_values=DATA_INGESTION_NA_VALUES)
+    return column_arrays.to_dataframe()
+
+
+def run(source: str, collection):
+    reference = None
+    for n_partitions in PARTITION_COUNTS:
+        start = time.perf_counter()
+        df = export(collection, n_partitions)
+        seconds = time.perf_counter() - start
+        if reference is None:
+            reference, reference_seconds = df, seconds
+        same = reference.columns.equals(df.columns) and np.array_equal(
+            reference.to_numpy(dtype=np.float64), df.to_numpy(dtype=np.float64), equal_nan=True)
+        print(f"{source:>22} {n_partitions:>10} {seconds:>8.2f} {len(df) / seconds:>10.0f} "
+              f"{reference_seconds / seconds:>8.2f}  {same}")
+
+
+if __name__ == "__main__":
+    documents = make_documents(N_ROWS)
+    print(f"{N_ROWS} documents, cursor batches of {DATA_INGESTION_EXPORT_BATCH_SIZE}, {os.cpu_count()} cpus")
+    print(f"{'source':>22} {'partitions':>10} {'seconds':>8} {'rows/s':>10} {'speedup':>8}  identical")
+
+    mongo_db_url = os.getenv("BENCHMARK_MONGO_DB_URL")
+    if mongo_db_url:
+        import pymongo
+        collection = pymongo.MongoClient(mongo_db_url)["benchmark"]["NetworkData"]
+        collection.drop()
+        collection.insert_many(documents)
+        run("mongod", collection)
+        collection.drop()
+        sys.exit(0)
+
+    collection = BsonCollection()
+    collection.insert_many(documents)
+    run("bson", collection)
+    collection.network = True
+    run(f"bson, {ROUND_TRIP_SECONDS * 1000:.0f} ms rtt {CONNECTION_MB_PER_SECOND:.0f} MB/s", collection)
+
+    try:
+        import mongomock
+    except ImportError:
+        print("mongomock is not installed, skipping the mongomock check (pip install mongomock)")
+        sys.exit(0)
+    collection = mongomock.MongoClient()["benchmark"]["NetworkData"]
+    collection.insert_many(documents[:11055])
+    run("mongomock", collection)
@@ -0,0 +1,121 @@
+"""
+    Per-worker memory of the served model, loaded from pickles or from a memory-mapped model bundle.
+
+    Every worker loads the model through ModelRegistry and scores a batch, then all of them
+    stay alive while their Rss and Pss are read from /proc/<pid>/smaps_rollup. Pss splits
+    shared pages between the processes mapping them, so it is the per-worker cost that adds up.
+
+    Linux only. Run from the repository root:  python benchmarks/shared_model_memory_benchmark.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import (
+    TARGET_COLUMN,
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    MODEL_FILE_NAME,
+    MODEL_BUNDLE_DIR_NAME,
+    PREPROCESSING_OBJECT_FILE_NAME
+)
+from networksecurity.utils.main_utils.utils import save_object
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.model_bundle import save_model_bundle
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+WORKER_COUNTS = [1, 4]
+N_ESTIMATORS = 128
+
+
+def read_memory_kb(pid: int) -> dict:
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            fields = line.split()
+            if fields[0] in ("Rss:", "Pss:"):
+                memory[fields[0][:-1]] = int(fields[1])
+    return memory
+
+
+def worker(model_dir: str, ready, stop):
+    from networksecurity.serving.model_registry import ModelRegistry
+
+    if model_dir is not None:
+        model_registry = ModelRegistry(model_dir=model_dir, cache_size=0)
+        model_registry.reload()
+        df = pd.read_csv(DATA_FILE_PATH).drop(columns=[TARGET_COLUMN])
+        model_registry.get_model().predict(df.head(4096))
+
+    ready.release()
+    stop.wait()
+
+
+def measure(model_dir: str, n_workers: int) -> list:
+    context = multiprocessing.get_context("spawn")
+    ready = context.Semaphore(0)
+    stop = context.Event()
+    processes = [context.Process(target=worker, args=(model_dir, ready, stop)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.acquire()
+
+    memory = [read_memory_kb(process.pid) for process in processes]
+    stop.set()
+    for process in processes:
+        process.join()
+    return memory
+
+
+def export_models(pickle_dir: str, bundle_dir: str):
+    df = pd.read_csv(DATA_FILE_PATH)
+    X = df.drop(columns=[TARGET_COLUMN])
+    y = df[TARGET_COLUMN].replace(-1, 0)
+
+    preprocessor = Pipeline([("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]).fit(X)
+    model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=42).fit(preprocessor.transform(X), y)
+
+    save_object(os.path.join(pickle_dir, PREPROCESSING_OBJECT_FILE_NAME), preprocessor)
+    save_object(os.path.join(pickle_dir, MODEL_FILE_NAME), model)
+
+    network_model = NetworkModel(preprocessor=preprocessor, model=model)
+    network_model.compile()
+    network_model.compile_imputer()
+    save_model_bundle(os.path.join(bundle_dir, MODEL_BUNDLE_DIR_NAME), network_model)
+
+
+if __name__ == "__main__":
+    work_dir = tempfile.mkdtemp()
+    try:
+        pickle_dir = os.path.join(work_dir, "pickle")
+        bundle_dir = os.path.join(work_dir, "bundle")
+        export_models(pickle_dir, bundle_dir)
+
+        print(f"Random forest with {N_ESTIMATORS} trees, memory above an idle worker in MB")
+        print(f"{'layout':>8} {'workers':>8} {'rss/worker':>11} {'pss/worker':>11} {'pss total':>10}")
+        for n_workers in WORKER_COUNTS:
+            idle = measure(None, n_workers)
+            idle_rss = np.mean([memory["Rss"] for memory in idle])
+            idle_pss = np.mean([memory["Pss"] for memory in idle])
+
+            for layout, model_dir in (("pickle", pickle_dir), ("bundle", bundle_dir)):
+                memory = measure(model_dir, n_workers)
+                rss = np.mean([m["Rss"] for m in memory]) - idle_rss
+                pss = np.mean([m["Pss"] for m in memory]) - idle_pss
+                print(f"{layout:>8} {n_workers:>8} {rss / 1024:>11.1f} {pss / 1024:>11.1f} "
+                      f"{pss * n_workers / 1024:>10.1f}")
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,96 @@
+"""
+    Startup cost of the api: importing app.py, and importing it plus loading the model
+    the way the lifespan does. Also lists which training, tracking and database modules
+    the import pulled in; in serving the list should be empty.
+
+    Every measurement runs in a fresh interpreter.
+    Run from the repository root:  python benchmarks/startup_benchmark.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from networksecurity.constants.training_pipeline import (
+    TARGET_COLUMN,
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    FINAL_MODEL_DIR,
+    MODEL_BUNDLE_DIR_NAME
+)
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.model_bundle import save_model_bundle
+
+
+DATA_FILE_PATH = os.path.join(REPO_DIR, "Network_Data", "phisingData.csv")
+REPEATS = 5
+
+## modules that serving must not import until they are used
+LAZY_MODULES = [
+    "mlflow",
+    "dagshub",
+    "pymongo",
+    "networksecurity.pipeline.training_pipeline",
+    "networksecurity.components.data_ingestion",
+    "networksecurity.components.model_trainer"
+]
+
+STARTUP_SCRIPTS = {
+    "import app": "import app",
+    "import app + load model": "import app; app.model_registry.reload()",
+    "import training pipeline": "import networksecurity.pipeline.training_pipeline"
+}
+
+TIMED_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+{script}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "imported": [m for m in {lazy_modules!r} if m in sys.modules]}}))
+"""
+
+
+def run(script: str, work_dir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    output = subprocess.run(
+        [sys.executable, "-c", TIMED_SCRIPT.format(script=script, lazy_modules=LAZY_MODULES)],
+        cwd=work_dir, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    work_dir = tempfile.mkdtemp()
+    try:
+        df = pd.read_csv(DATA_FILE_PATH)
+        X = df.drop(columns=[TARGET_COLUMN])
+        y = df[TARGET_COLUMN].replace(-1, 0)
+        preprocessor = Pipeline([("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]).fit(X)
+        model = RandomForestClassifier(n_estimators=128, random_state=42).fit(preprocessor.transform(X), y)
+        network_model = NetworkModel(preprocessor=preprocessor, model=model)
+        network_model.compile()
+        network_model.compile_imputer()
+        save_model_bundle(os.path.join(work_dir, FINAL_MODEL_DIR, MODEL_BUNDLE_DIR_NAME), network_model,
+                          schema_file_path=os.path.join(REPO_DIR, "data_schema", "schema.yaml"))
+        shutil.copytree(os.path.join(REPO_DIR, "templates"), os.path.join(work_dir, "templates"))
+
+        print(f"{'startup':>26} {'median s':>9} {'min s':>7}  lazy modules imported")
+        for name, script in STARTUP_SCRIPTS.items():
+            results = [run(script, work_dir) for _ in range(REPEATS)]
+            seconds = [result["seconds"] for result in results]
+            imported = ", ".join(results[-1]["imported"]) or "none"
+            print(f"{name:>26} {np.median(seconds):>9.3f} {np.min(seconds):>7.3f}  {imported}")
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
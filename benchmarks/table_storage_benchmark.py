@@ -0,0 +1,76 @@
+"""
+    Tabular artifacts stored as csv against the columnar format: time to write, to read,
+    and the round trip the pipeline does (ingestion writes, validation reads and writes
+    again, transformation reads), plus size on disk.
+
+    Run from the repository root:  python benchmarks/table_storage_benchmark.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.utils.main_utils.utils import get_table_file_path, save_table, load_table
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+N_ROWS = 110550
+REPEATS = 5
+
+
+def disk_size(file_path: str) -> int:
+    if os.path.isfile(file_path):
+        return os.path.getsize(file_path)
+    return sum(os.path.getsize(os.path.join(file_path, file_name)) for file_name in os.listdir(file_path))
+
+
+def best_seconds(function) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def pipeline_round_trip(ingested_file_path: str, validated_file_path: str, df: pd.DataFrame):
+    save_table(ingested_file_path, df)
+    save_table(validated_file_path, load_table(ingested_file_path))
+    load_table(validated_file_path).to_numpy(dtype=np.float64)
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(DATA_FILE_PATH)
+    df = pd.concat([df] * (N_ROWS // len(df) + 1), ignore_index=True).head(N_ROWS)
+    ## one column with missing values, as "na" in the collection gives
+    df["SFH"] = df["SFH"].mask(np.random.default_rng(0).random(len(df)) < 0.01)
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        print(f"{N_ROWS} rows, {df.shape[1]} columns, best of {REPEATS}")
+        print(f"{'format':>9} {'write s':>8} {'read s':>8} {'pipeline s':>11} {'disk MB':>8}")
+        for table_format in ("csv", "columnar"):
+            file_path = get_table_file_path(os.path.join(work_dir, "train.csv"), table_format)
+            write_seconds = best_seconds(lambda: save_table(file_path, df))
+            read_seconds = best_seconds(lambda: load_table(file_path).to_numpy(dtype=np.float64))
+            pipeline_seconds = best_seconds(lambda: pipeline_round_trip(
+                get_table_file_path(os.path.join(work_dir, "ingested.csv"), table_format),
+                get_table_file_path(os.path.join(work_dir, "validated.csv"), table_format),
+                df
+            ))
+
+            loaded = load_table(file_path)
+            if not np.array_equal(loaded.to_numpy(dtype=np.float64), df.to_numpy(dtype=np.float64), equal_nan=True):
+                raise Exception(f"{table_format} did not read back what was written")
+            print(f"{table_format:>9} {write_seconds:>8.3f} {read_seconds:>8.3f} {pipeline_seconds:>11.3f} "
+                  f"{disk_size(file_path) / 2**20:>8.2f}")
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
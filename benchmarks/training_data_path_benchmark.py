@@ -0,0 +1,81 @@
+"""
+    The transformed training data on its way from DataTransformation to ModelTrainer, on 1.1M
+    rows: the old path, one float64 matrix of features and target joined with np.c_, loaded
+    whole and sliced into X / y, against int8 features and target saved apart and the features
+    memory-mapped. Reports bytes on disk, seconds to save and load, the memory numpy allocated
+    while loading, and seconds to fit a decision tree from what was loaded.
+
+    Run from the repository root:  python benchmarks/training_data_path_benchmark.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networksecurity.constants.training_pipeline import TARGET_COLUMN
+from networksecurity.utils.main_utils.utils import save_numpy_array, load_numpy_array_data, compact_array
+
+
+DATA_FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
+N_COPIES = 100
+
+
+def save_joined(dir_path: str, features: np.ndarray, target: np.ndarray) -> list:
+    file_path = os.path.join(dir_path, "train.npy")
+    save_numpy_array(file_path, array=np.c_[features, target])
+    return [file_path]
+
+
+def load_joined(file_paths: list) -> tuple:
+    train_arr = load_numpy_array_data(file_paths[0])
+    return train_arr[:, :-1], train_arr[:, -1]
+
+
+def save_compact(dir_path: str, features: np.ndarray, target: np.ndarray) -> list:
+    file_paths = [os.path.join(dir_path, "train.npy"), os.path.join(dir_path, "train_target.npy")]
+    save_numpy_array(file_paths[0], array=compact_array(features))
+    save_numpy_array(file_paths[1], array=compact_array(target))
+    return file_paths
+
+
+def load_compact(file_paths: list) -> tuple:
+    return load_numpy_array_data(file_paths[0], mmap_mode="r"), load_numpy_array_data(file_paths[1]).astype(np.float64)
+
+
+if __name__ == "__main__":
+    df = pd.concat([pd.read_csv(DATA_FILE_PATH)] * N_COPIES, ignore_index=True)
+    ## as the imputer hands them over: float64 features, the target with -1 as 0
+    features = df.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=np.float64)
+    target = df[TARGET_COLUMN].replace(-1, 0).to_numpy()
+    print(f"{len(df)} rows, {features.shape[1]} features")
+    print(f"{'path':>22} {'MB on disk':>11} {'save s':>7} {'load s':>7} {'load MB':>8} {'tree fit s':>11}")
+
+    for name, save, load in (("float64 joined, np.c_", save_joined, load_joined),
+                             ("int8 apart, mmap", save_compact, load_compact)):
+        with tempfile.TemporaryDirectory() as dir_path:
+            start = time.perf_counter()
+            file_paths = save(dir_path, features, target)
+            save_seconds = time.perf_counter() - start
+            disk_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / 2 ** 20
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            X, y = load(file_paths)
+            load_seconds = time.perf_counter() - start
+            load_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+
+            start = time.perf_counter()
+            DecisionTreeClassifier(random_state=0).fit(X, y)
+            fit_seconds = time.perf_counter() - start
+            del X, y
+
+        print(f"{name:>22} {disk_mb:>11.1f} {save_seconds:>7.3f} {load_seconds:>7.3f} {load_mb:>8.1f} {fit_seconds:>11.2f}")
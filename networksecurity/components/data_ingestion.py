@@ -2,57 +2,73 @@ from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
 from networksecurity.entity.config_entity import DataIngestionConfig
 from networksecurity.entity.artifact_entity import DataIngestionArtifact
+from networksecurity.constants.training_pipeline import (
+    SCHEMA_FILE_PATH,
+    TARGET_COLUMN,
+    DATA_INGESTION_EXPORT_BATCH_SIZE,
+    DATA_INGESTION_EXPORT_PARTITIONS,
+    DATA_INGESTION_NA_VALUES
+)
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file, save_table, hash_split
+from networksecurity.utils.main_utils.feature_store import FeatureStore
+from networksecurity.utils.mongo_utils.client import get_mongo_client_factory
+from networksecurity.utils.mongo_utils.collection_export import schema_column_dtypes
 
 import os
 import sys
 import pandas as pd
 import numpy as np
-import pymongo
 from typing import List
 from sklearn.model_selection import train_test_split
 
 from dotenv import load_dotenv
 load_dotenv()
 
-MONGO_DB_URL = os.getenv("MONGO_DB_URL")
-
 
 class DataIngestion:
     def __init__(self, data_ingestion_config: DataIngestionConfig):
         try:
             self.data_ingestion_config = data_ingestion_config
+            self._schema_config = read_yaml_file(SCHEMA_FILE_PATH)
 
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
 
 
-    def export_collection_as_dataframe(self):
-        try:
-            database_name = self.data_ingestion_config.database_name
-            collection_name = self.data_ingestion_config.collection_name
-            self.mongo_client = pymongo.MongoClient(MONGO_DB_URL)
-            collection = self.mongo_client[database_name][collection_name]
-
-
-            df = pd.DataFrame(list(collection.find()))
-            if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
+    def get_collection(self):
+        ## the process wide pooled client, reused by every export
+        return get_mongo_client_factory().get_collection(
+            self.data_ingestion_config.database_name, self.data_ingestion_config.collection_name
+        )
 
-            df.replace({"na":np.nan}, inplace=True)
-            return df
 
-        except Exception as e:
-            raise NetworkSecurityException(e, sys)  
+    def export_data_into_feature_store(self) -> pd.DataFrame:
+        """Bring the shared feature store up to date with the collection and return all of its rows."""
+        try:
+            feature_store = FeatureStore(
+                feature_store_dir=self.data_ingestion_config.feature_store_dir,
+                database_name=self.data_ingestion_config.database_name,
+                collection_name=self.data_ingestion_config.collection_name,
+                table_format=self.data_ingestion_config.feature_store_table_format
+            )
 
+            ## only documents above the stored watermark are exported
+            feature_store.sync(
+                collection=self.get_collection(),
+                column_dtypes=schema_column_dtypes(self._schema_config),
+                n_partitions=DATA_INGESTION_EXPORT_PARTITIONS,
+                batch_size=DATA_INGESTION_EXPORT_BATCH_SIZE,
+                na_values=DATA_INGESTION_NA_VALUES
+            )
+            feature_store.compact(
+                min_partition_rows=self.data_ingestion_config.compaction_min_partition_rows,
+                max_small_partitions=self.data_ingestion_config.compaction_max_small_partitions
+            )
 
-    def export_data_into_feature_store(self, dataframe: pd.DataFrame):
-        try:
-            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
-            dir_path = os.path.dirname(feature_store_file_path)
-            os.makedirs(dir_path, exist_ok=True)
-            dataframe.to_csv(feature_store_file_path, index=False, header=True)
-            return dataframe
+            ## the run keeps the watermark and partitions it trained on
+            write_yaml_file(self.data_ingestion_config.feature_store_snapshot_file_path, feature_store.manifest)
+            return feature_store.read()
 
         except Exception as e:
             raise NetworkSecurityException(e, sys) 
@@ -60,11 +76,22 @@ class DataIngestion:
 
     def split_data_as_train_test(self, dataframe: pd.DataFrame):
         try:
-            train_set, test_set = train_test_split(
-                dataframe, test_size=self.data_ingestion_config.train_test_split_ratio
-            )
-
-            logging.info("Performed train test split on dataframe")
+            config = self.data_ingestion_config
+            if config.split_mode == "hash":
+                ## keyed on the features, so duplicate rows land on the same side and cannot leak into test
+                key_columns = [column for column in dataframe.columns if column != TARGET_COLUMN]
+                train_set, test_set = hash_split(
+                    dataframe, config.train_test_split_ratio, key_columns=key_columns, seed=config.split_seed
+                )
+            elif config.split_mode == "random":
+                train_set, test_set = train_test_split(
+                    dataframe, test_size=config.train_test_split_ratio, random_state=config.split_seed
+                )
+            else:
+                raise ValueError(f"Unknown split mode {config.split_mode}, expected 'hash' or 'random'")
+
+            logging.info(f"Performed {config.split_mode} train test split on dataframe: "
+                         f"{len(train_set)} train rows, {len(test_set)} test rows")
 
             logging.info("Exited split_data_as_train_test method of Data_Ingestion class")
 
@@ -73,13 +100,9 @@ class DataIngestion:
 
             logging.info("Exporting train and test file path")
 
-            train_set.to_csv(
-                self.data_ingestion_config.training_file_path, index=False, header=True
-            )
+            save_table(self.data_ingestion_config.training_file_path, train_set)
 
-            test_set.to_csv(
-                self.data_ingestion_config.testing_file_path, index=False, header=True
-            )
+            save_table(self.data_ingestion_config.testing_file_path, test_set)
 
             logging.info("Exported train and test file path")
 
@@ -91,8 +114,7 @@ class DataIngestion:
 
     def initiate_data_ingestion(self):
         try:
-            dataframe = self.export_collection_as_dataframe()
-            dataframe = self.export_data_into_feature_store(dataframe)
+            dataframe = self.export_data_into_feature_store()
             self.split_data_as_train_test(dataframe)
             data_ingestion_artifact = DataIngestionArtifact(
                 train_file_path=self.data_ingestion_config.training_file_path,
@@ -2,18 +2,19 @@ import sys
 import os
 import numpy as np
 import pandas as pd
-from sklearn.impute import KNNImputer
 from sklearn.pipeline import Pipeline
 
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
 
 from networksecurity.constants.training_pipeline import TARGET_COLUMN
-from networksecurity.constants.training_pipeline import DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.constants.training_pipeline import DATA_TRANSFORMATION_IMPUTER_PARAMS, DATA_TRANSFORMATION_IMPUTER_N_JOBS
 
 from networksecurity.entity.config_entity import DataTransformationConfig
 from networksecurity.entity.artifact_entity import DataTransformationArtifact, DataValidationArtifact
-from networksecurity.utils.main_utils.utils import save_numpy_array, save_object
+from networksecurity.utils.main_utils.utils import save_numpy_array, save_object, load_table, compact_array, deduplicate_rows, write_yaml_file
+from networksecurity.utils.ml_utils.metric.drift_metric import get_value_histogram
+from networksecurity.utils.ml_utils.model.bitplane_imputer import BitPlaneKNNImputer
 
 
 
@@ -31,7 +32,7 @@ class DataTransformation:
     @staticmethod
     def read_data(file_path) -> pd.DataFrame:
         try: 
-            return pd.read_csv(file_path)
+            return load_table(file_path)
         
         except Exception as e:
             raise NetworkSecurityException(e,sys)
@@ -39,7 +40,8 @@ class DataTransformation:
 
     def get_data_transformer_object(cls) -> Pipeline:
         try:
-            imputer = KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS)
+            ## a KNNImputer with the same output, faster on the ternary features
+            imputer = BitPlaneKNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS, n_jobs=DATA_TRANSFORMATION_IMPUTER_N_JOBS)
             processor = Pipeline([("imputer", imputer)])
             return processor
 
@@ -52,6 +54,21 @@ class DataTransformation:
             train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
             test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
 
+            ## counted before deduplication, live traffic repeats rows as the training data does
+            baseline_histogram = get_value_histogram(train_df.drop(columns=[TARGET_COLUMN]))
+            if baseline_histogram is not None:
+                write_yaml_file(self.data_transformation_config.baseline_histogram_file_path, baseline_histogram)
+
+            ## the ternary features repeat whole rows a lot, fit on unique rows weighted by their counts
+            train_weight, test_weight = None, None
+            if self.data_transformation_config.deduplicate:
+                n_train_rows, n_test_rows = len(train_df), len(test_df)
+                train_df, train_weight = deduplicate_rows(train_df)
+                test_df, test_weight = deduplicate_rows(test_df)
+                logging.info(f"Deduplicated train from {n_train_rows} to {len(train_df)} rows "
+                             f"({len(train_df) / max(n_train_rows, 1):.1%}), "
+                             f"test from {n_test_rows} to {len(test_df)} rows")
+
             ## creating dependent and independent features for train and test data
             input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN])
             target_feature_train_df = train_df[TARGET_COLUMN]
@@ -66,24 +83,29 @@ class DataTransformation:
             transformed_input_train_feature = preprocessor.fit_transform(input_feature_train_df)
             transformed_input_test_feature = preprocessor.transform(input_feature_test_df)
 
-
-            train_arr = np.c_[transformed_input_train_feature, np.array(target_feature_train_df)]
-            test_arr = np.c_[transformed_input_test_feature, np.array(target_feature_test_df)]
-
-
-            ## save numpy array data and object
-            save_numpy_array(self.data_transformation_config.transformed_train_file_path, array=train_arr)
-            save_numpy_array(self.data_transformation_config.transformed_test_file_path, array=test_arr)
+            ## features and target saved apart in their smallest exact dtype, int8 unless
+            ## imputed values are fractional, so the trainer can memory-map them as they are
+            save_numpy_array(self.data_transformation_config.transformed_train_file_path, array=compact_array(transformed_input_train_feature))
+            save_numpy_array(self.data_transformation_config.transformed_test_file_path, array=compact_array(transformed_input_test_feature))
+            save_numpy_array(self.data_transformation_config.transformed_train_target_file_path, array=compact_array(target_feature_train_df.to_numpy()))
+            save_numpy_array(self.data_transformation_config.transformed_test_target_file_path, array=compact_array(target_feature_test_df.to_numpy()))
             save_object(self.data_transformation_config.transformed_object_file_path, obj= preprocessor)
+            if train_weight is not None:
+                save_numpy_array(self.data_transformation_config.transformed_train_weight_file_path, array=train_weight)
+                save_numpy_array(self.data_transformation_config.transformed_test_weight_file_path, array=test_weight)
 
-            save_object(file_path="final_models/preprocessor.pkl", obj=preprocessor)
 
 
             ## preparing artifacts
             data_transformation_artifact = DataTransformationArtifact(
                     transformed_object_file_path = self.data_transformation_config.transformed_object_file_path,
-                    transformed_test_file_path = self.data_transformation_config.transformed_train_file_path,
-                    transformed_train_file_path = self.data_transformation_config.transformed_test_file_path
+                    transformed_test_file_path = self.data_transformation_config.transformed_test_file_path,
+                    transformed_train_file_path = self.data_transformation_config.transformed_train_file_path,
+                    transformed_test_target_file_path = self.data_transformation_config.transformed_test_target_file_path,
+                    transformed_train_target_file_path = self.data_transformation_config.transformed_train_target_file_path,
+                    transformed_train_weight_file_path = None if train_weight is None else self.data_transformation_config.transformed_train_weight_file_path,
+                    transformed_test_weight_file_path = None if test_weight is None else self.data_transformation_config.transformed_test_weight_file_path,
+                    baseline_histogram_file_path = None if baseline_histogram is None else self.data_transformation_config.baseline_histogram_file_path
             )
 
             return data_transformation_artifact
@@ -1,10 +1,11 @@
 from networksecurity.entity.artifact_entity import DataIngestionArtifact,               DataValidationArtifact
 from networksecurity.entity.config_entity import DataValidationConfig
 from networksecurity.exception.exception import NetworkSecurityException
-from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
-from networksecurity.constants.training_pipeline import SCHEMA_FILE_PATH
+from networksecurity.utils.main_utils.utils import write_yaml_file, save_table, load_table
+from networksecurity.constants.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from networksecurity.utils.main_utils.schema_validator import SchemaValidator, SchemaValidationResult
+from networksecurity.utils.ml_utils.metric.drift_metric import get_drift_report
 from networksecurity.logging.logger import logging
-from scipy.stats import ks_2samp 
 import pandas as pd
 import os
 import sys
@@ -16,7 +17,10 @@ class DataValidation:
         try: 
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_config = data_validation_config
-            self._schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            ## the target is required, features may be missing and are imputed later
+            self._schema_validator = SchemaValidator.from_schema_file(
+                SCHEMA_FILE_PATH, required_columns=[TARGET_COLUMN], max_nan_rate=data_validation_config.max_nan_rate
+            )
     
         except Exception as e:
             raise NetworkSecurityException(e,sys)
@@ -25,7 +29,7 @@ class DataValidation:
     @staticmethod
     def read_data(file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return load_table(file_path)
 
         except Exception as e:
             raise NetworkSecurityException(e, sys)
@@ -33,37 +37,54 @@ class DataValidation:
     
     def validate_columns(self, dataframe: pd.DataFrame) -> bool:
         try:
-            number_of_columns = len(self._schema_config)
-            logging.info(f"Required number of columns: {number_of_columns}")
+            logging.info(f"Required columns: {len(self._schema_validator.columns)}")
             logging.info("DataFrame has columns: {}".format(len(dataframe.columns)))
-            
-            if len(dataframe.columns) == number_of_columns:
-                return True
-            return False
+
+            errors = self._schema_validator.check_columns(dataframe.columns)
+            for error in errors:
+                logging.error(f"Schema validation: {error}")
+            return not errors
    
         except Exception as e:
             raise NetworkSecurityException(e, sys)
+
+
+    def split_invalid_rows(self, dataframe: pd.DataFrame, invalid_file_path: str) -> tuple:
+        """
+        Check every row against the schema and write the invalid ones to invalid_file_path.
+        Returns the valid rows, the invalid file path (None when every row is valid) and the result.
+        """
+        try:
+            result: SchemaValidationResult = self._schema_validator.validate(dataframe)
+            for error in result.errors:
+                logging.warning(f"Schema validation: {error}")
+
+            if result.n_invalid_rows == 0:
+                return dataframe, None, result
+
+            os.makedirs(os.path.dirname(invalid_file_path), exist_ok=True)
+            save_table(invalid_file_path, dataframe[~result.valid_rows].reset_index(drop=True))
+            valid_df = dataframe[result.valid_rows].reset_index(drop=True)
+            ## columns that held text are numeric once the rows with text are gone
+            for column in valid_df.columns:
+                if valid_df[column].dtype.kind not in "iuf":
+                    valid_df[column] = pd.to_numeric(valid_df[column])
+            logging.info(f"Moved {result.n_invalid_rows} of {result.n_rows} rows to {invalid_file_path}")
+            return valid_df, invalid_file_path, result
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
         
     
-    def detect_data_drift(self, base_df, current_df, threshold=0.05) -> bool:
+    def detect_data_drift(self, base_df, current_df, threshold=None) -> bool:
         try:
-            status = True
-            report = {}
-            for column in base_df.columns:
-                d1 = base_df[column]
-                d2 = current_df[column]
-                is_sample_dist = ks_2samp(d1, d2)
-
-                if threshold < is_sample_dist.pvalue:
-                    is_found = False
-                else: 
-                    is_found = True
-                    status = False
-
-                report.update({column: {
-                    "p_value": float(is_sample_dist.pvalue),
-                    "drift_status": is_found
-                }})
+            if threshold is None:
+                threshold = self.data_validation_config.drift_threshold
+
+            ## every column histogrammed in one pass, the tests are computed from the counts
+            report, status = get_drift_report(
+                base_df, current_df, threshold=threshold, test=self.data_validation_config.drift_test
+            )
             
             drift_report_file_path = self.data_validation_config.drift_report_file_path
 
@@ -72,6 +93,7 @@ class DataValidation:
             os.makedirs(dir_path, exist_ok=True)
 
             write_yaml_file(file_path=drift_report_file_path, content=report)
+            return status
 
         except Exception as e:
              raise NetworkSecurityException(e, sys)
@@ -88,35 +110,38 @@ class DataValidation:
             train_data = DataValidation.read_data(train_file_path)
             test_data = DataValidation.read_data(test_file_path)
 
-            ## validate number of columns
-            status = self.validate_columns(dataframe=train_data)
-            if not status:
-                error_message = f"Train Dataframe does not contain all columns. \n"
+            ## validate column names and order, nothing downstream works without them
+            if not self.validate_columns(dataframe=train_data):
+                raise Exception(f"Train dataframe does not match the schema columns: "
+                                f"{self._schema_validator.check_columns(train_data.columns)}")
 
-            status = self.validate_columns(dataframe=test_data)
-            if not status:
-                error_message = f"Test Dataframe does not contain all columns. \n"
+            if not self.validate_columns(dataframe=test_data):
+                raise Exception(f"Test dataframe does not match the schema columns: "
+                                f"{self._schema_validator.check_columns(test_data.columns)}")
+
+            ## rows with values outside the schema go to the invalid paths
+            train_data, invalid_train_file_path, train_result = self.split_invalid_rows(
+                train_data, self.data_validation_config.invalid_train_file_path)
+            test_data, invalid_test_file_path, test_result = self.split_invalid_rows(
+                test_data, self.data_validation_config.invalid_test_file_path)
 
             ## check data drift
             status = self.detect_data_drift(base_df = train_data, current_df= test_data)
+            status = status and not train_result.nan_rate_errors and not test_result.nan_rate_errors
             dir_name = os.path.dirname(self.data_validation_config.valid_train_file_path)
             os.makedirs(dir_name, exist_ok=True)
 
-            train_data.to_csv(
-                self.data_validation_config.valid_train_file_path, header=True, index=False
-            )
+            save_table(self.data_validation_config.valid_train_file_path, train_data)
 
-            test_data.to_csv(
-                self.data_validation_config.valid_test_file_path, header=True, index=False
-            )
+            save_table(self.data_validation_config.valid_test_file_path, test_data)
 
 
             data_validation_artifact = DataValidationArtifact(
                     validation_status =  status,
-                    valid_train_file_path = self.data_ingestion_artifact.train_file_path,
-                    valid_test_file_path = self.data_ingestion_artifact.test_file_path,
-                    invalid_train_file_path = None,
-                    invalid_test_file_path = None,
+                    valid_train_file_path = self.data_validation_config.valid_train_file_path,
+                    valid_test_file_path = self.data_validation_config.valid_test_file_path,
+                    invalid_train_file_path = invalid_train_file_path,
+                    invalid_test_file_path = invalid_test_file_path,
                     drift_report_file_path = self.data_validation_config.drift_report_file_path
             )
 
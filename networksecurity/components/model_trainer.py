@@ -1,7 +1,8 @@
 import os
 import sys
-import mlflow
-import dagshub
+from dataclasses import asdict
+
+import numpy as np
 
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
@@ -9,8 +10,11 @@ from networksecurity.logging.logger import logging
 from networksecurity.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact
 from networksecurity.entity.config_entity import ModelTrainerConfig
 
-from networksecurity.utils.main_utils.utils import save_object, load_object, load_numpy_array_data, evaluate_models
+from networksecurity.utils.main_utils.utils import save_object, load_object, load_numpy_array_data, evaluate_models, read_yaml_file
 from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.model_bundle import save_model_bundle, publish_model_bundle
+from networksecurity.constants.training_pipeline import FINAL_MODEL_DIR, MODEL_BUNDLE_DIR_NAME
+from networksecurity.constants.training_pipeline import MODEL_TRAINER_SEARCH_MODE, MODEL_TRAINER_SEARCH_COMPARE_WITH_GRID
 from networksecurity.utils.ml_utils.metric.classification_metric import get_classification_score
 
 from sklearn.linear_model import LogisticRegression
@@ -21,8 +25,18 @@ from sklearn.ensemble import (
     RandomForestClassifier
 )
 
-import dagshub
-dagshub.init(repo_owner='ammarvohra92', repo_name='Network-Security', mlflow=True)
+_mlflow = None
+
+
+def get_mlflow():
+    """mlflow set up against the dagshub tracking server, imported and initialised on first use."""
+    global _mlflow
+    if _mlflow is None:
+        import mlflow
+        import dagshub
+        dagshub.init(repo_owner='ammarvohra92', repo_name='Network-Security', mlflow=True)
+        _mlflow = mlflow
+    return _mlflow
 
 
 
@@ -37,6 +51,7 @@ class ModelTrainer:
         
 
     def track_mlflow(self, best_model, classificationmetric):
+        mlflow = get_mlflow()
         with mlflow.start_run():
             f1_score = classificationmetric.f1_score
             precision_score = classificationmetric.precision_score
@@ -48,50 +63,61 @@ class ModelTrainer:
             mlflow.sklearn.log_model(best_model, "model")
 
 
-    def train_model(self, X_train, y_train, X_test, y_test):
-        try:
-            models = {
-                "Random Forest": RandomForestClassifier(verbose=1),
-                "Decision Tree": DecisionTreeClassifier(),
-                "Ada Boost Classifier": AdaBoostClassifier(),
-                "Logistic Regression": LogisticRegression(verbose=1),
-                "Gradient Boost Classifier": GradientBoostingClassifier(verbose=1)
-            }
-
-            params = {
-                "Random Forest": {
-                    "n_estimators": [8,16,32,64,128,256]
-                },
+    @staticmethod
+    def get_models_and_params() -> tuple:
+        """The candidate models and the hyperparameter grid searched for each."""
+        models = {
+            "Random Forest": RandomForestClassifier(verbose=1),
+            "Decision Tree": DecisionTreeClassifier(),
+            "Ada Boost Classifier": AdaBoostClassifier(),
+            "Logistic Regression": LogisticRegression(verbose=1),
+            "Gradient Boost Classifier": GradientBoostingClassifier(verbose=1)
+        }
 
+        params = {
+            "Random Forest": {
+                "n_estimators": [8,16,32,64,128,256]
+            },
 
-                "Decision Tree": {
-                    "criterion": ["gini", "entropy", "log_loss"]
-                },
 
-                "Ada Boost Classifier":{
-                    "learning_rate": [.1, .01, .05, .001],
-                    "n_estimators": [8,16,32,64,128,256]
+            "Decision Tree": {
+                "criterion": ["gini", "entropy", "log_loss"]
+            },
 
-                },
+            "Ada Boost Classifier":{
+                "learning_rate": [.1, .01, .05, .001],
+                "n_estimators": [8,16,32,64,128,256]
 
+            },
 
-                "Logistic Regression": {},
 
+            "Logistic Regression": {},
 
 
-                "Gradient Boost Classifier": {
-                    "learning_rate": [.1, .01, .05, .001],
-                    "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
-                    "n_estimators": [8,16,32,64,128,256]
 
-                }
+            "Gradient Boost Classifier": {
+                "learning_rate": [.1, .01, .05, .001],
+                "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
+                "n_estimators": [8,16,32,64,128,256]
 
             }
 
+        }
+
+        return models, params
+
+
+    def train_model(self, X_train, y_train, X_test, y_test, train_sample_weight=None, test_sample_weight=None):
+        try:
+            models, params = self.get_models_and_params()
 
             model_report: dict = evaluate_models(X_train=X_train, y_train=y_train, 
                                                  X_test=X_test, y_test=y_test,
-                                                 models=models, params=params)
+                                                 models=models, params=params,
+                                                 train_sample_weight=train_sample_weight,
+                                                 test_sample_weight=test_sample_weight,
+                                                 search_mode=MODEL_TRAINER_SEARCH_MODE,
+                                                 compare_with_grid=MODEL_TRAINER_SEARCH_COMPARE_WITH_GRID)
 
             ## To get the best model score from dict
             best_model_score = max(sorted(model_report.values()))
@@ -104,25 +130,40 @@ class ModelTrainer:
             best_model = models[best_model_name]
 
             y_train_pred = best_model.predict(X_train)
-            classification_train_metric = get_classification_score(y_true=y_train, y_pred=y_train_pred)
+            classification_train_metric = get_classification_score(y_true=y_train, y_pred=y_train_pred, sample_weight=train_sample_weight)
             ## Tracking experiments with MLFLOW
             self.track_mlflow(best_model, classification_train_metric)
 
             y_test_pred = best_model.predict(X_test)
-            classification_test_metric = get_classification_score(y_true=y_test, y_pred=y_test_pred)
+            classification_test_metric = get_classification_score(y_true=y_test, y_pred=y_test_pred, sample_weight=test_sample_weight)
             ## Tracking experiments with MLFLOW
             self.track_mlflow(best_model=best_model, classificationmetric=classification_test_metric)
 
 
             preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
-            model_dir = os.path.dirname(self.model_trainer_config.trained_model_file_path)
-            os.makedirs(model_dir, exist_ok=True)
 
             network_model = NetworkModel(preprocessor=preprocessor, model=best_model)
-            save_object(file_path=self.model_trainer_config.trained_model_file_path, obj=network_model)
-
-
-            save_object(file_path="final_models/model.pkl", obj=best_model)
+            network_model.compile()
+            network_model.compile_imputer()
+
+            ## the training feature histogram goes with the model, live drift is measured against it
+            baseline_histogram_file_path = self.data_transformation_artifact.baseline_histogram_file_path
+            baseline_histogram = read_yaml_file(baseline_histogram_file_path) if baseline_histogram_file_path else None
+
+            ## one versioned bundle, saved with the run's artifacts and published for serving
+            save_model_bundle(
+                bundle_dir_path=self.model_trainer_config.trained_model_file_path,
+                network_model=network_model,
+                metrics={
+                    "train": asdict(classification_train_metric),
+                    "test": asdict(classification_test_metric)
+                },
+                baseline_histogram=baseline_histogram
+            )
+            publish_model_bundle(
+                bundle_dir_path=self.model_trainer_config.trained_model_file_path,
+                target_dir_path=os.path.join(FINAL_MODEL_DIR, MODEL_BUNDLE_DIR_NAME)
+            )
 
             model_trainer_artifact = ModelTrainerArtifact(
                 trained_model_file_path=self.model_trainer_config.trained_model_file_path,
@@ -142,22 +183,23 @@ class ModelTrainer:
     
     def initiate_model_trainer(self) -> ModelTrainerArtifact:
         try:
-            train_file_path = self.data_transformation_artifact.transformed_train_file_path
-            test_file_path = self.data_transformation_artifact.transformed_test_file_path
-
-            ## Loading train and test array
-            train_arr = load_numpy_array_data(train_file_path)
-            test_arr = load_numpy_array_data(test_file_path)
-
-            x_train, y_train, x_test, y_test = (
-                train_arr[:, :-1],
-                train_arr[:, -1],
-                test_arr[:, :-1],
-                test_arr[:, -1],
-
-            )
-
-            model_trainer_artifact = self.train_model(x_train, y_train, x_test, y_test)
+            ## features memory-mapped in their compact dtype, each estimator converts what it needs
+            x_train = load_numpy_array_data(self.data_transformation_artifact.transformed_train_file_path, mmap_mode="r")
+            x_test = load_numpy_array_data(self.data_transformation_artifact.transformed_test_file_path, mmap_mode="r")
+
+            ## float labels, the classes the served models have always predicted
+            y_train = load_numpy_array_data(self.data_transformation_artifact.transformed_train_target_file_path).astype(np.float64)
+            y_test = load_numpy_array_data(self.data_transformation_artifact.transformed_test_target_file_path).astype(np.float64)
+
+            ## counts of deduplicated rows, None when every row is its own
+            train_weight_file_path = self.data_transformation_artifact.transformed_train_weight_file_path
+            test_weight_file_path = self.data_transformation_artifact.transformed_test_weight_file_path
+            train_sample_weight = load_numpy_array_data(train_weight_file_path) if train_weight_file_path else None
+            test_sample_weight = load_numpy_array_data(test_weight_file_path) if test_weight_file_path else None
+
+            model_trainer_artifact = self.train_model(x_train, y_train, x_test, y_test,
+                                                      train_sample_weight=train_sample_weight,
+                                                      test_sample_weight=test_sample_weight)
             return model_trainer_artifact
 
 
@@ -19,6 +19,15 @@ SCHEMA_FILE_PATH: str = os.path.join("data_schema", "schema.yaml")
 PREPROCESSING_OBJECT_FILE_NAME: str = "preprocessor.pkl"
 SAVED_MODEL_DIR: str = os.path.join("saved_models")
 MODEL_FILE_NAME: str = "model.pkl"
+FINAL_MODEL_DIR: str = "final_models"
+MODEL_BUNDLE_DIR_NAME: str = "model_bundle"
+
+## storage of the tabular artifacts: "columnar" keeps one .npy per column and is memory-mapped
+## on read, "csv" is the plain format. File names below get the extension of the format.
+ARTIFACT_TABLE_FORMAT: str = "columnar"
+
+## arrays at least this large are stored out-of-line in a model bundle and memory-mapped on load
+MODEL_BUNDLE_ARRAY_MIN_BYTES: int = 64 * 1024
 
 
 """
@@ -32,6 +41,41 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATION: str = 0.2
+## "hash" puts a row in test when the hash of its features falls under the ratio, so a row keeps
+## its side across runs and new rows never move old ones; "random" is a seeded train_test_split
+DATA_INGESTION_SPLIT_MODE: str = "hash"
+DATA_INGESTION_SPLIT_SEED: int = 42
+
+## collection export streams documents in cursor batches of this many rows
+DATA_INGESTION_EXPORT_BATCH_SIZE: int = 2000
+DATA_INGESTION_NA_VALUES: list = ["na"]
+## _id ranges exported at the same time over one client, 1 reads the collection with a single cursor
+DATA_INGESTION_EXPORT_PARTITIONS: int = 4
+
+## feature store shared by all runs, each run appends the documents added since the last one
+DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR: str = os.path.join(ARTIFACT_DIR, "feature_store")
+DATA_INGESTION_FEATURE_STORE_SNAPSHOT_FILE_NAME: str = "snapshot.yaml"
+## runs of partitions smaller than this are merged once there are more than the max of them
+DATA_INGESTION_COMPACTION_MIN_PARTITION_ROWS: int = 50000
+DATA_INGESTION_COMPACTION_MAX_SMALL_PARTITIONS: int = 8
+
+## push_data.py: csv rows per insert_many, concurrent inserts, and where resumable progress is kept
+DATA_INGESTION_BULK_LOAD_CHUNK_SIZE: int = 5000
+DATA_INGESTION_BULK_LOAD_WORKERS: int = 4
+DATA_INGESTION_BULK_LOAD_CHECKPOINT_DIR: str = os.path.join(ARTIFACT_DIR, "bulk_load")
+
+
+"""
+MongoDB client related constant start with MONGO_CLIENT VAR Name
+
+"""
+
+MONGO_CLIENT_MAX_POOL_SIZE: int = 20
+MONGO_CLIENT_MIN_POOL_SIZE: int = 0
+MONGO_CLIENT_MAX_IDLE_TIME_MS: int = 5 * 60 * 1000
+MONGO_CLIENT_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+MONGO_CLIENT_CONNECT_TIMEOUT_MS: int = 10000
+MONGO_CLIENT_SOCKET_TIMEOUT_MS: int = 2 * 60 * 1000
 
 
 """
@@ -44,6 +88,13 @@ DATA_VALIDATION_VALID_DIR: str = "validated"
 DATA_VALIDATION_INVALID_DIR: str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR: str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME: str = "report.yaml"
+## a column drifted when the p-value of this test, "ks" or "chi2", is not above the threshold
+DATA_VALIDATION_DRIFT_TEST: str = "ks"
+DATA_VALIDATION_DRIFT_THRESHOLD: float = 0.05
+## schema validation: rows checked per vectorized block, and the largest share of missing values
+## a column may have before validation fails
+DATA_VALIDATION_CHUNK_SIZE: int = 65536
+DATA_VALIDATION_MAX_NAN_RATE: float = 0.2
 
 
 """
@@ -54,6 +105,16 @@ Data Tranformation related constant start with DATA_TRANSFORMATION VAR Name
 DATA_TRANSFORMATION_DIR: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
 DATA_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
+## the transformed features keep the train/test file names, the targets are saved next to them
+DATA_TRANSFORMATION_TRAIN_TARGET_FILE_NAME: str = "train_target.npy"
+DATA_TRANSFORMATION_TEST_TARGET_FILE_NAME: str = "test_target.npy"
+
+## collapse duplicate rows into unique rows weighted by their count before fitting
+DATA_TRANSFORMATION_DEDUPLICATE: bool = True
+DATA_TRANSFORMATION_TRAIN_WEIGHT_FILE_NAME: str = "train_weight.npy"
+DATA_TRANSFORMATION_TEST_WEIGHT_FILE_NAME: str = "test_weight.npy"
+## value counts of the raw training features, saved with the model as the baseline for live drift
+DATA_TRANSFORMATION_BASELINE_HISTOGRAM_FILE_NAME: str = "baseline_histogram.yaml"
 
 ## KNN imputer to replace nan values
 DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
@@ -61,6 +122,8 @@ DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
     "n_neighbors": 3,
     "weights": "uniform",
 } 
+## threads of the bit-plane imputer, -1 for one per cpu
+DATA_TRANSFORMATION_IMPUTER_N_JOBS: int = -1
 
 
 
@@ -73,4 +136,61 @@ MODEL_TRAINER_DIR_NAME: str = "model_trainer"
 MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
-MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD: float = 0.05
\ No newline at end of file
+MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD: float = 0.05
+## cross validation folds of the model search and its worker processes, -1 for one per cpu
+MODEL_TRAINER_SEARCH_CV_FOLDS: int = 3
+MODEL_TRAINER_SEARCH_N_JOBS: int = -1
+## weight the held out fold scores of the model search by sample_weight. off, the scores are
+## unweighted and sample_weight only goes to fit; GridSearchCV's own choice depends on the installed
+## scikit-learn, benchmarks/model_search_weighting_check.py shows which setting matches it
+MODEL_TRAINER_SEARCH_WEIGHTED_SCORES: bool = False
+## "grid" fits every candidate of every grid, "halving" runs successive halving: all candidates
+## on a small resource (n_estimators when the grid has it, the training rows otherwise), the best
+## 1 / factor of them again on factor times more, up to the full resource
+MODEL_TRAINER_SEARCH_MODE: str = "grid"
+MODEL_TRAINER_SEARCH_HALVING_FACTOR: int = 3
+## budgets of the halving rounds, None for no limit: wall clock seconds, and full fits, where a fit
+## on a third of the rows or with a third of the estimators counts as a third
+MODEL_TRAINER_SEARCH_BUDGET_SECONDS: float = None
+MODEL_TRAINER_SEARCH_BUDGET_FITS: float = None
+## also run the full grid after a halving search and log how its picks score in it
+MODEL_TRAINER_SEARCH_COMPARE_WITH_GRID: bool = False
+
+
+
+"""
+Model Serving related constant start with MODEL_SERVING VAR Name
+
+"""
+
+MODEL_SERVING_RELOAD_INTERVAL_SECONDS: float = 5.0
+
+## deep forests walked in numpy only beat sklearn's cython on small batches,
+## compiled gradient boosting is faster at every batch size (benchmarks/compiled_ensemble_benchmark.py)
+MODEL_SERVING_COMPILED_FOREST_MAX_BATCH_ROWS: int = 512
+
+## lru cache of predictions keyed on the packed feature row, 0 disables it
+MODEL_SERVING_PREDICTION_CACHE_SIZE: int = 100000
+
+## dynamic micro-batching of single-row JSON predictions
+MODEL_SERVING_BATCH_MAX_SIZE: int = 64
+MODEL_SERVING_BATCH_MAX_WAIT_MS: float = 5.0
+MODEL_SERVING_BATCH_STATS_WINDOW: int = 10000
+
+## chunked scoring of uploaded csv files
+MODEL_SERVING_CSV_CHUNK_SIZE: int = 50000
+MODEL_SERVING_HTML_PREVIEW_ROWS: int = 100
+MODEL_SERVING_PREDICTION_COLUMN: str = "predicted_column"
+MODEL_SERVING_PREDICTION_OUTPUT_FILE_PATH: str = os.path.join("predicted_output", "output.csv")
+
+## background training jobs started from the api
+MODEL_SERVING_TRAINING_LOCK_FILE_PATH: str = os.path.join(ARTIFACT_DIR, "training.lock")
+MODEL_SERVING_TRAINING_JOB_HISTORY: int = 50
+
+## live drift: scored rows are counted per time bucket by a background thread every interval,
+## /drift compares each window against the model's baseline histogram
+MODEL_SERVING_DRIFT_BUCKET_SECONDS: int = 60
+MODEL_SERVING_DRIFT_WINDOWS_SECONDS: list = [300, 3600, 86400]
+MODEL_SERVING_DRIFT_AGGREGATE_INTERVAL_SECONDS: float = 1.0
+## scored batches waiting to be counted, the oldest are dropped beyond this
+MODEL_SERVING_DRIFT_MAX_PENDING_BATCHES: int = 10000
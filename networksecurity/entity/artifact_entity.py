@@ -21,6 +21,13 @@ class DataTransformationArtifact:
     transformed_object_file_path: str
     transformed_test_file_path: str
     transformed_train_file_path: str
+    transformed_test_target_file_path: str
+    transformed_train_target_file_path: str
+    ## duplicate counts of the rows, set when the data was deduplicated
+    transformed_train_weight_file_path: str = None
+    transformed_test_weight_file_path: str = None
+    ## value counts of the training features, the baseline live drift is measured against
+    baseline_histogram_file_path: str = None
 
 
 @dataclass
@@ -1,9 +1,7 @@
 from datetime import datetime
 import os
 from networksecurity.constants import training_pipeline
-
-print(training_pipeline.PIPELINE_NAME)
-print(training_pipeline.ARTIFACT_DIR)
+from networksecurity.utils.main_utils.utils import get_table_file_path
 
 
 class TrainingPipelineConfig:
@@ -23,20 +21,33 @@ class DataIngestionConfig:
             training_pipeline_config.artifact_dir, training_pipeline.DATA_INGESTION_DIR_NAME
         )
 
-        self.feature_store_file_path: str = os.path.join(
-            self.data_ingestion_dir, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR, training_pipeline.FILE_NAME
+        self.feature_store_dir: str = training_pipeline.DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR
+
+        self.feature_store_table_format: str = training_pipeline.ARTIFACT_TABLE_FORMAT
+
+        self.feature_store_snapshot_file_path: str = os.path.join(
+            self.data_ingestion_dir, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR,
+            training_pipeline.DATA_INGESTION_FEATURE_STORE_SNAPSHOT_FILE_NAME
         )
 
-        self.training_file_path: str = os.path.join(
+        self.compaction_min_partition_rows: int = training_pipeline.DATA_INGESTION_COMPACTION_MIN_PARTITION_ROWS
+
+        self.compaction_max_small_partitions: int = training_pipeline.DATA_INGESTION_COMPACTION_MAX_SMALL_PARTITIONS
+
+        self.training_file_path: str = get_table_file_path(os.path.join(
             self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TRAIN_FILE_NAME
-        )
+        ), training_pipeline.ARTIFACT_TABLE_FORMAT)
 
-        self.testing_file_path: str = os.path.join(
+        self.testing_file_path: str = get_table_file_path(os.path.join(
             self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TEST_FILE_NAME
-        )
+        ), training_pipeline.ARTIFACT_TABLE_FORMAT)
 
         self.train_test_split_ratio: float = training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATION
 
+        self.split_mode: str = training_pipeline.DATA_INGESTION_SPLIT_MODE
+
+        self.split_seed: int = training_pipeline.DATA_INGESTION_SPLIT_SEED
+
         self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
 
         self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
@@ -49,16 +60,22 @@ class DataValidationConfig:
 
         self.invalid_data_dir: str = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_INVALID_DIR)
 
-        self.valid_train_file_path: str = os.path.join(self.valid_data_dir, training_pipeline.TRAIN_FILE_NAME)
+        self.valid_train_file_path: str = get_table_file_path(os.path.join(self.valid_data_dir, training_pipeline.TRAIN_FILE_NAME), training_pipeline.ARTIFACT_TABLE_FORMAT)
 
-        self.valid_test_file_path: str = os.path.join(self.valid_data_dir, training_pipeline.TEST_FILE_NAME)
+        self.valid_test_file_path: str = get_table_file_path(os.path.join(self.valid_data_dir, training_pipeline.TEST_FILE_NAME), training_pipeline.ARTIFACT_TABLE_FORMAT)
 
-        self.invalid_train_file_path: str = os.path.join(self.invalid_data_dir, training_pipeline.TRAIN_FILE_NAME)
+        self.invalid_train_file_path: str = get_table_file_path(os.path.join(self.invalid_data_dir, training_pipeline.TRAIN_FILE_NAME), training_pipeline.ARTIFACT_TABLE_FORMAT)
 
-        self.invalid_test_file_path: str = os.path.join(self.invalid_data_dir, training_pipeline.TEST_FILE_NAME)
+        self.invalid_test_file_path: str = get_table_file_path(os.path.join(self.invalid_data_dir, training_pipeline.TEST_FILE_NAME), training_pipeline.ARTIFACT_TABLE_FORMAT)
 
         self.drift_report_file_path: str = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_DRIFT_REPORT_DIR, training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME)
 
+        self.drift_test: str = training_pipeline.DATA_VALIDATION_DRIFT_TEST
+
+        self.drift_threshold: float = training_pipeline.DATA_VALIDATION_DRIFT_THRESHOLD
+
+        self.max_nan_rate: float = training_pipeline.DATA_VALIDATION_MAX_NAN_RATE
+
 
 
 class DataTransformationConfig:
@@ -69,16 +86,29 @@ class DataTransformationConfig:
 
         self.transformed_test_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.TEST_FILE_NAME.replace("csv", "npy"))
 
+        self.transformed_train_target_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.DATA_TRANSFORMATION_TRAIN_TARGET_FILE_NAME)
+
+        self.transformed_test_target_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.DATA_TRANSFORMATION_TEST_TARGET_FILE_NAME)
+
         self.transformed_object_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMED_OBJECT_DIR,
             training_pipeline.PREPROCESSING_OBJECT_FILE_NAME,)
 
+        self.deduplicate: bool = training_pipeline.DATA_TRANSFORMATION_DEDUPLICATE
+
+        self.transformed_train_weight_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.DATA_TRANSFORMATION_TRAIN_WEIGHT_FILE_NAME)
+
+        self.transformed_test_weight_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.DATA_TRANSFORMATION_TEST_WEIGHT_FILE_NAME)
+
+        self.baseline_histogram_file_path: str = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_BASELINE_HISTOGRAM_FILE_NAME)
+
 
 
 class ModelTrainerConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
         self.model_trainer_dir: str = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.MODEL_TRAINER_DIR_NAME)
 
-        self.trained_model_file_path: str = os.path.join(self.model_trainer_dir, training_pipeline.MODEL_TRAINER_TRAINED_MODEL_DIR, training_pipeline.MODEL_FILE_NAME)
+        ## a model bundle directory, see networksecurity/utils/ml_utils/model/model_bundle.py
+        self.trained_model_file_path: str = os.path.join(self.model_trainer_dir, training_pipeline.MODEL_TRAINER_TRAINED_MODEL_DIR, training_pipeline.MODEL_BUNDLE_DIR_NAME)
 
         self.expected_accuracy: float = training_pipeline.MODEL_TRAINER_EXPECTED_SCORE
 
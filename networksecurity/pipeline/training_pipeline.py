@@ -27,8 +27,15 @@ from networksecurity.entity.artifact_entity import (
 
 
 class TrainingPipeline:
-    def __init__(self):
+    def __init__(self, progress_callback=None):
         self.training_pipeline_config = TrainingPipelineConfig()
+        self.progress_callback = progress_callback
+
+
+    def report_progress(self, stage: str):
+        logging.info(f"Training pipeline stage: {stage}")
+        if self.progress_callback is not None:
+            self.progress_callback(stage)
 
     def start_data_ingestion(self):
         try:
@@ -85,9 +92,13 @@ class TrainingPipeline:
 
     def run_pipeline(self):
         try:
+            self.report_progress("data_ingestion")
             data_ingestion_artifact = self.start_data_ingestion()
+            self.report_progress("data_validation")
             data_validation_artifact = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
+            self.report_progress("data_transformation")
             data_transformation_artifact = self.start_data_transformation(data_validation_artifact=data_validation_artifact)
+            self.report_progress("model_training")
             model_trainer_artifact = self.start_model_training(data_transformation_artifact=data_transformation_artifact)
             return model_trainer_artifact
         
@@ -0,0 +1,123 @@
+import os
+import sys
+from typing import IO, Iterator
+
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    MODEL_SERVING_CSV_CHUNK_SIZE,
+    MODEL_SERVING_PREDICTION_COLUMN
+)
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.main_utils.schema_validator import SchemaValidator, SchemaValidationError
+
+
+def iter_scored_chunks(network_model: NetworkModel, file_obj: IO,
+                       chunksize: int = MODEL_SERVING_CSV_CHUNK_SIZE, drift_monitor=None) -> Iterator[pd.DataFrame]:
+    """
+    Read a csv upload chunk by chunk and yield each chunk with its predictions appended.
+    Scored chunks are handed to the drift monitor, when given, to be counted later.
+    """
+    try:
+        total_rows = 0
+        for chunk in pd.read_csv(file_obj, chunksize=chunksize):
+            chunk[MODEL_SERVING_PREDICTION_COLUMN] = network_model.predict(chunk)
+            if drift_monitor is not None:
+                drift_monitor.record(chunk)
+            total_rows += len(chunk)
+            yield chunk
+
+        logging.info(f"Scored {total_rows} uploaded rows in chunks of {chunksize}")
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def check_csv(file_obj: IO, schema_validator: SchemaValidator, chunksize: int = MODEL_SERVING_CSV_CHUNK_SIZE):
+    """
+    Check a whole csv upload against the schema, chunk by chunk, and rewind it, so the model
+    never scores part of an upload that is then rejected. Raises SchemaValidationError with
+    the errors of every bad chunk, rows numbered from the start of the file.
+    """
+    errors = []
+    try:
+        ## closing the reader detaches it from the upload, which stays open to be scored
+        with pd.read_csv(file_obj, chunksize=chunksize) as reader:
+            for chunk in reader:
+                errors.extend(schema_validator.validate(chunk).errors)
+                ## the columns are the same in every chunk, one report of them is enough
+                if schema_validator.check_columns(chunk.columns):
+                    break
+        file_obj.seek(0)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+    if errors:
+        raise SchemaValidationError(errors)
+
+
+def iter_csv(chunks: Iterator[pd.DataFrame]) -> Iterator[str]:
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header)
+        header = False
+
+
+def iter_ndjson(chunks: Iterator[pd.DataFrame]) -> Iterator[str]:
+    for chunk in chunks:
+        if len(chunk):
+            ## older pandas versions leave off the trailing newline
+            yield chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n"
+
+
+class ChunkedPredictionWriter:
+    """
+    Appends scored chunks to the prediction output csv while keeping
+    only the first preview_rows rows in memory for the html table.
+    """
+
+    def __init__(self, output_file_path: str, preview_rows: int):
+        self.output_file_path = output_file_path
+        self.preview_rows = preview_rows
+        self.total_rows = 0
+        self._preview = []
+        self._preview_size = 0
+
+    def write(self, chunk: pd.DataFrame):
+        try:
+            if self.total_rows == 0:
+                os.makedirs(os.path.dirname(self.output_file_path), exist_ok=True)
+                chunk.to_csv(self.output_file_path)
+            else:
+                chunk.to_csv(self.output_file_path, mode="a", header=False)
+
+            if self._preview_size < self.preview_rows:
+                head = chunk.iloc[:self.preview_rows - self._preview_size]
+                self._preview.append(head)
+                self._preview_size += len(head)
+
+            self.total_rows += len(chunk)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def preview(self) -> pd.DataFrame:
+        if not self._preview:
+            return pd.DataFrame()
+        return pd.concat(self._preview)
+
+
+def write_scored_chunks(network_model: NetworkModel, file_obj: IO, writer: ChunkedPredictionWriter,
+                        chunksize: int = MODEL_SERVING_CSV_CHUNK_SIZE, drift_monitor=None) -> ChunkedPredictionWriter:
+    """Score a csv upload chunk by chunk into the writer; blocking, run it off the event loop."""
+    try:
+        for chunk in iter_scored_chunks(network_model, file_obj, chunksize=chunksize, drift_monitor=drift_monitor):
+            writer.write(chunk)
+        return writer
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,215 @@
+import sys
+import time
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    DATA_VALIDATION_DRIFT_TEST,
+    DATA_VALIDATION_DRIFT_THRESHOLD,
+    MODEL_SERVING_DRIFT_BUCKET_SECONDS,
+    MODEL_SERVING_DRIFT_WINDOWS_SECONDS,
+    MODEL_SERVING_DRIFT_AGGREGATE_INTERVAL_SECONDS,
+    MODEL_SERVING_DRIFT_MAX_PENDING_BATCHES
+)
+from networksecurity.serving.model_registry import ModelRegistry
+from networksecurity.utils.ml_utils.metric.drift_metric import counts_drift_report
+
+
+class DriftMonitor:
+    """
+    Value counts of the rows the api scores, compared against the baseline histogram saved
+    with the served model using the statistics of DataValidation.
+
+    Scoring only appends the scored rows to a bounded queue. A background thread drains it
+    every aggregate_interval seconds and counts the rows into time buckets of bucket_seconds,
+    one bincount per bucket; a window is the sum of its most recent buckets. Values the
+    baseline never saw are counted with the missing values. A new model starts the counts
+    over, and every api worker process counts only its own traffic.
+    """
+
+    def __init__(self, model_registry: ModelRegistry,
+                 bucket_seconds: int = MODEL_SERVING_DRIFT_BUCKET_SECONDS,
+                 windows_seconds: list = MODEL_SERVING_DRIFT_WINDOWS_SECONDS,
+                 aggregate_interval: float = MODEL_SERVING_DRIFT_AGGREGATE_INTERVAL_SECONDS,
+                 max_pending_batches: int = MODEL_SERVING_DRIFT_MAX_PENDING_BATCHES,
+                 threshold: float = DATA_VALIDATION_DRIFT_THRESHOLD,
+                 test: str = DATA_VALIDATION_DRIFT_TEST):
+        try:
+            self.model_registry = model_registry
+            self.bucket_seconds = bucket_seconds
+            self.windows_seconds = sorted(windows_seconds)
+            self.aggregate_interval = aggregate_interval
+            self.threshold = threshold
+            self.test = test
+
+            ## deque appends and pops are atomic, the scoring paths never take a lock
+            self._pending = deque(maxlen=max_pending_batches)
+            self._lock = threading.Lock()
+            self._model_version = None
+            self._baseline: dict = None
+            self._baseline_counts: np.ndarray = None
+            self._buckets = deque()
+            self._rows_counted = 0
+            self._stop_event = threading.Event()
+            self._worker: threading.Thread = None
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def record(self, rows):
+        """Queue scored rows, a DataFrame or a list of feature dicts, to be counted later."""
+        self._pending.append((time.time(), rows))
+
+
+    def _refresh_baseline(self):
+        version, baseline = self.model_registry.get_baseline_histogram()
+        if version == self._model_version:
+            return
+        self._model_version = version
+        self._baseline = baseline
+        self._baseline_counts = None if baseline is None else np.asarray(baseline["counts"], dtype=np.int64)
+        self._buckets.clear()
+        self._rows_counted = 0
+        if baseline is not None:
+            logging.info(f"Drift monitor counting live traffic against the baseline of model version {version}")
+
+
+    def _to_values(self, rows) -> np.ndarray:
+        columns = self._baseline["columns"]
+        if isinstance(rows, pd.DataFrame):
+            dataframe = rows.reindex(columns=columns)
+        else:
+            dataframe = pd.DataFrame.from_records(rows, columns=columns)
+        try:
+            return dataframe.to_numpy(dtype=np.float64, na_value=np.nan)
+        except (TypeError, ValueError):
+            return dataframe.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+    def _count(self, values: np.ndarray) -> np.ndarray:
+        low, n_values = self._baseline["low"], self._baseline["n_values"]
+        n_columns = values.shape[1]
+        codes = values - low
+        known = (codes >= 0) & (codes < n_values) & (codes == np.floor(codes))
+        codes = np.where(known, codes, n_values).astype(np.intp)
+        ## column j's bins start at j * (n_values + 1), as in drift_metric.value_counts
+        codes += np.arange(n_columns, dtype=np.intp) * (n_values + 1)
+        return np.bincount(codes.ravel(), minlength=n_columns * (n_values + 1)).reshape(n_columns, n_values + 1)
+
+
+    def flush(self):
+        """Count everything queued so far, what the background thread does every interval."""
+        try:
+            with self._lock:
+                self._refresh_baseline()
+
+                ## per bucket the scored DataFrames and, joined into one list, the JSON feature dicts
+                batches = {}
+                while True:
+                    try:
+                        recorded_at, rows = self._pending.popleft()
+                    except IndexError:
+                        break
+                    if self._baseline is not None and len(rows):
+                        bucket_start = int(recorded_at // self.bucket_seconds) * self.bucket_seconds
+                        frames, records = batches.setdefault(bucket_start, ([], []))
+                        if isinstance(rows, pd.DataFrame):
+                            frames.append(rows)
+                        else:
+                            records.extend(rows)
+
+                for bucket_start in sorted(batches):
+                    frames, records = batches[bucket_start]
+                    if records:
+                        frames.append(records)
+                    values = np.concatenate([self._to_values(rows) for rows in frames])
+                    counts = self._count(values)
+                    if self._buckets and self._buckets[-1][0] == bucket_start:
+                        self._buckets[-1][1] += counts
+                    else:
+                        self._buckets.append([bucket_start, counts])
+                    self._rows_counted += len(values)
+
+                oldest = time.time() - self.windows_seconds[-1] - self.bucket_seconds
+                while self._buckets and self._buckets[0][0] < oldest:
+                    self._buckets.popleft()
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def _run(self):
+        while not self._stop_event.wait(self.aggregate_interval):
+            try:
+                self.flush()
+            except NetworkSecurityException as e:
+                logging.error(f"Drift monitor failed to count live traffic: {e}")
+
+
+    def start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._worker.start()
+        logging.info(f"Drift monitor counting live traffic every {self.aggregate_interval}s")
+
+
+    def stop(self):
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+
+    def report(self) -> dict:
+        """Drift of every window against the baseline, None when the served model has no baseline."""
+        try:
+            self.flush()
+            with self._lock:
+                if self._baseline is None:
+                    return None
+                now = time.time()
+                window_counts = {}
+                for window_seconds in self.windows_seconds:
+                    ## a bucket belongs to the window once it ends inside it
+                    buckets = [counts for bucket_start, counts in self._buckets
+                               if bucket_start + self.bucket_seconds > now - window_seconds]
+                    window_counts[window_seconds] = sum(buckets) if buckets else None
+                columns = self._baseline["columns"]
+                baseline_counts = self._baseline_counts
+                report = {
+                    "model_version": self._model_version,
+                    "baseline_rows": int(baseline_counts[0].sum()),
+                    "rows_counted": self._rows_counted,
+                    "pending_batches": len(self._pending),
+                    "bucket_seconds": self.bucket_seconds,
+                    "test": self.test,
+                    "threshold": self.threshold,
+                    "windows": {}
+                }
+
+            for window_seconds, counts in window_counts.items():
+                if counts is None:
+                    report["windows"][f"{window_seconds}s"] = {"rows": 0, "drift_status": None}
+                    continue
+                columns_report, status = counts_drift_report(columns, baseline_counts, counts,
+                                                             self.threshold, self.test)
+                report["windows"][f"{window_seconds}s"] = {
+                    "rows": int(counts[0].sum()),
+                    ## True when some column drifted, as in the drift report of DataValidation
+                    "drift_status": not status,
+                    "drifted_columns": [column for column, entry in columns_report.items() if entry["drift_status"]],
+                    "columns": columns_report
+                }
+            return report
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,224 @@
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    FINAL_MODEL_DIR,
+    MODEL_FILE_NAME,
+    MODEL_BUNDLE_DIR_NAME,
+    PREPROCESSING_OBJECT_FILE_NAME,
+    MODEL_SERVING_RELOAD_INTERVAL_SECONDS,
+    MODEL_SERVING_PREDICTION_CACHE_SIZE
+)
+from networksecurity.utils.main_utils.utils import load_object
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model.model_bundle import ModelBundle, MANIFEST_FILE_NAME
+
+
+@dataclass
+class LoadedModel:
+    network_model: NetworkModel
+    model_name: str
+    manifest: dict
+    version: int
+    fingerprint: tuple
+    loaded_at: str
+    baseline_histogram: dict = None
+
+
+class ModelRegistry:
+    """
+    Holds the NetworkModel served by the app.
+
+    The model is loaded once and every request reads the current reference.
+    A reload builds the new NetworkModel fully before swapping the reference, so
+    requests that already picked up the old model finish on it undisturbed.
+    Every loaded model gets its own prediction cache, so a swap also invalidates it.
+
+    The model is read from the bundle the trainer publishes, whose arrays are mapped
+    read-only so every api worker serves from the same pages. Without a bundle the
+    registry falls back to a preprocessor.pkl and model.pkl pair.
+    """
+
+    def __init__(self, model_dir: str = FINAL_MODEL_DIR,
+                 reload_interval: float = MODEL_SERVING_RELOAD_INTERVAL_SECONDS,
+                 cache_size: int = MODEL_SERVING_PREDICTION_CACHE_SIZE):
+        try:
+            self.model_dir = model_dir
+            self.bundle_dir_path = os.path.join(model_dir, MODEL_BUNDLE_DIR_NAME)
+            self.manifest_file_path = os.path.join(self.bundle_dir_path, MANIFEST_FILE_NAME)
+            self.preprocessor_file_path = os.path.join(model_dir, PREPROCESSING_OBJECT_FILE_NAME)
+            self.model_file_path = os.path.join(model_dir, MODEL_FILE_NAME)
+            self.reload_interval = reload_interval
+            self.cache_size = cache_size
+
+            self._current: LoadedModel = None
+            self._load_lock = threading.Lock()
+            self._pending_fingerprint = None
+            self._stop_event = threading.Event()
+            self._watcher: threading.Thread = None
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def _fingerprint(self) -> tuple:
+        ## a bundle is replaced as a whole directory, its manifest is always a new file
+        if os.path.exists(self.manifest_file_path):
+            stat = os.stat(self.manifest_file_path)
+            return ((stat.st_ino, stat.st_mtime_ns, stat.st_size),)
+
+        fingerprint = []
+        for file_path in (self.preprocessor_file_path, self.model_file_path):
+            stat = os.stat(file_path)
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+
+    def get_model(self) -> NetworkModel:
+        try:
+            current = self._current
+            if current is None:
+                raise Exception(f"No model has been loaded from: {self.model_dir}")
+            return current.network_model
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def get_baseline_histogram(self) -> tuple:
+        """(model version, its baseline histogram), (None, None) before a model is loaded."""
+        current = self._current
+        if current is None:
+            return None, None
+        return current.version, current.baseline_histogram
+
+
+    def _load(self):
+        """
+        The NetworkModel to serve, its model name, the bundle manifest and the baseline
+        histogram (both None for pickles).
+        """
+        if os.path.exists(self.manifest_file_path):
+            model_bundle = ModelBundle(self.bundle_dir_path)
+            network_model = model_bundle.load_network_model()
+            return (network_model, model_bundle.manifest.get("model_name"), model_bundle.manifest,
+                    model_bundle.load_baseline_histogram())
+
+        preprocessor = load_object(self.preprocessor_file_path)
+        model = load_object(self.model_file_path)
+        network_model = NetworkModel(preprocessor=preprocessor, model=model)
+        network_model.compile()
+        network_model.compile_imputer()
+        return network_model, type(model).__name__, None, None
+
+
+    def reload(self, force: bool = True) -> bool:
+        """Load the model files and swap them in. Returns False if nothing changed."""
+        try:
+            with self._load_lock:
+                fingerprint = self._fingerprint()
+                if not force and self._current is not None and self._current.fingerprint == fingerprint:
+                    return False
+
+                network_model, model_name, manifest, baseline_histogram = self._load()
+                if self.cache_size > 0:
+                    network_model.enable_cache(max_size=self.cache_size)
+
+                ## training may still be writing the files, keep the old model in that case
+                if self._fingerprint() != fingerprint:
+                    raise Exception(f"Model files in {self.model_dir} changed while loading")
+
+                version = 1 if self._current is None else self._current.version + 1
+                self._current = LoadedModel(
+                    network_model=network_model,
+                    model_name=model_name,
+                    manifest=manifest,
+                    version=version,
+                    fingerprint=fingerprint,
+                    loaded_at=datetime.now().isoformat(),
+                    baseline_histogram=baseline_histogram
+                )
+                self._pending_fingerprint = None
+                logging.info(f"Loaded model version {version} from "
+                             f"{self.bundle_dir_path if manifest is not None else self.model_dir}")
+                return True
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def poll(self) -> bool:
+        """
+        Reload if the files changed and have stayed unchanged since the previous poll.
+        Waiting for one stable poll avoids pairing a new preprocessor with an old model.
+        """
+        try:
+            fingerprint = self._fingerprint()
+        except OSError:
+            return False
+
+        current = self._current
+        if current is not None and current.fingerprint == fingerprint:
+            self._pending_fingerprint = None
+            return False
+
+        if self._pending_fingerprint != fingerprint:
+            self._pending_fingerprint = fingerprint
+            return False
+
+        try:
+            return self.reload(force=False)
+        except NetworkSecurityException as e:
+            logging.error(f"Model reload failed, serving previous version: {e}")
+            return False
+
+
+    def _watch(self):
+        while not self._stop_event.wait(self.reload_interval):
+            self.poll()
+
+
+    def start_watcher(self):
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+        logging.info(f"Watching {self.model_dir} for model changes every {self.reload_interval}s")
+
+
+    def stop_watcher(self):
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+    def status(self) -> dict:
+        current = self._current
+        if current is None:
+            return {"loaded": False, "model_dir": self.model_dir}
+
+        manifest = current.manifest or {}
+        return {
+            "loaded": True,
+            "model_dir": self.model_dir,
+            "version": current.version,
+            "loaded_at": current.loaded_at,
+            "model": current.model_name,
+            "format": "bundle" if current.manifest is not None else "pickle",
+            "trained_at": manifest.get("trained_at"),
+            "schema_hash": manifest.get("schema_hash"),
+            "metrics": manifest.get("metrics"),
+            "compiled": current.network_model.compiled_model is not None,
+            "fast_imputer": getattr(current.network_model, "fast_imputer", None) is not None,
+            "drift_baseline": current.baseline_histogram is not None,
+            "prediction_cache": (current.network_model.prediction_cache.stats()
+                                 if current.network_model.prediction_cache is not None else None)
+        }
@@ -0,0 +1,191 @@
+import sys
+import time
+import asyncio
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    MODEL_SERVING_BATCH_MAX_SIZE,
+    MODEL_SERVING_BATCH_MAX_WAIT_MS,
+    MODEL_SERVING_BATCH_STATS_WINDOW
+)
+from networksecurity.serving.model_registry import ModelRegistry
+
+
+class PredictionBatcher:
+    """
+    Gathers single-row prediction requests into one NetworkModel.predict call.
+
+    A batch is closed when it reaches max_batch_size rows or when the oldest
+    row has waited max_wait_ms. The batch is scored in the default executor so
+    the event loop keeps accepting requests while the model runs.
+    """
+
+    def __init__(self, model_registry: ModelRegistry,
+                 max_batch_size: int = MODEL_SERVING_BATCH_MAX_SIZE,
+                 max_wait_ms: float = MODEL_SERVING_BATCH_MAX_WAIT_MS,
+                 stats_window: int = MODEL_SERVING_BATCH_STATS_WINDOW,
+                 drift_monitor=None):
+        try:
+            if max_batch_size < 1:
+                raise Exception(f"max_batch_size must be at least 1, got {max_batch_size}")
+
+            self.model_registry = model_registry
+            self.max_batch_size = max_batch_size
+            self.max_wait_seconds = max_wait_ms / 1000.0
+            self.drift_monitor = drift_monitor
+
+            self._queue: asyncio.Queue = None
+            self._worker: asyncio.Task = None
+
+            self._latencies_ms = deque(maxlen=stats_window)
+            self._batch_sizes = deque(maxlen=stats_window)
+            self._total_requests = 0
+            self._total_batches = 0
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    async def start(self):
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logging.info(f"Prediction batcher started: max_batch_size={self.max_batch_size}, "
+                     f"max_wait_ms={self.max_wait_seconds * 1000.0}")
+
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        ## fail whatever is still queued instead of leaving callers hanging
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(Exception("Prediction batcher stopped"))
+
+
+    async def predict(self, features: dict):
+        if self._worker is None:
+            raise Exception("Prediction batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future, time.perf_counter()))
+        return await future
+
+
+    async def _collect_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_seconds
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        ## rows that queued up while the previous batch was scored ride along for free
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._score_batch(batch)
+            except Exception as e:
+                logging.error(f"Prediction batch failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+    @staticmethod
+    def _predict_rows(network_model, rows: list) -> np.ndarray:
+        columns = getattr(network_model.preprocessor, "feature_names_in_", None)
+        dataframe = pd.DataFrame(rows, columns=columns)
+        return network_model.predict(dataframe)
+
+
+    async def _score_batch(self, batch: list):
+        loop = asyncio.get_running_loop()
+        network_model = self.model_registry.get_model()
+        rows = [features for features, _, _ in batch]
+
+        try:
+            y_pred = await loop.run_in_executor(None, self._predict_rows, network_model, rows)
+            results = [(value, None) for value in y_pred]
+        except Exception:
+            ## one malformed row must not fail the other callers in its batch
+            results = []
+            for row in rows:
+                try:
+                    y_row = await loop.run_in_executor(None, self._predict_rows, network_model, [row])
+                    results.append((y_row[0], None))
+                except Exception as e:
+                    results.append((None, e))
+
+        ## only rows the model scored count as live traffic, as in iter_scored_chunks
+        if self.drift_monitor is not None:
+            scored_rows = [row for row, (_, error) in zip(rows, results) if error is None]
+            if scored_rows:
+                self.drift_monitor.record(scored_rows)
+
+        finished = time.perf_counter()
+        for (_, future, enqueued), (value, error) in zip(batch, results):
+            self._latencies_ms.append((finished - enqueued) * 1000.0)
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value.item() if hasattr(value, "item") else value)
+
+        self._batch_sizes.append(len(batch))
+        self._total_requests += len(batch)
+        self._total_batches += 1
+
+
+    def stats(self) -> dict:
+        latencies = np.fromiter(self._latencies_ms, dtype=float)
+        batch_sizes = np.fromiter(self._batch_sizes, dtype=float)
+
+        stats = {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_seconds * 1000.0,
+            "total_requests": self._total_requests,
+            "total_batches": self._total_batches,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0
+        }
+        if latencies.size:
+            stats.update({
+                "latency_p50_ms": float(np.percentile(latencies, 50)),
+                "latency_p99_ms": float(np.percentile(latencies, 99))
+            })
+        if batch_sizes.size:
+            stats.update({
+                "batch_size_mean": float(batch_sizes.mean()),
+                "batch_size_p50": float(np.percentile(batch_sizes, 50)),
+                "batch_size_p99": float(np.percentile(batch_sizes, 99))
+            })
+        return stats
@@ -0,0 +1,198 @@
+import os
+import sys
+import uuid
+import queue
+import threading
+import multiprocessing
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    MODEL_SERVING_TRAINING_LOCK_FILE_PATH,
+    MODEL_SERVING_TRAINING_JOB_HISTORY
+)
+
+try:
+    import fcntl
+except ImportError:  ## windows has no flock, only the in-process check applies
+    fcntl = None
+
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_REJECTED = "rejected"
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    status: str = JOB_PENDING
+    stage: str = None
+    stages_completed: list = field(default_factory=list)
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: str = None
+    finished_at: str = None
+    result: dict = None
+    error: str = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED, JOB_REJECTED)
+
+
+def run_training_pipeline(progress_callback) -> dict:
+    ## imported here so the api process never loads the training stack
+    from networksecurity.pipeline.training_pipeline import TrainingPipeline
+
+    training_pipeline = TrainingPipeline(progress_callback=progress_callback)
+    model_trainer_artifact = training_pipeline.run_pipeline()
+    return asdict(model_trainer_artifact)
+
+
+def _training_job_worker(target, lock_file_path: str, event_queue):
+    """Entry point of the training process, reports back through event_queue."""
+    lock_file = None
+    try:
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(lock_file_path), exist_ok=True)
+            lock_file = open(lock_file_path, "w")
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                event_queue.put((JOB_REJECTED, "Another training run is already in progress"))
+                return
+
+        event_queue.put((JOB_RUNNING, None))
+        result = target(lambda stage: event_queue.put(("stage", stage)))
+        event_queue.put((JOB_SUCCEEDED, result))
+
+    except Exception as e:
+        event_queue.put((JOB_FAILED, str(e)))
+
+    finally:
+        ## closing the file releases the flock, it is also released if the process dies
+        if lock_file is not None:
+            lock_file.close()
+
+
+class TrainingJobManager:
+    """
+    Runs the training pipeline in a separate process so the api event loop stays free.
+
+    Only one job runs at a time. Within this process a second submit returns the
+    active job, and across api workers the training process holds a file lock.
+    """
+
+    def __init__(self, target=run_training_pipeline, on_success=None,
+                 lock_file_path: str = MODEL_SERVING_TRAINING_LOCK_FILE_PATH,
+                 history: int = MODEL_SERVING_TRAINING_JOB_HISTORY):
+        try:
+            self.target = target
+            self.on_success = on_success
+            self.lock_file_path = lock_file_path
+            self.history = history
+
+            self._context = multiprocessing.get_context("spawn")
+            self._jobs = OrderedDict()
+            self._lock = threading.Lock()
+            self._active_job: TrainingJob = None
+            self._active_process = None
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def submit(self):
+        """Start a training job. Returns (job, created), created is False if a job was already active."""
+        try:
+            with self._lock:
+                if self._active_job is not None and not self._active_job.finished:
+                    return self._active_job, False
+
+                job = TrainingJob(job_id=uuid.uuid4().hex)
+                event_queue = self._context.Queue()
+                process = self._context.Process(
+                    target=_training_job_worker,
+                    args=(self.target, self.lock_file_path, event_queue),
+                    name=f"training-job-{job.job_id}",
+                    daemon=False
+                )
+                process.start()
+
+                self._jobs[job.job_id] = job
+                while len(self._jobs) > self.history:
+                    self._jobs.popitem(last=False)
+                self._active_job = job
+                self._active_process = process
+
+            threading.Thread(target=self._monitor, args=(job, process, event_queue),
+                             name=f"training-job-monitor-{job.job_id}", daemon=True).start()
+            logging.info(f"Submitted training job {job.job_id}")
+            return job, True
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def _monitor(self, job: TrainingJob, process, event_queue):
+        while not job.finished:
+            try:
+                event, payload = event_queue.get(timeout=1.0)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                ## the process died without reporting, e.g. killed by the oom killer
+                process.join()
+                job.status = JOB_FAILED
+                job.error = f"Training process exited with code {process.exitcode}"
+                job.finished_at = datetime.now().isoformat()
+                continue
+
+            if event == "stage":
+                if job.stage is not None:
+                    job.stages_completed.append(job.stage)
+                job.stage = payload
+            elif event == JOB_RUNNING:
+                job.status = JOB_RUNNING
+                job.started_at = datetime.now().isoformat()
+            else:
+                if event == JOB_SUCCEEDED:
+                    if job.stage is not None:
+                        job.stages_completed.append(job.stage)
+                    job.result = payload
+                else:
+                    job.error = payload
+                job.finished_at = datetime.now().isoformat()
+                job.status = event
+
+        process.join()
+        logging.info(f"Training job {job.job_id} finished with status {job.status}")
+
+        if job.status == JOB_SUCCEEDED and self.on_success is not None:
+            try:
+                self.on_success(job)
+            except Exception as e:
+                logging.error(f"Post-training hook failed for job {job.job_id}: {e}")
+
+
+    def get_job(self, job_id: str) -> TrainingJob:
+        return self._jobs.get(job_id)
+
+
+    def list_jobs(self) -> list:
+        return list(self._jobs.values())
+
+
+    def shutdown(self):
+        with self._lock:
+            process = self._active_process
+            if process is not None and process.is_alive():
+                logging.warning(f"Terminating training job {self._active_job.job_id} on shutdown")
+                process.terminate()
+                process.join()
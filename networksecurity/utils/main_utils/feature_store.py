@@ -0,0 +1,194 @@
+import os
+import sys
+import shutil
+
+import pandas as pd
+from bson import ObjectId
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.utils.main_utils.utils import (
+    read_yaml_file,
+    write_yaml_file,
+    get_table_file_path,
+    save_table,
+    load_table
+)
+from networksecurity.utils.mongo_utils.collection_export import export_collection_partitioned
+
+
+MANIFEST_FILE_NAME = "manifest.yaml"
+PARTITION_DIR_NAME = "partitions"
+
+
+class FeatureStore:
+    """
+    Append-only store of the exported collection, shared by all training runs.
+
+    Every sync pulls only the documents whose _id is above the stored high-water mark and
+    writes them as a new partition. manifest.yaml lists the partitions in _id order with the
+    watermark, and is replaced in one step after the partition file is in place, so a failed
+    sync leaves the store as it was. Runs of small partitions are merged by compact().
+
+    The collection is taken to be append-only with increasing _id: updated or deleted
+    documents are not seen again, call rebuild() after changing existing data.
+    """
+
+    def __init__(self, feature_store_dir: str, database_name: str, collection_name: str, table_format: str = "csv"):
+        try:
+            self.feature_store_dir = feature_store_dir
+            self.table_format = table_format
+            self.partition_dir = os.path.join(feature_store_dir, PARTITION_DIR_NAME)
+            self.manifest_file_path = os.path.join(feature_store_dir, MANIFEST_FILE_NAME)
+            self.source = f"{database_name}.{collection_name}"
+
+            if os.path.exists(self.manifest_file_path):
+                self.manifest = read_yaml_file(self.manifest_file_path)
+                if self.manifest["source"] != self.source:
+                    raise Exception(f"Feature store {feature_store_dir} holds {self.manifest['source']}, "
+                                    f"not {self.source}")
+            else:
+                self.manifest = {"source": self.source, "watermark": None, "next_partition": 0, "partitions": []}
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    @property
+    def watermark(self):
+        watermark = self.manifest["watermark"]
+        return ObjectId(watermark) if watermark is not None else None
+
+
+    @property
+    def n_rows(self) -> int:
+        return sum(partition["rows"] for partition in self.manifest["partitions"])
+
+
+    def _save_manifest(self, manifest: dict):
+        tmp_file_path = f"{self.manifest_file_path}.tmp-{os.getpid()}"
+        write_yaml_file(tmp_file_path, manifest)
+        os.replace(tmp_file_path, self.manifest_file_path)
+        self.manifest = manifest
+
+
+    def _write_partition(self, dataframe: pd.DataFrame, manifest: dict) -> dict:
+        ## the file is only referenced once a new manifest lists it
+        file_name = get_table_file_path(f"part-{manifest['next_partition']:06d}", self.table_format)
+        manifest["next_partition"] += 1
+        save_table(os.path.join(self.partition_dir, file_name), dataframe)
+        return {"file_name": file_name, "rows": len(dataframe)}
+
+
+    def sync(self, collection, column_dtypes: dict, n_partitions: int, batch_size: int, na_values: list) -> int:
+        """Append the documents added to the collection since the last sync. Returns the number of new rows."""
+        try:
+            latest = collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+            watermark = self.watermark
+            if latest is None or (watermark is not None and latest["_id"] <= watermark):
+                logging.info(f"Feature store is up to date with {self.source} at {watermark}")
+                return 0
+
+            ## documents above the old watermark and up to the newest one seen now,
+            ## anything inserted while exporting is picked up by the next sync
+            id_range = {"$lte": latest["_id"]}
+            if watermark is not None:
+                id_range["$gt"] = watermark
+            column_arrays = export_collection_partitioned(
+                collection=collection,
+                column_dtypes=column_dtypes,
+                n_partitions=n_partitions,
+                batch_size=batch_size,
+                na_values=na_values,
+                query={"_id": id_range}
+            )
+
+            manifest = dict(self.manifest, partitions=list(self.manifest["partitions"]))
+            if column_arrays.n_rows:
+                manifest["partitions"].append(self._write_partition(column_arrays.to_dataframe(), manifest))
+            manifest["watermark"] = str(latest["_id"])
+            self._save_manifest(manifest)
+
+            logging.info(f"Appended {column_arrays.n_rows} rows from {self.source} to the feature store, "
+                         f"watermark {manifest['watermark']}")
+            return column_arrays.n_rows
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def compact(self, min_partition_rows: int, max_small_partitions: int) -> int:
+        """
+        Once more than max_small_partitions partitions hold fewer than min_partition_rows rows,
+        merge every run of neighbouring small partitions into one, keeping _id order.
+        Returns the number of partitions removed.
+        """
+        try:
+            partitions = self.manifest["partitions"]
+            if sum(partition["rows"] < min_partition_rows for partition in partitions) <= max_small_partitions:
+                return 0
+
+            manifest = dict(self.manifest, partitions=[])
+            merged_file_names = []
+            run = []
+            for partition in partitions + [None]:
+                if partition is not None and partition["rows"] < min_partition_rows:
+                    run.append(partition)
+                    continue
+                if len(run) > 1:
+                    dataframe = pd.concat([self._read_partition(part) for part in run], ignore_index=True)
+                    manifest["partitions"].append(self._write_partition(dataframe, manifest))
+                    merged_file_names.extend(part["file_name"] for part in run)
+                else:
+                    manifest["partitions"].extend(run)
+                run = []
+                if partition is not None:
+                    manifest["partitions"].append(partition)
+
+            self._save_manifest(manifest)
+            for file_name in merged_file_names:
+                self._remove_partition(file_name)
+
+            removed = len(partitions) - len(manifest["partitions"])
+            logging.info(f"Compacted the feature store from {len(partitions)} to {len(manifest['partitions'])} partitions")
+            return removed
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def _remove_partition(self, file_name: str):
+        file_path = os.path.join(self.partition_dir, file_name)
+        if os.path.isdir(file_path):
+            shutil.rmtree(file_path)
+        else:
+            os.remove(file_path)
+
+
+    def _read_partition(self, partition: dict) -> pd.DataFrame:
+        return load_table(os.path.join(self.partition_dir, partition["file_name"]))
+
+
+    def read(self) -> pd.DataFrame:
+        """All rows of the store, in _id order."""
+        try:
+            partitions = self.manifest["partitions"]
+            if not partitions:
+                return pd.DataFrame()
+            return pd.concat([self._read_partition(partition) for partition in partitions], ignore_index=True)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def rebuild(self):
+        """Forget every partition and the watermark, the next sync exports the whole collection."""
+        try:
+            file_names = [partition["file_name"] for partition in self.manifest["partitions"]]
+            self._save_manifest(dict(self.manifest, watermark=None, partitions=[]))
+            for file_name in file_names:
+                self._remove_partition(file_name)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,226 @@
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    SCHEMA_FILE_PATH,
+    DATA_VALIDATION_CHUNK_SIZE
+)
+from networksecurity.utils.main_utils.utils import read_yaml_file
+
+
+## invalid rows named in an error message, the counts cover all of them
+_MAX_REPORTED_ROWS = 10
+
+
+class SchemaValidationError(Exception):
+    """Input rejected by a SchemaValidator, errors lists what is wrong with it."""
+
+    def __init__(self, errors: list):
+        self.errors = errors
+        super().__init__("Input does not match the schema: " + "; ".join(errors))
+
+
+@dataclass
+class SchemaValidationResult:
+    n_rows: int
+    ## wrong, missing, unexpected or misordered columns and columns of a non numeric dtype
+    column_errors: list
+    ## True for every row whose values are all in the value domain or allowed to be missing
+    valid_rows: np.ndarray
+    invalid_value_counts: dict
+    nan_counts: dict
+    nan_rate_errors: list = field(default_factory=list)
+    invalid_row_labels: list = field(default_factory=list)
+
+    @property
+    def n_invalid_rows(self) -> int:
+        return int(self.n_rows - self.valid_rows.sum())
+
+    @property
+    def errors(self) -> list:
+        errors = list(self.column_errors) + list(self.nan_rate_errors)
+        if self.n_invalid_rows:
+            counts = ", ".join(f"{column}: {count}" for column, count in self.invalid_value_counts.items() if count)
+            errors.append(f"{self.n_invalid_rows} rows have values outside the schema ({counts}), "
+                          f"first rows {self.invalid_row_labels}")
+        return errors
+
+
+class SchemaValidator:
+    """
+    Checks tables against schema.yaml: column names and order, numeric dtypes, the value
+    domain and the share of missing values per column.
+
+    The schema is compiled once into the column list and a lookup of allowed values. A table
+    is checked in blocks of chunk_size rows, each turned into one (columns, rows) float array
+    so the domain, missing value and non numeric checks of every column run in one
+    vectorized pass. Columns in required_columns, the target, may not be missing.
+    """
+
+    def __init__(self, column_dtypes: dict, value_domain: list, required_columns: list = (),
+                 max_nan_rate: float = None, chunk_size: int = DATA_VALIDATION_CHUNK_SIZE):
+        try:
+            self.columns = list(column_dtypes)
+            self.column_dtypes = {column: np.dtype(dtype) for column, dtype in column_dtypes.items()}
+            self.value_domain = np.asarray(sorted(value_domain), dtype=np.float64)
+            self.required_columns = [column for column in self.columns if column in set(required_columns)]
+            self.max_nan_rate = max_nan_rate
+            self.chunk_size = chunk_size
+
+            self._column_set = set(self.columns)
+            self._value_set = set(value_domain)
+            self._required_mask = np.array([column in set(required_columns) for column in self.columns], dtype=bool)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    @classmethod
+    def from_schema_file(cls, schema_file_path: str = SCHEMA_FILE_PATH, exclude_columns: list = (),
+                         required_columns: list = (), max_nan_rate: float = None,
+                         chunk_size: int = DATA_VALIDATION_CHUNK_SIZE) -> "SchemaValidator":
+        """Compile the columns list and value_domain of schema.yaml, leaving out exclude_columns."""
+        try:
+            schema_config = read_yaml_file(schema_file_path)
+            column_dtypes = {}
+            for column in schema_config["columns"]:
+                for name, dtype in column.items():
+                    if name not in exclude_columns:
+                        column_dtypes[name] = dtype
+            validator = cls(column_dtypes, schema_config["value_domain"], required_columns=required_columns,
+                            max_nan_rate=max_nan_rate, chunk_size=chunk_size)
+            logging.info(f"Compiled schema validator for {len(validator.columns)} columns from {schema_file_path}")
+            return validator
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def check_columns(self, columns: list) -> list:
+        """Errors in the names and order of columns, empty when they are the schema's."""
+        columns = list(columns)
+        if columns == self.columns:
+            return []
+
+        errors = []
+        missing = [column for column in self.columns if column not in set(columns)]
+        unexpected = [column for column in columns if column not in self._column_set]
+        if missing:
+            errors.append(f"missing columns {missing}")
+        if unexpected:
+            errors.append(f"unexpected columns {unexpected}")
+        if not missing and not unexpected:
+            errors.append(f"columns are not in schema order, expected {self.columns}")
+        return errors
+
+
+    def _check_dtypes(self, dataframe: pd.DataFrame) -> list:
+        ## integers of any width, and floats for integer columns widened by missing values
+        errors = []
+        for column in self.columns:
+            if column in dataframe.columns and dataframe[column].dtype.kind not in "iuf":
+                errors.append(f"column {column} has dtype {dataframe[column].dtype}, "
+                              f"expected {self.column_dtypes[column]}")
+        return errors
+
+
+    def _block_values(self, block: pd.DataFrame, columns: list) -> tuple:
+        ## one row per column, so every column is written contiguously
+        values = np.empty((len(columns), len(block)), dtype=np.float64)
+        non_numeric = np.zeros((len(columns), len(block)), dtype=bool)
+        for j, column in enumerate(columns):
+            series = block[column]
+            if series.dtype.kind in "iufb":
+                values[j] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                values[j] = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                non_numeric[j] = np.isnan(values[j]) & series.notna().to_numpy()
+        return values, non_numeric
+
+
+    def validate(self, dataframe: pd.DataFrame) -> SchemaValidationResult:
+        """Check every row and column of the table, nothing is raised for what is found."""
+        try:
+            column_errors = self.check_columns(dataframe.columns) + self._check_dtypes(dataframe)
+            columns = [column for column in self.columns if column in dataframe.columns]
+            required = self._required_mask[[self.columns.index(column) for column in columns]][:, None]
+
+            valid_rows = np.ones(len(dataframe), dtype=bool)
+            invalid_value_counts = np.zeros(len(columns), dtype=np.int64)
+            nan_counts = np.zeros(len(columns), dtype=np.int64)
+
+            for start in range(0, len(dataframe), self.chunk_size):
+                block = dataframe.iloc[start:start + self.chunk_size]
+                values, non_numeric = self._block_values(block, columns)
+                missing = np.isnan(values) & ~non_numeric
+                invalid = ~(np.isin(values, self.value_domain) | missing) | (missing & required)
+                invalid_value_counts += invalid.sum(axis=1)
+                nan_counts += missing.sum(axis=1)
+                valid_rows[start:start + len(block)] = ~invalid.any(axis=0)
+
+            ## a missing column makes every row invalid
+            if len(columns) < len(self.columns):
+                valid_rows[:] = False
+
+            nan_rate_errors = []
+            if self.max_nan_rate is not None and len(dataframe):
+                for column, count in zip(columns, nan_counts):
+                    if count / len(dataframe) > self.max_nan_rate:
+                        nan_rate_errors.append(f"column {column} is {count / len(dataframe):.1%} missing, "
+                                               f"more than {self.max_nan_rate:.1%}")
+
+            invalid_row_index = np.flatnonzero(~valid_rows)[:_MAX_REPORTED_ROWS]
+            return SchemaValidationResult(
+                n_rows=len(dataframe),
+                column_errors=column_errors,
+                valid_rows=valid_rows,
+                invalid_value_counts={column: int(count) for column, count in zip(columns, invalid_value_counts)},
+                nan_counts={column: int(count) for column, count in zip(columns, nan_counts)},
+                nan_rate_errors=nan_rate_errors,
+                invalid_row_labels=[label.item() if hasattr(label, "item") else label
+                                    for label in dataframe.index[invalid_row_index]]
+            )
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def check(self, dataframe: pd.DataFrame):
+        """Raise SchemaValidationError unless every column and row of the table is valid."""
+        result = self.validate(dataframe)
+        errors = result.errors
+        if errors:
+            raise SchemaValidationError(errors)
+
+
+    def check_record(self, record: dict):
+        """
+        Raise SchemaValidationError unless the feature dict has exactly the schema's columns
+        with values in the domain or missing, without building a DataFrame.
+        """
+        errors = []
+        keys = record.keys()
+        missing = [column for column in self.columns if column not in keys]
+        unexpected = [key for key in keys if key not in self._column_set]
+        if missing:
+            errors.append(f"missing columns {missing}")
+        if unexpected:
+            errors.append(f"unexpected columns {unexpected}")
+
+        for column in self.columns:
+            value = record.get(column)
+            if value is None or value != value:
+                if column in self.required_columns and column in keys:
+                    errors.append(f"column {column} may not be missing")
+            elif value not in self._value_set:
+                errors.append(f"column {column} has value {value}, expected one of {sorted(self._value_set)}")
+
+        if errors:
+            raise SchemaValidationError(errors)
+
@@ -2,11 +2,11 @@ import yaml
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
 import os, sys
+import hashlib
+import shutil
 import numpy as np
+import pandas as pd
 import pickle
-import dill
-from sklearn.model_selection import GridSearchCV
-from sklearn.metrics import r2_score
 
 
 def read_yaml_file(file_path: str) -> dict:
@@ -72,8 +72,100 @@ def load_object(file_path: str) -> object:
 
 
 
-def load_numpy_array_data(file_path: str) -> np.array:
+class _SharedArrayPickler(pickle.Pickler):
+    """Pickler that writes every large numpy array to its own .npy file instead of the pickle."""
+
+    def __init__(self, file, array_dir_path: str, min_array_bytes: int, prefix: str):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.array_dir_path = array_dir_path
+        self.min_array_bytes = min_array_bytes
+        self.prefix = prefix
+        self.array_files = {}
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray or obj.dtype.hasobject or obj.nbytes < self.min_array_bytes:
+            return None
+
+        ## an array referenced twice is written once, the pickle memo does not apply here
+        if id(obj) not in self.array_files:
+            file_name = f"{self.prefix}{len(self.array_files):04d}.npy"
+            np.save(os.path.join(self.array_dir_path, file_name), obj)
+            self.array_files[id(obj)] = (obj, file_name)
+        return ("ndarray", self.array_files[id(obj)][1])
+
+
+class _SharedArrayUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, array_dir_path: str, mmap_mode: str):
+        super().__init__(file)
+        self.array_dir_path = array_dir_path
+        self.mmap_mode = mmap_mode
+
+    def persistent_load(self, pid):
+        kind, file_name = pid
+        if kind != "ndarray":
+            raise pickle.UnpicklingError(f"Unknown persistent id: {pid}")
+        ## a plain ndarray view keeps the mapping alive without spreading the memmap subclass
+        return np.asarray(np.load(os.path.join(self.array_dir_path, file_name), mmap_mode=self.mmap_mode))
+
+
+
+def save_object_arrays(file_path: str, obj: object, array_dir_path: str,
+                       min_array_bytes: int = 65536, prefix: str = "") -> list:
+    """
+    Pickle obj with every array of at least min_array_bytes written out-of-line to array_dir_path.
+    Returns the names of the array files.
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        os.makedirs(array_dir_path, exist_ok=True)
+        with open(file_path, "wb") as file:
+            pickler = _SharedArrayPickler(file, array_dir_path, min_array_bytes, prefix)
+            pickler.dump(obj)
+        return [file_name for _, file_name in pickler.array_files.values()]
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+
+def load_object_arrays(file_path: str, array_dir_path: str, mmap_mode: str = "r") -> object:
+    """
+    Load an object saved by save_object_arrays. With mmap_mode "r" the arrays are mapped
+    read-only, pages are read on first access and shared by every process mapping them.
+    """
+    try:
+        if not os.path.exists(file_path):
+            raise Exception(f"The file: {file_path} does not exist")
+
+        with open(file_path, "rb") as file_obj:
+            return _SharedArrayUnpickler(file_obj, array_dir_path, mmap_mode).load()
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+
+
+def get_file_digest(file_path: str) -> str:
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file_obj:
+            for block in iter(lambda: file_obj.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+
+
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
     try: 
+        ## mapped arrays are paged in from the file as they are read, nothing is copied up front
+        if mmap_mode is not None:
+            return np.load(file_path, mmap_mode=mmap_mode)
         with open(file_path, "rb") as file_obj:
             return np.load(file_obj)
 
@@ -82,29 +174,212 @@ def load_numpy_array_data(file_path: str) -> np.array:
 
 
 
-def evaluate_models(X_train, y_train, X_test, y_test, models, params):
+## tables are stored as csv or as a directory holding one .npy file per column
+TABLE_FORMAT_EXTENSIONS = {"csv": ".csv", "columnar": ".columns"}
+COLUMNAR_TABLE_META_FILE_NAME = "columns.yaml"
+
+
+def get_table_file_path(file_path: str, table_format: str) -> str:
+    """file_path with the extension of table_format, readers pick the format from it."""
     try:
-        report = {}
+        if table_format not in TABLE_FORMAT_EXTENSIONS:
+            raise Exception(f"Unknown table format {table_format}, expected one of {list(TABLE_FORMAT_EXTENSIONS)}")
+        return os.path.splitext(file_path)[0] + TABLE_FORMAT_EXTENSIONS[table_format]
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def _smallest_int_dtype(values: np.ndarray):
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= values.min() and values.max() <= np.iinfo(dtype).max:
+            return dtype
+    return None
+
 
-        # Iterate through each model
-        for model_name, model in models.items():
-            para = params.get(model_name, {})  # Retrieve parameters for the current model
+def _compact_column(values: np.ndarray) -> np.ndarray:
+    ## smallest dtype that holds every value exactly, the ternary features fit int8
+    if values.dtype.kind in "iu" and len(values):
+        dtype = _smallest_int_dtype(values)
+        if dtype is not None:
+            return values.astype(dtype)
+    if values.dtype.kind == "f" and values.dtype.itemsize > 4:
+        compact = values.astype(np.float32)
+        if np.array_equal(compact, values, equal_nan=True):
+            return compact
+    return values
 
-            # Perform GridSearchCV
-            gs = GridSearchCV(model, para, cv=3)
-            gs.fit(X_train, y_train)
 
-            # Update model with best parameters
-            model.set_params(**gs.best_params_)
-            model.fit(X_train, y_train)
+def compact_array(array: np.ndarray) -> np.ndarray:
+    """
+    The array in the smallest dtype that holds every value exactly: integer valued floats
+    become int8 for the ternary features, other floats float32 where that is exact.
+    """
+    try:
+        if array.dtype.kind == "f" and array.size and np.isfinite(array).all() and np.array_equal(array, np.round(array)):
+            dtype = _smallest_int_dtype(array)
+            if dtype is not None:
+                return array.astype(dtype)
+        return _compact_column(array)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def save_table(file_path: str, dataframe: pd.DataFrame) -> None:
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if not file_path.endswith(TABLE_FORMAT_EXTENSIONS["columnar"]):
+            dataframe.to_csv(file_path, index=False, header=True)
+            return
+
+        ## written next to the target and swapped in, readers never see half a table
+        tmp_dir_path = f"{file_path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir_path, ignore_errors=True)
+        os.makedirs(tmp_dir_path)
+        columns = []
+        for i, column in enumerate(dataframe.columns):
+            values = dataframe[column].to_numpy()
+            if values.dtype == object:
+                raise Exception(f"Column {column} is not numeric, the columnar format stores numeric columns only")
+            compact = _compact_column(values)
+            np.save(os.path.join(tmp_dir_path, f"{i}.npy"), compact)
+            columns.append({"name": str(column), "file_name": f"{i}.npy", "dtype": str(values.dtype)})
+        write_yaml_file(os.path.join(tmp_dir_path, COLUMNAR_TABLE_META_FILE_NAME), columns)
+
+        shutil.rmtree(file_path, ignore_errors=True)
+        os.replace(tmp_dir_path, file_path)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def load_table(file_path: str, mmap_mode: str = "r") -> pd.DataFrame:
+    """
+    Read a table saved by save_table. Integer columns of a columnar table keep their compact
+    dtype and, with mmap_mode, are memory-mapped; float columns come back as they were saved.
+    """
+    try:
+        if not file_path.endswith(TABLE_FORMAT_EXTENSIONS["columnar"]):
+            return pd.read_csv(file_path)
+
+        data = {}
+        for column in read_yaml_file(os.path.join(file_path, COLUMNAR_TABLE_META_FILE_NAME)):
+            values = np.load(os.path.join(file_path, column["file_name"]), mmap_mode=mmap_mode)
+            if values.dtype.kind == "f" and values.dtype != np.dtype(column["dtype"]):
+                values = values.astype(column["dtype"])
+            data[column["name"]] = values
+        return pd.DataFrame(data, copy=False)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+
+def deduplicate_rows(dataframe: pd.DataFrame) -> tuple:
+    """
+    Collapse exact duplicate rows, missing values compared as equal, by grouping on the
+    values of every column. Returns the unique rows in order of first appearance and how
+    often each occurred.
+    """
+    try:
+        ## groups are numbered in order of first appearance, rows only share one when equal
+        group_ids = dataframe.groupby(list(dataframe.columns), dropna=False, sort=False).ngroup().to_numpy()
+        _, first_index, counts = np.unique(group_ids, return_index=True, return_counts=True)
+        return dataframe.iloc[first_index].reset_index(drop=True), counts.astype(np.float64)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+
+def _mix64(hashes: np.ndarray) -> np.ndarray:
+    ## splitmix64 finalizer, uint64 arithmetic wraps
+    hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+
+def stable_row_hash(dataframe: pd.DataFrame, seed: int = 0) -> np.ndarray:
+    """
+    64 bit hash of each row's values, the same on every run, platform and storage format:
+    values are hashed as float64, so an int8 column read from a columnar table hashes like
+    the int64 one read from csv, and every missing value hashes alike.
+    """
+    try:
+        values = dataframe.to_numpy(dtype=np.float64, na_value=np.nan)
+        ## -0.0 becomes 0.0 and every nan the same nan
+        values = np.where(np.isnan(values), np.nan, values + 0.0)
+        bits = np.ascontiguousarray(values).view(np.uint64)
+        hashes = np.full(len(dataframe), _mix64(np.array([seed], dtype=np.uint64))[0], dtype=np.uint64)
+        for column in range(bits.shape[1]):
+            hashes = _mix64(hashes ^ bits[:, column])
+        return hashes
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+
+def hash_split(dataframe: pd.DataFrame, test_ratio: float, key_columns: list = None, seed: int = 0) -> tuple:
+    """
+    Split into (train, test) by the hash of the key columns, all columns when not given. A row
+    is in test when its hash, read as a fraction of 2**64, is below test_ratio, which depends on
+    the row alone: adding rows never moves the ones already split, and equal keys share a side.
+    """
+    try:
+        keys = dataframe if key_columns is None else dataframe[key_columns]
+        fractions = (stable_row_hash(keys, seed) >> np.uint64(11)).astype(np.float64) / 2.0**53
+        is_test = fractions < test_ratio
+        return dataframe[~is_test], dataframe[is_test]
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+
+def evaluate_models(X_train, y_train, X_test, y_test, models, params,
+                    train_sample_weight=None, test_sample_weight=None,
+                    search_mode: str = "grid", compare_with_grid: bool = False):
+    """
+    Search the params of every model, over the full grids ("grid") or by successive halving
+    ("halving"), replace it in models by its best estimator refit on the whole training set,
+    and report the test r2 score of each. With compare_with_grid, a halving search is
+    followed by the full grid and the scores of its picks in it are logged.
+    """
+    try:
+        ## training only, kept out of the serving import path
+        from sklearn.metrics import r2_score
+        from networksecurity.utils.ml_utils.model.model_search import (
+            grid_search_models, halving_search_models, compare_search_results
+        )
+
+        ## the (model, params, fold) fits of every grid on one process pool, rows collapsed by
+        ## deduplication carry their counts as weights
+        if search_mode == "grid":
+            search_results = grid_search_models(models, params, X_train, y_train, sample_weight=train_sample_weight)
+        elif search_mode == "halving":
+            search_results = halving_search_models(models, params, X_train, y_train, sample_weight=train_sample_weight)
+            if compare_with_grid:
+                compare_search_results(search_results, grid_search_models(models, params, X_train, y_train,
+                                                                          sample_weight=train_sample_weight))
+        else:
+            raise ValueError(f"Unknown model search mode {search_mode!r}, expected 'grid' or 'halving'")
+
+        report = {}
+
+        for model_name, search_result in search_results.items():
+            model = search_result.best_estimator
+            models[model_name] = model
 
             # Generate predictions
             y_train_pred = model.predict(X_train)
             y_test_pred = model.predict(X_test)
 
             # Calculate model performance scores
-            train_model_score = r2_score(y_train, y_train_pred)
-            test_model_score = r2_score(y_test, y_test_pred)
+            train_model_score = r2_score(y_train, y_train_pred, sample_weight=train_sample_weight)
+            test_model_score = r2_score(y_test, y_test_pred, sample_weight=test_sample_weight)
 
             # Log test model score in the report
             report[model_name] = test_model_score
@@ -0,0 +1,215 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, kstwo, ks_2samp
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+
+## columns whose values are integers spanning at most this many values are histogrammed,
+## anything else falls back to ks_2samp on the raw values
+MAX_DISCRETE_VALUES = 64
+## rows turned into bin codes at a time, bounds the memory of the bincount pass
+_ROW_BLOCK_SIZE = 8192
+## floor on bin proportions in the PSI, an empty bin would make it infinite
+_PSI_EPSILON = 1e-4
+
+
+def _is_discrete(values: np.ndarray) -> bool:
+    if values.dtype.kind in "iub":
+        return True
+    present = values[~np.isnan(values)]
+    return bool(np.all(present == np.floor(present)))
+
+
+def discrete_value_range(*dataframes: pd.DataFrame, max_values: int = MAX_DISCRETE_VALUES):
+    """
+    (lowest value, number of values) shared by every column of the frames, or None when a
+    column is not integer valued or the values span more than max_values.
+    """
+    try:
+        low, high = None, None
+        for dataframe in dataframes:
+            for column in dataframe.columns:
+                values = dataframe[column].to_numpy()
+                if not _is_discrete(values):
+                    return None
+                if len(values) == 0 or (values.dtype.kind == "f" and np.isnan(values).all()):
+                    continue
+                column_low, column_high = np.nanmin(values), np.nanmax(values)
+                low = column_low if low is None else min(low, column_low)
+                high = column_high if high is None else max(high, column_high)
+
+        if low is None:
+            return 0, 1
+        n_values = int(high) - int(low) + 1
+        return (int(low), n_values) if n_values <= max_values else None
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def value_counts(dataframe: pd.DataFrame, low: int, n_values: int) -> np.ndarray:
+    """
+    Histogram of every column in one bincount per block of rows: an (n_columns, n_values + 1)
+    array where bin i counts the value low + i and the last bin the missing values.
+    """
+    try:
+        n_bins = n_values + 1
+        columns = [dataframe[column].to_numpy() for column in dataframe.columns]
+        ## column j's bins start at j * n_bins, so one bincount histograms all columns
+        offsets = np.arange(len(columns), dtype=np.intp) * n_bins
+        counts = np.zeros(len(columns) * n_bins, dtype=np.int64)
+
+        for start in range(0, len(dataframe), _ROW_BLOCK_SIZE):
+            stop = min(start + _ROW_BLOCK_SIZE, len(dataframe))
+            ## one row of codes per column, so every column is written contiguously
+            codes = np.empty((len(columns), stop - start), dtype=np.intp)
+            for j, values in enumerate(columns):
+                block = values[start:stop]
+                if block.dtype.kind == "f":
+                    codes[j] = np.where(np.isnan(block), n_values, np.nan_to_num(block) - low)
+                else:
+                    codes[j] = block
+                    codes[j] -= low
+            codes += offsets[:, None]
+            counts += np.bincount(codes.ravel(), minlength=len(counts))
+
+        return counts.reshape(len(columns), n_bins)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def ks_from_counts(base_counts: np.ndarray, current_counts: np.ndarray) -> tuple:
+    """
+    Two sample KS statistic and asymptotic p-value per column from value counts, the missing
+    bin left out as ks_2samp has no place for it. The statistic is the one ks_2samp gives.
+    """
+    base_n = base_counts[:, :-1].sum(axis=1)
+    current_n = current_counts[:, :-1].sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base_cdf = np.cumsum(base_counts[:, :-1], axis=1) / base_n[:, None]
+        current_cdf = np.cumsum(current_counts[:, :-1], axis=1) / current_n[:, None]
+        statistic = np.abs(base_cdf - current_cdf).max(axis=1)
+        ## the effective sample size ks_2samp uses for its asymptotic p-value
+        en = np.round(base_n * current_n / (base_n + current_n))
+        p_value = np.where(en > 0, kstwo.sf(statistic, np.maximum(en, 1)), np.nan)
+    return statistic, p_value
+
+
+def chi2_from_counts(base_counts: np.ndarray, current_counts: np.ndarray) -> tuple:
+    """Chi-square test of homogeneity per column on the 2 x bins table, missing values a bin of their own."""
+    observed = np.stack([base_counts, current_counts], axis=1).astype(np.float64)
+    bin_totals = observed.sum(axis=1, keepdims=True)
+    sample_totals = observed.sum(axis=2, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = bin_totals * sample_totals / sample_totals.sum(axis=1, keepdims=True)
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+    statistic = terms.sum(axis=(1, 2))
+    degrees_of_freedom = (bin_totals[:, 0, :] > 0).sum(axis=1) - 1
+    ## a column with one value on both sides cannot have drifted
+    p_value = np.where(degrees_of_freedom > 0, chi2.sf(statistic, np.maximum(degrees_of_freedom, 1)), 1.0)
+    return statistic, p_value
+
+
+def psi_from_counts(base_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    """Population stability index per column, missing values a bin of their own."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base = np.maximum(base_counts / base_counts.sum(axis=1, keepdims=True), _PSI_EPSILON)
+        current = np.maximum(current_counts / current_counts.sum(axis=1, keepdims=True), _PSI_EPSILON)
+    return ((current - base) * np.log(current / base)).sum(axis=1)
+
+
+def _check_test(test: str):
+    if test not in ("ks", "chi2"):
+        raise ValueError(f"Unknown drift test {test}, expected 'ks' or 'chi2'")
+
+
+def _set_drift_status(report: dict, threshold: float) -> bool:
+    status = True
+    for entry in report.values():
+        entry["drift_status"] = not threshold < entry["p_value"]
+        status = status and not entry["drift_status"]
+    return status
+
+
+def counts_drift_report(columns: list, base_counts: np.ndarray, current_counts: np.ndarray,
+                        threshold: float = 0.05, test: str = "ks") -> tuple:
+    """
+    Per column drift from value counts laid out as value_counts returns them. p_value is the
+    one of the chosen test ("ks" or "chi2") and a column drifted when it is not above the
+    threshold. Returns (report, True when no column drifted).
+    """
+    try:
+        _check_test(test)
+        ks_statistic, ks_p_value = ks_from_counts(base_counts, current_counts)
+        chi2_statistic, chi2_p_value = chi2_from_counts(base_counts, current_counts)
+        psi = psi_from_counts(base_counts, current_counts)
+
+        report = {}
+        for i, column in enumerate(columns):
+            report[column] = {
+                "p_value": float(ks_p_value[i] if test == "ks" else chi2_p_value[i]),
+                "ks_statistic": float(ks_statistic[i]),
+                "chi2_statistic": float(chi2_statistic[i]),
+                "chi2_p_value": float(chi2_p_value[i]),
+                "psi": float(psi[i])
+            }
+        return report, _set_drift_status(report, threshold)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def get_value_histogram(dataframe: pd.DataFrame) -> dict:
+    """
+    The value counts of a discrete table in a yaml friendly form, the baseline live traffic is
+    compared against: {"columns", "low", "n_values", "counts"}. None when a column is not discrete.
+    """
+    try:
+        value_range = discrete_value_range(dataframe)
+        if value_range is None:
+            return None
+
+        low, n_values = value_range
+        return {
+            "columns": [str(column) for column in dataframe.columns],
+            "low": low,
+            "n_values": n_values,
+            "counts": value_counts(dataframe, low, n_values).tolist()
+        }
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def get_drift_report(base_df: pd.DataFrame, current_df: pd.DataFrame, threshold: float = 0.05,
+                     test: str = "ks") -> tuple:
+    """
+    Per column drift of current_df against base_df. Discrete columns are histogrammed and
+    the KS, chi-square and PSI values all come from the counts, see counts_drift_report.
+    Returns (report, True when no column drifted).
+    """
+    try:
+        _check_test(test)
+        columns = list(base_df.columns)
+        current_df = current_df[columns]
+        value_range = discrete_value_range(base_df, current_df)
+
+        if value_range is not None:
+            low, n_values = value_range
+            return counts_drift_report(columns, value_counts(base_df, low, n_values),
+                                       value_counts(current_df, low, n_values), threshold, test)
+
+        logging.info("Columns are not all discrete, computing drift with ks_2samp on raw values")
+        report = {}
+        for column in columns:
+            result = ks_2samp(base_df[column], current_df[column])
+            report[column] = {"p_value": float(result.pvalue), "ks_statistic": float(result.statistic)}
+        return report, _set_drift_status(report, threshold)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,259 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from numbers import Integral
+
+import numpy as np
+from sklearn.impute import KNNImputer
+from sklearn.utils._param_validation import Interval
+from sklearn.utils.validation import FLOAT_DTYPES, check_is_fitted, validate_data
+
+from networksecurity.logging.logger import logging
+
+
+## the feature values the bit-planes can encode
+_TERNARY_VALUES = (-1.0, 0.0, 1.0)
+_WORD_BITS = 32
+## block and training row pairs per tile of the popcount passes
+_TILE_ELEMENTS = 2 ** 18
+## low two bits of a search key, ordered like the values -1 < 0 < 1. xor with 3 reverses
+## the order without touching the distance rank in the bits above
+_VALUE_CODES = np.array([0, 1, 3], dtype=np.uint32)
+_REVERSE_VALUE_ORDER = 3
+
+
+def _pack_bits(bits: np.ndarray) -> np.ndarray:
+    ## (rows, features) bools as (words, rows) uint32, feature j in bit j % 32 of word j // 32
+    n_words = max(1, -(-bits.shape[1] // _WORD_BITS))
+    padded = np.zeros((bits.shape[0], n_words * _WORD_BITS), dtype=bool)
+    padded[:, :bits.shape[1]] = bits
+    packed = np.packbits(padded, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed.view("<u4").T).astype(np.uint32)
+
+
+def _bit_planes(X: np.ndarray, missing: np.ndarray) -> tuple:
+    ## present, equal to -1 and equal to 1; a present bit in neither plane is a 0
+    return _pack_bits(~missing), _pack_bits(X == -1), _pack_bits(X == 1)
+
+
+def _is_ternary(values: np.ndarray) -> bool:
+    return bool(np.isin(values, _TERNARY_VALUES).all())
+
+
+class BitPlaneKNNImputer(KNNImputer):
+    """
+    KNNImputer for features in {-1, 0, 1} that gives the same output as KNNImputer.
+
+    Every row is packed into three bit-planes: present, equal to -1, and equal to 1.
+    For a pair of rows, the number of features present in both is the popcount of the
+    AND of their present planes. The squared distance over those features is the count
+    of differing features plus three times the count of opposite ones. Both are small
+    integers, so the nan_euclidean distance sqrt(squared / present * n_features) can
+    only take a few thousand values. They are ranked once, and the search runs on
+    those ranks instead of on float distances.
+
+    Rows with missing values are handled in blocks of about max_block_elements
+    receiver and training row pairs, so memory stays bounded. The blocks are spread
+    over n_jobs threads. For every missing column, the k nearest donors are found
+    twice with one partition each, breaking ties at the k-th distance by the lowest
+    donor value and then by the highest. When both picks sum to the same value, every
+    tie break gives the same mean. Otherwise the row falls back to KNNImputer's own
+    argpartition over the float distances. Data that is not ternary, or parameters
+    other than uniform nan_euclidean, are left to KNNImputer.transform.
+    """
+
+    _parameter_constraints: dict = {
+        **KNNImputer._parameter_constraints,
+        "n_jobs": [None, Integral],
+        "max_block_elements": [Interval(Integral, 1, None, closed="left")],
+    }
+
+    def __init__(self, *, missing_values=np.nan, n_neighbors=5, weights="uniform",
+                 metric="nan_euclidean", copy=True, add_indicator=False, keep_empty_features=False,
+                 n_jobs=None, max_block_elements=2 ** 20):
+        super().__init__(missing_values=missing_values, n_neighbors=n_neighbors, weights=weights,
+                         metric=metric, copy=copy, add_indicator=add_indicator,
+                         keep_empty_features=keep_empty_features)
+        self.n_jobs = n_jobs
+        self.max_block_elements = max_block_elements
+
+
+    def _n_workers(self) -> int:
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs < 0:
+            return max(1, (os.cpu_count() or 1) + 1 + self.n_jobs)
+        return max(1, self.n_jobs)
+
+
+    def _fast_path_supported(self) -> bool:
+        ## private KNNImputer state, checked against the scikit-learn pinned in requirements.txt
+        if not all(hasattr(self, name) for name in ("_fit_X", "_mask_fit_X", "_valid_mask")):
+            return False
+        if self.metric != "nan_euclidean" or self.weights != "uniform":
+            return False
+        if not (isinstance(self.missing_values, float) and np.isnan(self.missing_values)):
+            return False
+        if not self._valid_mask.all():
+            return False
+        return _is_ternary(self._fit_X[~self._mask_fit_X])
+
+
+    def _distance_ranks(self, n_features: int) -> tuple:
+        ## every nan_euclidean distance a (squared, present) pair can give, computed in the
+        ## order nan_euclidean_distances does. index squared * (n_features + 1) + present
+        squared, present = np.meshgrid(np.arange(4 * n_features + 1, dtype=np.float64),
+                                       np.arange(n_features + 1, dtype=np.float64), indexing="ij")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distances = squared / present
+        distances *= n_features
+        distances[present == 0] = np.nan
+        distances = np.sqrt(distances).ravel()
+
+        ## rank of every distance, the missing distance is one level and ranks last as
+        ## argpartition orders it. shifted left by two, the donor value goes in the low bits
+        levels, ranks = np.unique(distances, return_inverse=True)
+        rank_dtype = np.uint16 if len(levels) <= 2 ** 14 else np.uint32
+        return ranks.astype(rank_dtype).ravel() << 2, levels
+
+
+    def _block_ranks(self, planes: tuple, fit_planes: tuple, ranks: np.ndarray, n_features: int) -> np.ndarray:
+        ## (block rows, training rows) shifted distance ranks from popcounts of the bit-planes, a tile
+        ## of training rows at a time so the temporaries stay in cache
+        present, negative, positive = planes
+        fit_present, fit_negative, fit_positive = fit_planes
+        n_rows, n_fit = present.shape[1], fit_present.shape[1]
+        index_dtype = np.uint16 if (4 * n_features + 1) * (n_features + 1) <= 2 ** 16 else np.uint32
+        block_ranks = np.empty((n_rows, n_fit), dtype=ranks.dtype)
+        tile = max(1, _TILE_ELEMENTS // n_rows)
+
+        for start in range(0, n_fit, tile):
+            stop = min(start + tile, n_fit)
+            squared = np.zeros((n_rows, stop - start), dtype=index_dtype)
+            present_count = np.zeros((n_rows, stop - start), dtype=index_dtype)
+            for word in range(present.shape[0]):
+                p, n, o = present[word][:, None], negative[word][:, None], positive[word][:, None]
+                fp, fn, fo = fit_present[word, start:stop], fit_negative[word, start:stop], fit_positive[word, start:stop]
+                both = p & fp
+                present_count += np.bitwise_count(both)
+
+                ## present in both and different: the -1 or the 1 planes disagree
+                bits = n ^ fn
+                bits |= o ^ fo
+                bits &= both
+                squared += np.bitwise_count(bits)
+
+                ## -1 against 1 adds 4 rather than 1
+                bits = n & fo
+                bits |= o & fn
+                squared += np.bitwise_count(bits) * np.uint8(3)
+
+            squared *= n_features + 1
+            squared += present_count
+            block_ranks[:, start:stop] = ranks.take(squared)
+        return block_ranks
+
+
+    def _impute_block(self, X: np.ndarray, missing: np.ndarray, rows: np.ndarray, fit_planes: tuple,
+                      donors: list, ranks: np.ndarray, levels: np.ndarray) -> list:
+        n_features = self._fit_X.shape[1]
+        block_missing = missing[rows]
+        planes = _bit_planes(X[rows], block_missing)
+        block_ranks = self._block_ranks(planes, fit_planes, ranks, n_features)
+        ## no feature present in both rows, the last level
+        missing_rank = len(levels) - 1
+
+        imputed = []
+        for col in np.flatnonzero(block_missing.any(axis=0)):
+            receivers = np.flatnonzero(block_missing[:, col])
+            donor_index, donor_codes, donor_values, column_mean = donors[col]
+            n_neighbors = min(self.n_neighbors, len(donor_values))
+
+            if donor_index is None:
+                keys = block_ranks[receivers]
+            else:
+                keys = block_ranks[receivers].take(donor_index, axis=1)
+            keys |= donor_codes
+
+            ## the k nearest donors with ties broken by the lowest value, then by the highest
+            sums = []
+            for reverse in (False, True):
+                nearest = np.partition(keys, n_neighbors - 1, axis=1)[:, :n_neighbors]
+                codes = nearest & 3
+                if reverse:
+                    codes ^= _REVERSE_VALUE_ORDER
+                values = _VALUE_CODES.searchsorted(codes) - 1.0
+                weights = (nearest >> 2) != missing_rank
+                sums.append((values * weights).sum(axis=1))
+                keys ^= _REVERSE_VALUE_ORDER
+            taken = weights.sum(axis=1)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                value = sums[0] / taken
+            value[taken == 0] = column_mean
+
+            ## a tie whose donor values matter, resolved by KNNImputer's own argpartition
+            ambiguous = np.flatnonzero(sums[0] != sums[1])
+            if ambiguous.size:
+                distances = levels[keys[ambiguous] >> 2]
+                donors_idx = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+                donors_dist = np.take_along_axis(distances, donors_idx, axis=1)
+                donor_weights = np.ones_like(donors_dist)
+                donor_weights[np.isnan(donors_dist)] = 0.0
+                chosen = donor_values.take(donors_idx)
+                value[ambiguous] = (chosen * donor_weights).sum(axis=1) / donor_weights.sum(axis=1)
+
+            imputed.append((rows[receivers], col, value))
+        return imputed
+
+
+    def transform(self, X):
+        """Impute all missing values in X, as KNNImputer.transform does."""
+        check_is_fitted(self)
+        if not self._fast_path_supported():
+            return super().transform(X)
+
+        X_input = X
+        X = validate_data(self, X, accept_sparse=False, dtype=FLOAT_DTYPES, force_writeable=True,
+                          ensure_all_finite="allow-nan", copy=self.copy, reset=False)
+        missing = np.isnan(X)
+        if not _is_ternary(X[~missing]):
+            return super().transform(X_input)
+
+        X_indicator = self._transform_indicator(missing)
+        row_missing_idx = np.flatnonzero(missing.any(axis=1))
+        if row_missing_idx.size == 0:
+            return self._concatenate_indicator(X, X_indicator)
+
+        fit_X, mask_fit_X = self._fit_X, self._mask_fit_X
+        n_fit, n_features = fit_X.shape
+        fit_planes = _bit_planes(fit_X, mask_fit_X)
+        ranks, levels = self._distance_ranks(n_features)
+        ## potential donors of every column: None when every training row is one
+        donors = []
+        for col in range(n_features):
+            donor_rows = np.flatnonzero(~mask_fit_X[:, col])
+            donor_values = fit_X[donor_rows, col]
+            donor_codes = _VALUE_CODES[(donor_values + 1).astype(np.intp)].astype(ranks.dtype)
+            column_mean = np.ma.array(fit_X[:, col], mask=mask_fit_X[:, col]).mean()
+            donors.append((None if len(donor_rows) == n_fit else donor_rows, donor_codes, donor_values, column_mean))
+
+        block_size = max(1, self.max_block_elements // n_fit)
+        blocks = [row_missing_idx[start:start + block_size] for start in range(0, len(row_missing_idx), block_size)]
+        n_workers = min(self._n_workers(), len(blocks))
+        logging.info(f"Imputing {len(row_missing_idx)} rows against {n_fit} training rows "
+                     f"in {len(blocks)} blocks on {n_workers} threads")
+
+        def impute(rows):
+            return self._impute_block(X, missing, rows, fit_planes, donors, ranks, levels)
+
+        ## numpy releases the GIL in the bitwise, popcount and partition passes
+        if n_workers == 1:
+            results = [impute(rows) for rows in blocks]
+        else:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                results = list(executor.map(impute, blocks))
+        for imputed in results:
+            for receivers, col, value in imputed:
+                X[receivers, col] = value
+
+        return self._concatenate_indicator(X, X_indicator)
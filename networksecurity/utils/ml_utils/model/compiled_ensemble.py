@@ -0,0 +1,370 @@
+import os
+import sys
+import json
+
+import numpy as np
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from sklearn.dummy import DummyClassifier
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier
+)
+
+
+COMPILED_KIND_TREE = "tree"
+COMPILED_KIND_FOREST = "forest"
+COMPILED_KIND_GRADIENT_BOOSTING = "gradient_boosting"
+
+## the url features only take these values, rows made of them use the lookup tables
+TERNARY_VALUES = np.array([-1, 0, 1], dtype=np.int8)
+
+## a tree head over at most this many features is replaced by a 3**n entry lookup table
+MAX_HEAD_TABLE_FEATURES = 8
+
+_TREE_LEAF = -1
+_ROW_BLOCK_SIZE = 256
+
+_ARRAY_NAMES = (
+    "classes", "roots", "feature", "threshold", "left", "right", "missing_go_to_left",
+    "leaf_value", "tree_class", "init_raw", "next_node", "head_weights", "head_offset", "head_table"
+)
+
+
+def _is_supported(model) -> bool:
+    if isinstance(model, (DecisionTreeClassifier, RandomForestClassifier, ExtraTreesClassifier)):
+        return getattr(model, "n_outputs_", 1) == 1
+    if isinstance(model, GradientBoostingClassifier):
+        return model.init_ == "zero" or isinstance(model.init_, DummyClassifier)
+    return False
+
+
+def _build_head_table(root: int, n_features: int, feature: np.ndarray, next_node: np.ndarray,
+                      is_leaf: np.ndarray):
+    """
+    Find the deepest head of a tree that splits on at most MAX_HEAD_TABLE_FEATURES
+    features and tabulate, for every combination of their ternary codes, the node
+    a row reaches after walking through the head.
+    """
+    head_features = []
+    depth = 0
+    frontier = np.array([root])
+    while True:
+        internal = frontier[~is_leaf[frontier]]
+        if internal.size == 0:
+            break
+        features = sorted(set(head_features) | set(feature[internal].tolist()))
+        if len(features) > MAX_HEAD_TABLE_FEATURES:
+            break
+        head_features = features
+        depth += 1
+        frontier = np.concatenate([next_node[internal * 3], next_node[internal * 3 + 2]])
+
+    ## row i of combos holds the codes of head_features for table entry i
+    n_head_features = len(head_features)
+    combos = (np.arange(3 ** n_head_features)[:, np.newaxis] // (3 ** np.arange(n_head_features))) % 3
+    combos = np.column_stack([combos, np.zeros(len(combos), dtype=combos.dtype)])
+
+    ## leaves split on nothing, they read the padding column and stay where they are
+    feature_column = np.full(n_features, n_head_features)
+    feature_column[head_features] = np.arange(n_head_features)
+
+    rows = np.arange(len(combos))
+    nodes = np.full(len(combos), root)
+    for _ in range(depth):
+        nodes = next_node[nodes * 3 + combos[rows, feature_column[feature[nodes]]]]
+
+    return head_features, nodes.astype(np.int32)
+
+
+class CompiledTreeEnsemble:
+    """
+    A fitted sklearn tree ensemble flattened into NumPy node arrays.
+
+    Every tree lives in the same arrays with global node ids and leaves point back
+    to themselves. Rows whose features are all in {-1, 0, 1} are scored on a ternary
+    path: the head of every tree is resolved with one matmul and a table lookup,
+    and the remaining levels are walked for all (row, tree) pairs at once through a
+    (node, value) -> next node table. Other rows are walked with float32 comparisons
+    exactly like sklearn, so predictions always match the source estimator.
+    """
+
+    def __init__(self, kind: str, n_features: int, max_depth: int, arrays: dict,
+                 learning_rate: float = None, source_digest: str = None):
+        self.kind = kind
+        self.n_features = n_features
+        self.max_depth = max_depth
+        self.learning_rate = learning_rate
+        self.source_digest = source_digest
+        for name in _ARRAY_NAMES:
+            setattr(self, name, arrays.get(name))
+
+        self.is_leaf = self.left == np.arange(len(self.left))
+        if self.next_node is None:
+            self._build_lookup_tables()
+
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+
+    @staticmethod
+    def is_supported(model) -> bool:
+        return _is_supported(model)
+
+
+    def _build_lookup_tables(self):
+        ## next_node[node * 3 + code] is the child reached by feature value code - 1
+        self.next_node = np.where(
+            TERNARY_VALUES[np.newaxis, :] <= self.threshold[:, np.newaxis],
+            self.left[:, np.newaxis], self.right[:, np.newaxis]
+        ).astype(np.int32).ravel()
+
+        head_weights = np.zeros((self.n_features, self.n_trees), dtype=np.float32)
+        head_offset = np.zeros(self.n_trees, dtype=np.int64)
+        head_tables = []
+        offset = 0
+        for t, root in enumerate(self.roots):
+            head_features, table = _build_head_table(
+                root, self.n_features, self.feature, self.next_node, self.is_leaf)
+            head_weights[head_features, t] = 3.0 ** np.arange(len(head_features))
+            head_offset[t] = offset
+            head_tables.append(table)
+            offset += len(table)
+
+        self.head_weights = head_weights
+        self.head_offset = head_offset
+        self.head_table = np.concatenate(head_tables)
+
+
+    @classmethod
+    def from_estimator(cls, model) -> "CompiledTreeEnsemble":
+        try:
+            if not _is_supported(model):
+                raise Exception(f"Cannot compile estimator of type {type(model).__name__}")
+
+            tree_class = None
+            if isinstance(model, GradientBoostingClassifier):
+                kind = COMPILED_KIND_GRADIENT_BOOSTING
+                trees = [estimator.tree_ for estimator in model.estimators_.ravel()]
+                tree_class = np.tile(np.arange(model.estimators_.shape[1]), model.estimators_.shape[0])
+            elif isinstance(model, DecisionTreeClassifier):
+                kind = COMPILED_KIND_TREE
+                trees = [model.tree_]
+            else:
+                kind = COMPILED_KIND_FOREST
+                trees = [estimator.tree_ for estimator in model.estimators_]
+
+            roots, features, thresholds, lefts, rights, missing, values = [], [], [], [], [], [], []
+            offset = 0
+            for tree in trees:
+                node_ids = np.arange(tree.node_count)
+                is_leaf = tree.children_left == _TREE_LEAF
+
+                roots.append(offset)
+                features.append(np.where(is_leaf, 0, tree.feature))
+                thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+                lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+                rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+                missing_go_to_left = getattr(tree, "missing_go_to_left", None)
+                if missing_go_to_left is None:
+                    missing_go_to_left = np.zeros(tree.node_count, dtype=bool)
+                missing.append(np.asarray(missing_go_to_left, dtype=bool))
+
+                value = tree.value[:, 0, :]
+                if kind == COMPILED_KIND_FOREST:
+                    ## same normalisation as DecisionTreeClassifier.predict_proba
+                    value = value[:, :len(model.classes_)].copy()
+                    normalizer = value.sum(axis=1)[:, np.newaxis]
+                    normalizer[normalizer == 0.0] = 1.0
+                    value /= normalizer
+                elif kind == COMPILED_KIND_GRADIENT_BOOSTING:
+                    value = value[:, 0]
+                values.append(value)
+                offset += tree.node_count
+
+            arrays = {
+                "classes": np.asarray(model.classes_),
+                "roots": np.asarray(roots, dtype=np.int32),
+                "feature": np.concatenate(features).astype(np.int32),
+                "threshold": np.concatenate(thresholds).astype(np.float64),
+                "left": np.concatenate(lefts).astype(np.int32),
+                "right": np.concatenate(rights).astype(np.int32),
+                "missing_go_to_left": np.concatenate(missing),
+                "leaf_value": np.concatenate(values).astype(np.float64),
+                "tree_class": tree_class
+            }
+
+            learning_rate = None
+            if kind == COMPILED_KIND_GRADIENT_BOOSTING:
+                learning_rate = float(model.learning_rate)
+                ## the default init estimator predicts the class prior, a constant for every row
+                arrays["init_raw"] = model._raw_predict_init(
+                    np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+
+            compiled = cls(
+                kind=kind,
+                n_features=int(model.n_features_in_),
+                max_depth=int(max(tree.max_depth for tree in trees)),
+                arrays=arrays,
+                learning_rate=learning_rate
+            )
+            logging.info(f"Compiled {type(model).__name__} into {compiled.n_trees} trees "
+                         f"with {len(compiled.feature)} nodes")
+            return compiled
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def _prepare_input(self, X):
+        """Returns (codes, None) for ternary input, (None, float32 X) otherwise."""
+        if X.__class__.__name__ == "DataFrame":
+            X = X.to_numpy()
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has shape {X.shape}, expected (n_samples, {self.n_features})")
+
+        if X.dtype == np.int8:
+            if X.size == 0 or (X.min() >= -1 and X.max() <= 1):
+                return (X + 1).astype(np.uint8), None
+            return None, X.astype(np.float32)
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if np.isnan(X).any():
+            if self.kind == COMPILED_KIND_GRADIENT_BOOSTING:
+                raise ValueError("Input X contains NaN.")
+            return None, X
+
+        codes = X + 1
+        if np.all((codes == 0) | (codes == 1) | (codes == 2)):
+            return codes.astype(np.uint8), None
+        return None, X
+
+
+    def _walk(self, nodes: np.ndarray, codes: np.ndarray, X: np.ndarray) -> np.ndarray:
+        """Walk (row, tree) pairs from nodes down to their leaves, updates nodes in place."""
+        n_samples, n_trees = nodes.shape
+        nodes = nodes.ravel()
+        values = codes.ravel() if codes is not None else X.ravel()
+        row_offset = np.repeat(np.arange(n_samples, dtype=np.int64) * self.n_features, n_trees)
+
+        position = np.flatnonzero(~self.is_leaf[nodes])
+        current = nodes[position]
+        row_offset = row_offset[position]
+        while position.size:
+            x = values.take(row_offset + self.feature[current])
+            if codes is not None:
+                current = self.next_node.take(current * 3 + x)
+            else:
+                go_left = x <= self.threshold[current]
+                go_left |= np.isnan(x) & self.missing_go_to_left[current]
+                current = np.where(go_left, self.left[current], self.right[current])
+
+            ## only pairs that are still inside a tree stay in the working set
+            done = self.is_leaf[current]
+            if done.any():
+                nodes[position[done]] = current[done]
+                active = ~done
+                position, current, row_offset = position[active], current[active], row_offset[active]
+
+        return nodes.reshape(n_samples, n_trees)
+
+
+    def _apply(self, codes: np.ndarray, X: np.ndarray) -> np.ndarray:
+        if codes is not None:
+            head_code = (codes.astype(np.float32) @ self.head_weights).astype(np.int64)
+            nodes = self.head_table.take(head_code + self.head_offset)
+        else:
+            nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        return self._walk(nodes, codes, X)
+
+
+    def apply(self, X) -> np.ndarray:
+        """Global leaf node id reached in every tree, shape (n_samples, n_trees)."""
+        codes, X = self._prepare_input(X)
+        return self._apply(codes, X)
+
+
+    def _predict_block(self, codes: np.ndarray, X: np.ndarray) -> np.ndarray:
+        leaves = self._apply(codes, X)
+        n_samples = leaves.shape[0]
+
+        ## cumsum adds strictly left to right, which reproduces sklearn's tree by tree
+        ## accumulation bit for bit where a sum() would use pairwise summation
+        if self.kind == COMPILED_KIND_GRADIENT_BOOSTING:
+            n_classes_per_stage = self.init_raw.shape[0]
+            stage_values = self.learning_rate * self.leaf_value.take(leaves)
+            stage_values = stage_values.reshape(n_samples, -1, n_classes_per_stage)
+            init_raw = np.broadcast_to(self.init_raw, (n_samples, 1, n_classes_per_stage))
+            raw = np.cumsum(np.concatenate([init_raw, stage_values], axis=1), axis=1)[:, -1, :]
+            if n_classes_per_stage == 1:
+                return self.classes.take((raw[:, 0] >= 0).astype(int))
+            return self.classes.take(np.argmax(raw, axis=1))
+
+        if self.kind == COMPILED_KIND_TREE:
+            return self.classes.take(np.argmax(self.leaf_value[leaves[:, 0]], axis=1))
+
+        proba = np.cumsum(self.leaf_value[leaves], axis=1)[:, -1, :]
+        proba /= self.n_trees
+        return self.classes.take(np.argmax(proba, axis=1))
+
+
+    def predict(self, X) -> np.ndarray:
+        try:
+            codes, X = self._prepare_input(X)
+            data = codes if codes is not None else X
+            blocks = []
+            for start in range(0, max(len(data), 1), _ROW_BLOCK_SIZE):
+                stop = start + _ROW_BLOCK_SIZE
+                blocks.append(self._predict_block(
+                    codes[start:stop] if codes is not None else None,
+                    X[start:stop] if X is not None else None
+                ))
+            return np.concatenate(blocks)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def save(self, file_path: str, source_digest: str = None) -> None:
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            meta = {
+                "kind": self.kind,
+                "n_features": self.n_features,
+                "max_depth": self.max_depth,
+                "learning_rate": self.learning_rate,
+                "source_digest": source_digest
+            }
+            arrays = {name: getattr(self, name) for name in _ARRAY_NAMES if getattr(self, name) is not None}
+            with open(file_path, "wb") as file:
+                np.savez(file, meta=np.array(json.dumps(meta)), **arrays)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    @classmethod
+    def load(cls, file_path: str) -> "CompiledTreeEnsemble":
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                arrays = {name: data[name] for name in _ARRAY_NAMES if name in data}
+
+            return cls(
+                kind=meta["kind"],
+                n_features=meta["n_features"],
+                max_depth=meta["max_depth"],
+                arrays=arrays,
+                learning_rate=meta["learning_rate"],
+                source_digest=meta.get("source_digest")
+            )
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -1,30 +1,130 @@
 import os, sys
+import numpy as np
 
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
 
-from networksecurity.constants.training_pipeline import SAVED_MODEL_DIR, MODEL_FILE_NAME
+from networksecurity.constants.training_pipeline import SAVED_MODEL_DIR, MODEL_FILE_NAME, MODEL_SERVING_COMPILED_FOREST_MAX_BATCH_ROWS
+from networksecurity.utils.ml_utils.model.compiled_ensemble import CompiledTreeEnsemble, COMPILED_KIND_GRADIENT_BOOSTING
+from networksecurity.utils.ml_utils.model.prediction_cache import PredictionCache, pack_rows
+from networksecurity.utils.ml_utils.model.fast_imputer import FastKNNImputer
 
 
 
 class NetworkModel:
-    def __init__(self, preprocessor, model):
+    def __init__(self, preprocessor, model, compiled_model: CompiledTreeEnsemble = None):
         try:
             self.preprocessor = preprocessor
             self.model = model
+            self.compiled_model = compiled_model
+            self.prediction_cache: PredictionCache = None
+            self.fast_imputer: FastKNNImputer = None
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def enable_cache(self, max_size: int):
+        self.prediction_cache = PredictionCache(max_size=max_size)
+
+
+    def invalidate_cache(self):
+        if getattr(self, "prediction_cache", None) is not None:
+            self.prediction_cache.clear()
+
+
+    def compile(self) -> bool:
+        try:
+            if not CompiledTreeEnsemble.is_supported(self.model):
+                logging.info(f"{type(self.model).__name__} cannot be compiled, serving it through sklearn")
+                return False
+
+            self.compiled_model = CompiledTreeEnsemble.from_estimator(self.model)
+            return True
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def compile_imputer(self) -> bool:
+        try:
+            if not FastKNNImputer.is_supported(self.preprocessor):
+                logging.info(f"{type(self.preprocessor).__name__} has no fast imputer, serving it through sklearn")
+                return False
+
+            self.fast_imputer = FastKNNImputer(self.preprocessor)
+            return True
 
         except Exception as e:
             raise NetworkSecurityException(e, sys)
         
 
+    def _predict_uncached(self, x):
+        ## the fast imputer gives identical output and skips rows without missing values
+        fast_imputer = getattr(self, "fast_imputer", None)
+        if fast_imputer is not None:
+            x_transformed = fast_imputer.transform(x)
+        else:
+            x_transformed = self.preprocessor.transform(x)
+
+        ## the compiled ensemble gives identical predictions, it is used where it is faster
+        ## a shared-memory model only carries the compiled ensemble, see ModelTrainer
+        compiled_model = getattr(self, "compiled_model", None)
+        if compiled_model is not None and (
+                self.model is None
+                or compiled_model.kind == COMPILED_KIND_GRADIENT_BOOSTING
+                or len(x_transformed) <= MODEL_SERVING_COMPILED_FOREST_MAX_BATCH_ROWS):
+            return compiled_model.predict(x_transformed)
+
+        y_hat = self.model.predict(x_transformed)
+
+        return y_hat
+
+
+    def _predict_cached(self, x, cache: PredictionCache):
+        feature_names = getattr(self.preprocessor, "feature_names_in_", None)
+        if hasattr(x, "columns") and feature_names is not None and list(x.columns) != list(feature_names):
+            return self._predict_uncached(x)
+
+        try:
+            keys, cacheable = pack_rows(x)
+        except NetworkSecurityException:
+            return self._predict_uncached(x)
+
+        keys_list = keys.tolist()
+        cacheable_idx = np.flatnonzero(cacheable)
+        values = [None] * len(keys_list)
+        for i, value in zip(cacheable_idx, cache.get_many([keys_list[i] for i in cacheable_idx])):
+            values[i] = value
+
+        ## score every distinct missing row once, in one batch
+        miss_idx = np.array([i for i in cacheable_idx if values[i] is None], dtype=np.int64)
+        _, first_idx, inverse = np.unique(keys[miss_idx], return_index=True, return_inverse=True)
+        uncacheable_idx = np.flatnonzero(~cacheable)
+        score_idx = np.concatenate([miss_idx[first_idx], uncacheable_idx])
+
+        if len(score_idx):
+            x_score = x.iloc[score_idx] if hasattr(x, "iloc") else np.asarray(x)[score_idx]
+            y_score = self._predict_uncached(x_score)
+
+            y_unique = y_score[:len(first_idx)]
+            for i, value in zip(miss_idx, y_unique[inverse.ravel()]):
+                values[i] = value
+            for i, value in zip(uncacheable_idx, y_score[len(first_idx):]):
+                values[i] = value
+            cache.put_many([keys_list[i] for i in miss_idx[first_idx]], y_unique)
+
+        return np.asarray(values)
+
+
     def predict(self, x):
         try:
-            x_transformed = self.preprocessor.transform(x)
-            y_hat = self.model.predict(x_transformed)
+            cache = getattr(self, "prediction_cache", None)
+            if cache is not None:
+                return self._predict_cached(x, cache)
 
-            return y_hat
+            return self._predict_uncached(x)
 
         except Exception as e: 
             raise NetworkSecurityException(e,sys)
 
-        
\ No newline at end of file
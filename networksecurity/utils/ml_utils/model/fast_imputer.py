@@ -0,0 +1,231 @@
+import sys
+
+import numpy as np
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+
+## marks a missing training value in the int8 matrix, real values must fit in [-127, 127]
+_MISSING_CODE = -128
+_ROW_BLOCK_SIZE = 256
+
+
+def _get_knn_imputer(preprocessor):
+    if isinstance(preprocessor, Pipeline) and len(preprocessor.steps) == 1:
+        preprocessor = preprocessor.steps[0][1]
+    return preprocessor if isinstance(preprocessor, KNNImputer) else None
+
+
+class FastKNNImputer:
+    """
+    Serving replacement for the fitted KNNImputer pipeline with identical output.
+
+    Rows without missing values are returned as they are. Rows with missing values are
+    compared against the distinct rows of the int8 training matrix instead of every
+    training row, and a column is imputed from the per-distance donor counts whenever
+    the k nearest donors are unambiguous. When ties at the k-th distance mix different
+    donor values, the row falls back to KNNImputer's own argpartition over the full
+    training set, so the chosen donors are always the ones sklearn would pick.
+    """
+
+    def __init__(self, preprocessor):
+        try:
+            if not FastKNNImputer.is_supported(preprocessor):
+                raise Exception(f"Cannot build a fast imputer from {preprocessor}")
+
+            imputer = _get_knn_imputer(preprocessor)
+            fit_X = imputer._fit_X
+            mask_fit_X = imputer._mask_fit_X
+
+            self.preprocessor = preprocessor
+            self.n_neighbors = imputer.n_neighbors
+            self.n_features = fit_X.shape[1]
+            self.feature_names_in_ = getattr(imputer, "feature_names_in_", None)
+
+            codes = np.where(mask_fit_X, _MISSING_CODE, np.nan_to_num(fit_X)).astype(np.int8)
+            unique_codes, inverse, counts = np.unique(codes, axis=0, return_inverse=True, return_counts=True)
+            unique_present = unique_codes != _MISSING_CODE
+
+            self.train_unique_index = inverse.ravel().astype(np.int32)
+            self.unique_values = np.where(unique_present, unique_codes, 0).astype(np.float64)
+            self.unique_squares = self.unique_values ** 2
+            self.unique_present = unique_present.astype(np.float64)
+
+            ## potential donors of every column, in training row order for the exact path and
+            ## as distinct rows with a count per donor value for the shortcut
+            self.donor_index = []
+            self.donor_train_values = []
+            self.donor_unique = []
+            self.donor_value_levels = []
+            self.donor_value_counts = []
+            self.column_means = []
+            for col in range(self.n_features):
+                donor_rows = np.flatnonzero(~mask_fit_X[:, col])
+                donor_unique = np.flatnonzero(unique_present[:, col])
+                donor_values = self.unique_values[donor_unique, col]
+                value_levels, value_index = np.unique(donor_values, return_inverse=True)
+                value_counts = np.zeros((len(donor_unique), len(value_levels)), dtype=np.float32)
+                value_counts[np.arange(len(donor_unique)), value_index] = counts[donor_unique]
+
+                self.donor_index.append(self.train_unique_index[donor_rows])
+                self.donor_train_values.append(fit_X[donor_rows, col])
+                self.donor_unique.append(donor_unique)
+                self.donor_value_levels.append(value_levels)
+                self.donor_value_counts.append(value_counts)
+                ## same expression KNNImputer uses for receivers without any donor distance
+                self.column_means.append(np.ma.array(fit_X[:, col], mask=mask_fit_X[:, col]).mean())
+
+            logging.info(f"Fast imputer indexed {len(fit_X)} training rows as {len(unique_codes)} distinct rows")
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    @staticmethod
+    def is_supported(preprocessor) -> bool:
+        imputer = _get_knn_imputer(preprocessor)
+        ## private KNNImputer state, checked against the scikit-learn pinned in requirements.txt
+        if imputer is None or not all(hasattr(imputer, name) for name in ("_fit_X", "_mask_fit_X", "_valid_mask")):
+            return False
+        if imputer.metric != "nan_euclidean" or imputer.weights != "uniform" or imputer.add_indicator:
+            return False
+        if not (isinstance(imputer.missing_values, float) and np.isnan(imputer.missing_values)):
+            return False
+        if not imputer._valid_mask.all():
+            return False
+
+        ## distances are only reproduced exactly for small integer features
+        values = imputer._fit_X[~imputer._mask_fit_X]
+        return bool(np.all(values == np.round(values)) and np.all(np.abs(values) <= 127))
+
+
+    def _to_array(self, x):
+        """The input as a float64 copy, or None if it needs KNNImputer's own validation."""
+        if hasattr(x, "columns"):
+            if self.feature_names_in_ is None or list(x.columns) != list(self.feature_names_in_):
+                return None
+            try:
+                X = x.to_numpy(dtype=np.float64, copy=True)
+            except (TypeError, ValueError):
+                return None
+        else:
+            if self.feature_names_in_ is not None:
+                return None
+            X = np.array(x, dtype=np.float64)
+
+        if X.ndim != 2 or X.shape[1] != self.n_features or len(X) == 0 or np.isinf(X).any():
+            return None
+        return X
+
+
+    def _distances(self, X_block: np.ndarray, missing: np.ndarray) -> np.ndarray:
+        ## nan_euclidean_distances against the distinct training rows, every step but the
+        ## last division is on small integers so the values match sklearn bit for bit
+        values = np.where(missing, 0.0, X_block)
+        present = (~missing).astype(np.float64)
+        squared = (values * values) @ self.unique_present.T
+        squared += present @ self.unique_squares.T
+        squared -= 2.0 * (values @ self.unique_values.T)
+        present_count = present @ self.unique_present.T
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distances = squared / present_count
+        distances *= self.n_features
+        distances[present_count == 0] = np.nan
+        return np.sqrt(distances)
+
+
+    def _impute_column(self, distances: np.ndarray, search_distances: np.ndarray,
+                       receivers: np.ndarray, col: int) -> np.ndarray:
+        n_neighbors = min(self.n_neighbors, len(self.donor_index[col]))
+        value_levels = self.donor_value_levels[col]
+        value_counts = self.donor_value_counts[col]
+
+        donor_distances = search_distances[np.ix_(receivers, self.donor_unique[col])]
+
+        total = np.zeros(len(receivers))
+        taken = np.zeros(len(receivers))
+        ambiguous = np.zeros(len(receivers), dtype=bool)
+        rows = np.arange(len(receivers))
+
+        ## take donors level by level, nearest distance first, until n_neighbors are taken
+        for _ in range(n_neighbors):
+            level = donor_distances.min(axis=1)
+            at_level = donor_distances == level[:, np.newaxis]
+            level_counts = at_level @ value_counts
+            level_count = level_counts.sum(axis=1)
+            need = n_neighbors - taken[rows]
+
+            finite = np.isfinite(level)
+            take_all = finite & (level_count <= need)
+            ## a partial tie is only safe to resolve when every tied donor has the same value
+            tie = finite & ~take_all
+            tie_resolved = tie & ((level_counts > 0).sum(axis=1) == 1)
+            ambiguous[rows[tie & ~tie_resolved]] = True
+
+            total[rows] += np.where(take_all, level_counts @ value_levels, 0.0)
+            total[rows] += np.where(tie_resolved, need * value_levels[level_counts.argmax(axis=1)], 0.0)
+            taken[rows] += np.where(take_all, level_count, 0.0) + np.where(tie_resolved, need, 0.0)
+
+            keep = take_all & (taken[rows] < n_neighbors)
+            if not keep.any():
+                break
+            rows = rows[keep]
+            donor_distances = donor_distances[keep]
+            donor_distances[at_level[keep]] = np.inf
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            imputed = total / taken
+        imputed[taken == 0] = self.column_means[col]
+
+        if ambiguous.any():
+            imputed[ambiguous] = self._impute_exact(distances[receivers[ambiguous]], col, n_neighbors)
+        return imputed
+
+
+    def _impute_exact(self, distances: np.ndarray, col: int, n_neighbors: int) -> np.ndarray:
+        ## KNNImputer._calc_impute over every potential donor, in training row order
+        dist_pot_donors = distances[:, self.donor_index[col]]
+        donors_idx = np.argpartition(dist_pot_donors, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        donors_dist = dist_pot_donors[np.arange(len(donors_idx))[:, np.newaxis], donors_idx]
+
+        weights = np.ones_like(donors_dist)
+        weights[np.isnan(donors_dist)] = 0.0
+        donors = self.donor_train_values[col].take(donors_idx)
+        return (donors * weights).sum(axis=1) / weights.sum(axis=1)
+
+
+    def transform(self, x) -> np.ndarray:
+        try:
+            X = self._to_array(x)
+            if X is None:
+                return self.preprocessor.transform(x)
+
+            missing = np.isnan(X)
+            row_missing_idx = np.flatnonzero(missing.any(axis=1))
+            if row_missing_idx.size == 0:
+                return X
+
+            observed = X[row_missing_idx][~missing[row_missing_idx]]
+            if not (np.all(observed == np.round(observed)) and np.all(np.abs(observed) <= 127)):
+                return self.preprocessor.transform(x)
+
+            for start in range(0, len(row_missing_idx), _ROW_BLOCK_SIZE):
+                rows = row_missing_idx[start:start + _ROW_BLOCK_SIZE]
+                block_missing = missing[rows]
+                distances = self._distances(X[rows], block_missing)
+                ## the shortcut searches with missing distances ordered last, as argpartition does.
+                ## float32 rounding can only merge neighbouring levels, which the tie check tolerates
+                search_distances = np.where(np.isnan(distances), np.inf, distances).astype(np.float32)
+
+                for col in np.flatnonzero(block_missing.any(axis=0)):
+                    receivers = np.flatnonzero(block_missing[:, col])
+                    X[rows[receivers], col] = self._impute_column(distances, search_distances, receivers, col)
+
+            return X
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,193 @@
+import os
+import sys
+import shutil
+from datetime import datetime
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import SCHEMA_FILE_PATH, MODEL_BUNDLE_ARRAY_MIN_BYTES
+from networksecurity.utils.main_utils.utils import (
+    read_yaml_file,
+    write_yaml_file,
+    save_object_arrays,
+    load_object_arrays,
+    get_file_digest
+)
+from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+
+
+## bump when the bundle layout changes, older readers refuse bundles they do not understand
+MODEL_BUNDLE_FORMAT_VERSION = 1
+
+MANIFEST_FILE_NAME = "manifest.yaml"
+NETWORK_MODEL_FILE_NAME = "network_model.pkl"
+MODEL_FILE_NAME = "model.pkl"
+ARRAY_DIR_NAME = "arrays"
+BASELINE_HISTOGRAM_FILE_NAME = "baseline_histogram.yaml"
+
+
+def _replace_dir(tmp_dir_path: str, dir_path: str):
+    ## swap whole directories so readers never see a half written bundle,
+    ## processes still mapping files of the old bundle keep them until they let go
+    old_dir_path = f"{dir_path}.old-{os.getpid()}"
+    if os.path.exists(dir_path):
+        os.replace(dir_path, old_dir_path)
+    os.replace(tmp_dir_path, dir_path)
+    shutil.rmtree(old_dir_path, ignore_errors=True)
+
+
+def save_model_bundle(bundle_dir_path: str, network_model: NetworkModel, metrics: dict = None,
+                      schema_file_path: str = SCHEMA_FILE_PATH,
+                      min_array_bytes: int = MODEL_BUNDLE_ARRAY_MIN_BYTES,
+                      baseline_histogram: dict = None) -> dict:
+    """
+    Save a trained NetworkModel as a versioned bundle directory:
+
+        manifest.yaml       format version, training timestamp, schema hash, metrics, file digests
+        network_model.pkl   what serving needs: preprocessor, compiled ensemble, fast imputer
+        model.pkl           the fitted sklearn estimator
+        arrays/*.npy        every large array of both pickles, stored out-of-line
+        baseline_histogram.yaml   value counts of the training features, when given
+
+    The sklearn estimator is kept out of network_model.pkl when the compiled ensemble serves
+    it, since unpickling sklearn trees copies their nodes into every worker.
+    Returns the manifest.
+    """
+    try:
+        tmp_dir_path = f"{bundle_dir_path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir_path, ignore_errors=True)
+        array_dir_path = os.path.join(tmp_dir_path, ARRAY_DIR_NAME)
+
+        serving_model = NetworkModel(
+            preprocessor=network_model.preprocessor,
+            model=network_model.model if network_model.compiled_model is None else None,
+            compiled_model=network_model.compiled_model
+        )
+        serving_model.fast_imputer = getattr(network_model, "fast_imputer", None)
+
+        files = {}
+        for file_name, obj, prefix in ((NETWORK_MODEL_FILE_NAME, serving_model, "network_model-"),
+                                       (MODEL_FILE_NAME, network_model.model, "model-")):
+            file_path = os.path.join(tmp_dir_path, file_name)
+            for array_file_name in save_object_arrays(file_path, obj, array_dir_path, min_array_bytes, prefix):
+                files[f"{ARRAY_DIR_NAME}/{array_file_name}"] = get_file_digest(
+                    os.path.join(array_dir_path, array_file_name))
+            files[file_name] = get_file_digest(file_path)
+
+        if baseline_histogram is not None:
+            baseline_histogram_file_path = os.path.join(tmp_dir_path, BASELINE_HISTOGRAM_FILE_NAME)
+            write_yaml_file(baseline_histogram_file_path, baseline_histogram)
+            files[BASELINE_HISTOGRAM_FILE_NAME] = get_file_digest(baseline_histogram_file_path)
+
+        feature_names = getattr(network_model.preprocessor, "feature_names_in_", None)
+        manifest = {
+            "format_version": MODEL_BUNDLE_FORMAT_VERSION,
+            "trained_at": datetime.now().isoformat(),
+            "model_name": type(network_model.model).__name__,
+            "compiled": network_model.compiled_model is not None,
+            "schema_hash": get_file_digest(schema_file_path),
+            "feature_names": [str(name) for name in feature_names] if feature_names is not None else None,
+            "metrics": metrics or {},
+            "files": files
+        }
+        write_yaml_file(os.path.join(tmp_dir_path, MANIFEST_FILE_NAME), manifest)
+
+        _replace_dir(tmp_dir_path, bundle_dir_path)
+        logging.info(f"Saved model bundle to {bundle_dir_path}")
+        return manifest
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def publish_model_bundle(bundle_dir_path: str, target_dir_path: str) -> None:
+    """Copy a bundle to where the api serves it from, replacing the previous one in one step."""
+    try:
+        tmp_dir_path = f"{target_dir_path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir_path, ignore_errors=True)
+        shutil.copytree(bundle_dir_path, tmp_dir_path)
+        _replace_dir(tmp_dir_path, target_dir_path)
+        logging.info(f"Published model bundle {bundle_dir_path} to {target_dir_path}")
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+class ModelBundle:
+    """
+    Read side of a model bundle. Only the manifest is read up front, the pickles are
+    loaded on request and with mmap_mode "r" their arrays are mapped read-only.
+    """
+
+    def __init__(self, bundle_dir_path: str, mmap_mode: str = "r"):
+        try:
+            self.bundle_dir_path = bundle_dir_path
+            self.mmap_mode = mmap_mode
+            self.manifest_file_path = os.path.join(bundle_dir_path, MANIFEST_FILE_NAME)
+            if not os.path.exists(self.manifest_file_path):
+                raise Exception(f"No model bundle manifest at: {self.manifest_file_path}")
+
+            self.manifest: dict = read_yaml_file(self.manifest_file_path)
+            format_version = self.manifest.get("format_version")
+            if not isinstance(format_version, int) or format_version > MODEL_BUNDLE_FORMAT_VERSION:
+                raise Exception(f"Model bundle format version {format_version} is not supported, "
+                                f"this code reads up to version {MODEL_BUNDLE_FORMAT_VERSION}")
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def _load(self, file_name: str) -> object:
+        return load_object_arrays(
+            file_path=os.path.join(self.bundle_dir_path, file_name),
+            array_dir_path=os.path.join(self.bundle_dir_path, ARRAY_DIR_NAME),
+            mmap_mode=self.mmap_mode
+        )
+
+
+    def load_model(self) -> object:
+        """The fitted sklearn estimator."""
+        try:
+            return self._load(MODEL_FILE_NAME)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def load_network_model(self, with_model: bool = False) -> NetworkModel:
+        """
+        The NetworkModel used for serving. Without with_model a compiled ensemble stands in
+        for the sklearn estimator, which is then not loaded at all.
+        """
+        try:
+            network_model = self._load(NETWORK_MODEL_FILE_NAME)
+            if network_model.model is None and with_model:
+                network_model.model = self.load_model()
+            return network_model
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def load_baseline_histogram(self) -> dict:
+        """The training feature histogram live drift is measured against, None if the bundle has none."""
+        try:
+            file_path = os.path.join(self.bundle_dir_path, BASELINE_HISTOGRAM_FILE_NAME)
+            if not os.path.exists(file_path):
+                return None
+            return read_yaml_file(file_path)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def verify(self) -> None:
+        """Raise if any file of the bundle does not match the digest in its manifest."""
+        try:
+            for file_name, digest in self.manifest.get("files", {}).items():
+                if get_file_digest(os.path.join(self.bundle_dir_path, file_name)) != digest:
+                    raise Exception(f"{file_name} in {self.bundle_dir_path} does not match its manifest digest")
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
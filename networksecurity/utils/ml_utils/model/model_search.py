@@ -0,0 +1,474 @@
+import os
+import sys
+import math
+import mmap
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import numpy as np
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import accuracy_score, r2_score
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.utils import resample
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    MODEL_TRAINER_SEARCH_CV_FOLDS,
+    MODEL_TRAINER_SEARCH_N_JOBS,
+    MODEL_TRAINER_SEARCH_WEIGHTED_SCORES,
+    MODEL_TRAINER_SEARCH_HALVING_FACTOR,
+    MODEL_TRAINER_SEARCH_BUDGET_SECONDS,
+    MODEL_TRAINER_SEARCH_BUDGET_FITS
+)
+
+
+## the training data and folds of a search worker, set once by _init_worker
+_worker_state: dict = {}
+
+
+def _array_source(array, dir_path: str, name: str) -> tuple:
+    ## a memory-mapped .npy is reopened from its own file, anything else is written once to dir_path
+    if isinstance(array, np.memmap) and isinstance(array.base, mmap.mmap) and array.filename:
+        order = "F" if array.flags.f_contiguous and not array.flags.c_contiguous else "C"
+        return ("memmap", array.filename, array.offset, array.dtype.str, array.shape, order)
+    file_path = os.path.join(dir_path, f"{name}.npy")
+    np.save(file_path, np.asarray(array))
+    return ("npy", file_path)
+
+
+def _open_array(source: tuple) -> np.ndarray:
+    if source[0] == "memmap":
+        _, file_path, offset, dtype, shape, order = source
+        return np.memmap(file_path, dtype=dtype, mode="r", offset=offset, shape=shape, order=order)
+    return np.load(source[1], mmap_mode="r")
+
+
+def _init_worker(sources: dict, folds: list, random_state: int, stratify: bool, weighted_scores: bool):
+    ## every worker maps the same files, the pages are shared and nothing is copied per task
+    for name, source in sources.items():
+        _worker_state[name] = None if source is None else _open_array(source)
+    _worker_state["folds"] = folds
+    _worker_state["random_state"] = random_state
+    _worker_state["stratify"] = stratify
+    _worker_state["weighted_scores"] = weighted_scores
+
+
+def _subsample(train: np.ndarray, n_samples: int, fold: int) -> np.ndarray:
+    ## the same rows of a fold for every candidate given n_samples, stratified for classifiers
+    stratify = _worker_state["y"][train] if _worker_state["stratify"] else None
+    rows = resample(train, replace=False, n_samples=n_samples, stratify=stratify,
+                    random_state=_worker_state["random_state"] + fold)
+    return np.sort(rows)
+
+
+def _fit(estimator, params: dict, rows: np.ndarray = None):
+    X, y, sample_weight = _worker_state["X"], _worker_state["y"], _worker_state["sample_weight"]
+    estimator = clone(estimator).set_params(**params)
+    fit_params = {}
+    if rows is None:
+        if sample_weight is not None:
+            fit_params["sample_weight"] = sample_weight
+        return estimator.fit(X, y, **fit_params)
+    if sample_weight is not None:
+        fit_params["sample_weight"] = sample_weight[rows]
+    return estimator.fit(X[rows], y[rows], **fit_params)
+
+
+def _staged_scores(estimator, X, y, sample_weight, stages: list) -> list:
+    ## the held out score after each of the stages, from one fit of a boosting ensemble: its
+    ## first n stages are the fit with n_estimators=n. one that stopped early scores its last
+    score = accuracy_score if is_classifier(estimator) else r2_score
+    scores, y_pred = [], None
+    for n_stage, y_pred in enumerate(estimator.staged_predict(X), start=1):
+        if n_stage in stages:
+            scores.append(score(y, y_pred, sample_weight=sample_weight))
+    return scores + [score(y, y_pred, sample_weight=sample_weight)] * (len(stages) - len(scores))
+
+
+def _run_task(task: tuple) -> tuple:
+    ## (key, estimator, params, fold, n_samples, stages): the held out score of one fold, fit on
+    ## n_samples of its training rows when not None, scored after each of the n_estimators in stages
+    ## when not None, or with fold None the estimator refit on all rows
+    key, estimator, params, fold, n_samples, stages = task
+    start = time.perf_counter()
+    if fold is None:
+        result = _fit(estimator, params)
+    else:
+        train, test = _worker_state["folds"][fold]
+        if n_samples is not None and n_samples < len(train):
+            train = _subsample(train, n_samples, fold)
+        ## the estimator's own score, weighted by sample_weight only with weighted_scores
+        sample_weight = _worker_state["sample_weight"]
+        score_params = {}
+        if sample_weight is not None and _worker_state["weighted_scores"]:
+            score_params["sample_weight"] = sample_weight[test]
+        fitted = _fit(estimator, params, train)
+        if stages is None:
+            result = fitted.score(_worker_state["X"][test], _worker_state["y"][test], **score_params)
+        else:
+            result = _staged_scores(fitted, _worker_state["X"][test], _worker_state["y"][test],
+                                    score_params.get("sample_weight"), stages)
+    return key, fold, result, time.perf_counter() - start
+
+
+def _task_cost(estimator, params: dict, n_samples: int, n_rows: int) -> float:
+    ## longest fits first, so the pool does not wait on a large ensemble at the end
+    cost = params.get("n_estimators", getattr(estimator, "n_estimators", 1))
+    return cost if n_samples is None else cost * n_samples / n_rows
+
+
+@dataclass
+class ModelSearchResult:
+    best_estimator: object
+    best_params: dict
+    best_score: float
+    ## mean held out score of every candidate, in ParameterGrid order. for successive halving,
+    ## the candidates of the last round that ran, with the resource they ran on
+    candidate_params: list = field(default_factory=list)
+    mean_test_scores: list = field(default_factory=list)
+
+
+class SearchScheduler:
+    """
+    Runs cross validation fits and refits of many estimators on one process pool.
+
+    The pool is started once. X, y and sample_weight are memory-mapped by every worker:
+    a memory-mapped .npy is reopened from its own file, and any other array is written
+    once to a temporary .npy. The folds are computed once and shared by every candidate,
+    so scores are comparable across models. Each task is one (candidate, fold) fit or one
+    refit. Tasks are submitted with the largest n_estimators first. A cross validation fit
+    can run on a subsample of its fold's training rows, drawn with random_state and the
+    same for every candidate. sample_weight always goes to fit; the held out scores are
+    weighted by it only with weighted_scores. Use it as a context manager; stats has the
+    seconds spent fitting against the wall clock.
+    """
+
+    def __init__(self, X, y, sample_weight=None, cv: int = MODEL_TRAINER_SEARCH_CV_FOLDS,
+                 n_jobs: int = MODEL_TRAINER_SEARCH_N_JOBS, classifier: bool = True, random_state: int = 0,
+                 weighted_scores: bool = MODEL_TRAINER_SEARCH_WEIGHTED_SCORES):
+        try:
+            self.X, self.y, self.sample_weight = X, y, sample_weight
+            self.weighted_scores = weighted_scores
+            self.classifier, self.random_state = classifier, random_state
+            self.n_workers = max(1, (os.cpu_count() or 1) + 1 + n_jobs) if n_jobs < 0 else max(1, n_jobs)
+            splitter = check_cv(cv, y, classifier=classifier)
+            self.folds = [(train, test) for train, test in splitter.split(np.zeros(len(y)), y)]
+            self.stats = {"fits": 0, "fit_seconds": 0.0, "max_fit_seconds": 0.0, "wall_seconds": 0.0,
+                          "workers": self.n_workers}
+            self._tmp_dir = None
+            self._executor = None
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def __enter__(self):
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix="model-search-")
+        sources = {
+            "X": _array_source(self.X, self._tmp_dir.name, "X"),
+            "y": _array_source(self.y, self._tmp_dir.name, "y"),
+            "sample_weight": None if self.sample_weight is None
+                             else _array_source(self.sample_weight, self._tmp_dir.name, "sample_weight")
+        }
+        self._executor = ProcessPoolExecutor(max_workers=self.n_workers,
+                                             mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker,
+                                             initargs=(sources, self.folds, self.random_state, self.classifier,
+                                                       self.weighted_scores))
+        self._started = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self._executor.shutdown(cancel_futures=True)
+        self._tmp_dir.cleanup()
+        self.stats["wall_seconds"] = time.perf_counter() - self._started
+        wall, busy = self.stats["wall_seconds"], self.stats["fit_seconds"]
+        logging.info(f"Model search ran {self.stats['fits']} fits in {wall:.1f}s on {self.n_workers} processes: "
+                     f"{busy:.1f}s of fitting, {busy / max(wall, 1e-9):.2f}x the wall clock, "
+                     f"{busy / max(wall * self.n_workers, 1e-9):.0%} of the processes busy")
+
+
+    def _run(self, tasks: list) -> list:
+        order = sorted(range(len(tasks)), key=lambda i: -_task_cost(tasks[i][1], tasks[i][2], tasks[i][4], len(self.y)))
+        futures = [self._executor.submit(_run_task, tasks[i]) for i in order]
+        results = []
+        for future in as_completed(futures):
+            key, fold, result, seconds = future.result()
+            self.stats["fits"] += 1
+            self.stats["fit_seconds"] += seconds
+            self.stats["max_fit_seconds"] = max(self.stats["max_fit_seconds"], seconds)
+            results.append((key, fold, result))
+        return results
+
+
+    def cross_validate(self, candidates: dict, n_samples: dict = None, stages: dict = None) -> dict:
+        """
+        Mean held out score of every {key: (estimator, params)} candidate, all folds at once.
+        n_samples {key: rows} fits a candidate on that many of each fold's training rows.
+        stages {key: [n_estimators, ...]} scores a boosting candidate after each of those
+        stages of its one fit, and gives a list of mean scores for it, one per stage.
+        """
+        try:
+            n_samples, stages = n_samples or {}, stages or {}
+            tasks = [(key, estimator, params, fold, n_samples.get(key), stages.get(key))
+                     for key, (estimator, params) in candidates.items() for fold in range(len(self.folds))]
+            scores = {key: [None] * len(self.folds) for key in candidates}
+            for key, fold, score in self._run(tasks):
+                scores[key][fold] = score
+            mean_scores = {}
+            for key, fold_scores in scores.items():
+                mean = np.mean(fold_scores, axis=0)
+                mean_scores[key] = mean.tolist() if key in stages else float(mean)
+            return mean_scores
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def refit(self, candidates: dict) -> dict:
+        """Every {key: (estimator, params)} candidate fitted on all rows, all at once."""
+        try:
+            return {key: estimator for key, _, estimator in
+                    self._run([(key, estimator, params, None, None, None) for key, (estimator, params) in candidates.items()])}
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+def grid_search_models(models: dict, params: dict, X, y, sample_weight=None,
+                       cv: int = MODEL_TRAINER_SEARCH_CV_FOLDS, n_jobs: int = MODEL_TRAINER_SEARCH_N_JOBS,
+                       weighted_scores: bool = MODEL_TRAINER_SEARCH_WEIGHTED_SCORES,
+                       scheduler_stats: dict = None) -> dict:
+    """
+    GridSearchCV over every model at once: the (model, params, fold) fits of all the grids
+    share one SearchScheduler, then the best params of each model are refit once. The best
+    candidate is the first with the highest mean score, as GridSearchCV picks it. The fold
+    scores are weighted by sample_weight only with weighted_scores, see SearchScheduler.
+    Returns {model name: ModelSearchResult}, scheduler_stats is updated with the stats.
+    """
+    try:
+        grids = {model_name: list(ParameterGrid(params.get(model_name, {}))) for model_name in models}
+        classifier = all(is_classifier(model) for model in models.values())
+
+        with SearchScheduler(X, y, sample_weight=sample_weight, cv=cv, n_jobs=n_jobs, classifier=classifier,
+                             weighted_scores=weighted_scores) as scheduler:
+            scores = scheduler.cross_validate({(model_name, i): (models[model_name], candidate)
+                                               for model_name, grid in grids.items()
+                                               for i, candidate in enumerate(grid)})
+            best = {}
+            for model_name, grid in grids.items():
+                mean_scores = [scores[(model_name, i)] for i in range(len(grid))]
+                best[model_name] = int(np.argmax(mean_scores))
+            best_estimators = scheduler.refit({model_name: (models[model_name], grids[model_name][best_index])
+                                               for model_name, best_index in best.items()})
+
+        if scheduler_stats is not None:
+            scheduler_stats.update(scheduler.stats)
+
+        results = {}
+        for model_name, grid in grids.items():
+            mean_scores = [scores[(model_name, i)] for i in range(len(grid))]
+            results[model_name] = ModelSearchResult(
+                best_estimator=best_estimators[model_name],
+                best_params=grid[best[model_name]],
+                best_score=mean_scores[best[model_name]],
+                candidate_params=grid,
+                mean_test_scores=mean_scores
+            )
+            logging.info(f"{model_name}: best of {len(grid)} candidates {grid[best[model_name]]}, "
+                         f"mean cv score {mean_scores[best[model_name]]:.4f}")
+        return results
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def _n_rounds(ratio: int, factor: int) -> int:
+    ## 1 + floor(log(ratio, factor)), in integers
+    n_rounds = 1
+    while factor ** n_rounds <= ratio:
+        n_rounds += 1
+    return n_rounds
+
+
+def _halving_plan(model, grid_params: dict, max_samples: int, min_samples: int, factor: int) -> dict:
+    ## the resource of a model is n_estimators when its grid searches it, the training rows
+    ## otherwise. rounds end on the full resource, each on factor times more than the last
+    grid_params = dict(grid_params)
+    if "n_estimators" in grid_params:
+        values = sorted(grid_params.pop("n_estimators"))
+        resource, max_resource, min_resource = "n_estimators", values[-1], values[0]
+    else:
+        values = []
+        resource, max_resource, min_resource = "n_samples", max_samples, min(min_samples, max_samples)
+    candidates = list(ParameterGrid(grid_params))
+    ## as many rounds as it takes to get down to one candidate, as far as the resource allows
+    n_rounds = min(_n_rounds(len(candidates), factor), _n_rounds(max_resource // min_resource, factor))
+    return {
+        "resource": resource,
+        "max_resource": max_resource,
+        "resources": [max_resource // factor ** (n_rounds - 1 - i) for i in range(n_rounds)],
+        ## a boosting ensemble is fit once per round up to the largest of the grid's n_estimators
+        ## within the resource, and scored at every one of them on the way
+        "stages": values if resource == "n_estimators" and hasattr(model, "staged_predict") else None,
+        "candidates": candidates,
+        "survivors": list(range(len(candidates))),
+        "scores": {},
+        "best_n_estimators": {},
+        "evaluated_resource": None
+    }
+
+
+def _round_stages(plan: dict, resource: int) -> list:
+    return [n_estimators for n_estimators in plan["stages"] if n_estimators <= resource]
+
+
+def _candidate_params(plan: dict, index: int, resource: int) -> dict:
+    candidate = dict(plan["candidates"][index])
+    if plan["resource"] == "n_estimators":
+        candidate["n_estimators"] = plan["best_n_estimators"].get(index, resource)
+    return candidate
+
+
+def halving_search_models(models: dict, params: dict, X, y, sample_weight=None,
+                          cv: int = MODEL_TRAINER_SEARCH_CV_FOLDS, n_jobs: int = MODEL_TRAINER_SEARCH_N_JOBS,
+                          factor: int = MODEL_TRAINER_SEARCH_HALVING_FACTOR,
+                          budget_seconds: float = MODEL_TRAINER_SEARCH_BUDGET_SECONDS,
+                          budget_fits: float = MODEL_TRAINER_SEARCH_BUDGET_FITS,
+                          weighted_scores: bool = MODEL_TRAINER_SEARCH_WEIGHTED_SCORES,
+                          scheduler_stats: dict = None) -> dict:
+    """
+    Successive halving over every model at once, a budgeted stand-in for grid_search_models.
+
+    A model whose grid has n_estimators uses it as the resource and searches the rest of its
+    grid; any other model uses the training rows of each fold. Every candidate is first cross
+    validated on a small resource, then the best 1 / factor of them on factor times more, until
+    the last round runs on the full resource. A boosting ensemble is scored after each of the
+    grid's n_estimators within the resource from a single fit, so it stops early at the best of
+    them; others run on the resource itself. The rounds of all models share one SearchScheduler.
+    Before each round after the first, its cost is estimated from the last one; when it would go
+    over budget_seconds of wall clock or budget_fits full fits, the search stops there. The best
+    candidate of each model's last round, first on ties, is refit on all rows, with its best
+    n_estimators or the full one. Returns {model name: ModelSearchResult}, scheduler_stats is
+    updated with the stats.
+    """
+    try:
+        classifier = all(is_classifier(model) for model in models.values())
+
+        with SearchScheduler(X, y, sample_weight=sample_weight, cv=cv, n_jobs=n_jobs, classifier=classifier,
+                             weighted_scores=weighted_scores) as scheduler:
+            n_folds = len(scheduler.folds)
+            max_samples = min(len(train) for train, _ in scheduler.folds)
+            ## as HalvingGridSearchCV: two rows of every class in every fold
+            min_samples = 2 * n_folds * (len(np.unique(y)) if classifier else 1)
+            plans = {model_name: _halving_plan(model, params.get(model_name, {}), max_samples, min_samples, factor)
+                     for model_name, model in models.items()}
+
+            started = time.perf_counter()
+            used_fits, seconds_per_fit = 0.0, 0.0
+            for round_index in range(max(len(plan["resources"]) for plan in plans.values())):
+                active = {model_name: plan for model_name, plan in plans.items() if round_index < len(plan["resources"])}
+                candidates, n_samples, stages, round_fits = {}, {}, {}, 0.0
+                for model_name, plan in active.items():
+                    resource = plan["resources"][round_index]
+                    if plan["stages"] is not None:
+                        resource = _round_stages(plan, resource)[-1]
+                    for i in plan["survivors"]:
+                        candidate = dict(plan["candidates"][i])
+                        if plan["resource"] == "n_estimators":
+                            candidate["n_estimators"] = resource
+                        if plan["stages"] is not None:
+                            stages[(model_name, i)] = _round_stages(plan, resource)
+                        elif plan["resource"] == "n_samples" and resource < plan["max_resource"]:
+                            n_samples[(model_name, i)] = resource
+                        candidates[(model_name, i)] = (models[model_name], candidate)
+                    round_fits += len(plan["survivors"]) * n_folds * resource / plan["max_resource"]
+
+                elapsed = time.perf_counter() - started
+                if round_index > 0 and ((budget_fits is not None and used_fits + round_fits > budget_fits) or
+                                        (budget_seconds is not None and elapsed + seconds_per_fit * round_fits > budget_seconds)):
+                    logging.info(f"Halving search stopped before round {round_index}: {round_fits:.1f} more full fits "
+                                 f"after {used_fits:.1f} in {elapsed:.1f}s would go over the budget")
+                    break
+
+                round_started = time.perf_counter()
+                scores = scheduler.cross_validate(candidates, n_samples, stages)
+                round_seconds = time.perf_counter() - round_started
+                seconds_per_fit = round_seconds / max(round_fits, 1e-9)
+                used_fits += round_fits
+                logging.info(f"Halving round {round_index}: {len(candidates)} candidates of {len(active)} models, "
+                             f"{round_fits:.1f} full fits in {round_seconds:.1f}s")
+
+                for model_name, plan in active.items():
+                    plan["evaluated_resource"] = plan["resources"][round_index]
+                    plan["scores"] = {}
+                    for i in plan["survivors"]:
+                        score = scores[(model_name, i)]
+                        if plan["stages"] is not None:
+                            stage_scores = score
+                            score = max(stage_scores)
+                            plan["best_n_estimators"][i] = stages[(model_name, i)][stage_scores.index(score)]
+                        plan["scores"][i] = score
+                    ## stable sort, tied candidates keep their grid order
+                    ranked = sorted(plan["survivors"], key=lambda i: -plan["scores"][i])
+                    plan["survivors"] = sorted(ranked[:math.ceil(len(plan["candidates"]) / factor ** (round_index + 1))])
+
+            best = {model_name: max(sorted(plan["scores"]), key=plan["scores"].get) for model_name, plan in plans.items()}
+            best_params = {model_name: _candidate_params(plan, best[model_name], plan["max_resource"])
+                           for model_name, plan in plans.items()}
+            best_estimators = scheduler.refit({model_name: (models[model_name], best_params[model_name])
+                                               for model_name in models})
+
+        if scheduler_stats is not None:
+            scheduler_stats.update(scheduler.stats)
+            scheduler_stats["full_fits"] = used_fits
+
+        results = {}
+        for model_name, plan in plans.items():
+            evaluated = sorted(plan["scores"])
+            results[model_name] = ModelSearchResult(
+                best_estimator=best_estimators[model_name],
+                best_params=best_params[model_name],
+                best_score=plan["scores"][best[model_name]],
+                candidate_params=[_candidate_params(plan, i, plan["evaluated_resource"]) for i in evaluated],
+                mean_test_scores=[plan["scores"][i] for i in evaluated]
+            )
+            logging.info(f"{model_name}: best of {len(plan['candidates'])} candidates by halving over "
+                         f"{plan['resource']} {best_params[model_name]}, mean cv score "
+                         f"{plan['scores'][best[model_name]]:.4f} at {plan['resource']}={plan['evaluated_resource']}")
+        return results
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def compare_search_results(results: dict, reference: dict) -> dict:
+    """
+    Where the best params of a search, such as halving_search_models, stand in an exhaustive
+    reference search over the same grids, such as grid_search_models. Logs and returns
+    {model name: {"score", "rank", "best_score", "best_params"}}: the reference's mean cv
+    score of the pick, its rank among the reference's candidates (1 is the best), and the
+    reference's own best. score is nan and rank None when the pick is not in the reference.
+    """
+    try:
+        comparison = {}
+        for model_name, result in results.items():
+            ref = reference[model_name]
+            matches = [i for i, candidate in enumerate(ref.candidate_params) if candidate == result.best_params]
+            score = ref.mean_test_scores[matches[0]] if matches else float("nan")
+            rank = 1 + sum(ref_score > score for ref_score in ref.mean_test_scores) if matches else None
+            comparison[model_name] = {"score": score, "rank": rank,
+                                      "best_score": ref.best_score, "best_params": ref.best_params}
+            logging.info(f"{model_name}: picked {result.best_params} with mean cv score {score:.4f} in the full grid, "
+                         f"rank {rank} of {len(ref.candidate_params)}, against the grid's best {ref.best_params} "
+                         f"with {ref.best_score:.4f} ({score - ref.best_score:+.4f})")
+        return comparison
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
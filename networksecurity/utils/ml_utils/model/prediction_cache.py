@@ -0,0 +1,109 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from networksecurity.exception.exception import NetworkSecurityException
+
+
+## 2 bits per feature: -1, 0, 1 and missing, so a 30 feature row packs into one uint64
+_CODE_BITS = 2
+_MISSING_CODE = 3
+MAX_PACKED_FEATURES = 64 // _CODE_BITS
+
+
+def pack_rows(X: np.ndarray):
+    """
+    Pack each row of ternary features into a uint64 key.
+    Returns (keys, cacheable) where cacheable marks rows whose values are all in {-1, 0, 1, nan}.
+    """
+    try:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] > MAX_PACKED_FEATURES:
+            raise Exception(f"Cannot pack rows of shape {X.shape}, at most {MAX_PACKED_FEATURES} features fit a key")
+
+        missing = np.isnan(X)
+        cacheable = (missing | (X == -1) | (X == 0) | (X == 1)).all(axis=1)
+
+        codes = np.where(missing, _MISSING_CODE, np.where(cacheable[:, np.newaxis], X + 1, 0)).astype(np.uint64)
+        shifts = (np.arange(X.shape[1], dtype=np.uint64) * np.uint64(_CODE_BITS))
+        keys = np.bitwise_or.reduce(codes << shifts, axis=1) if X.shape[1] else np.zeros(len(X), dtype=np.uint64)
+        return keys, cacheable
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+class PredictionCache:
+    """Bounded LRU map from packed feature rows to predictions, safe to share between threads."""
+
+    def __init__(self, max_size: int):
+        try:
+            if max_size < 1:
+                raise Exception(f"Prediction cache size must be at least 1, got {max_size}")
+
+            self.max_size = max_size
+            self._entries = OrderedDict()
+            self._lock = threading.Lock()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def __getstate__(self):
+        ## the cache belongs to a loaded model, a pickled NetworkModel starts empty
+        return {"max_size": self.max_size}
+
+
+    def __setstate__(self, state):
+        self.__init__(state["max_size"])
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+    def get_many(self, keys) -> list:
+        """Cached prediction per key, None for keys that are not cached."""
+        values = []
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                values.append(value)
+        return values
+
+
+    def put_many(self, keys, values):
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
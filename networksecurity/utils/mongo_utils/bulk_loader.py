@@ -0,0 +1,209 @@
+import os
+import sys
+import time
+import struct
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
+
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+def row_object_id(load_timestamp: int, row: int) -> ObjectId:
+    """
+    _id of a csv row: the load's timestamp followed by the row number, so inserting a row twice
+    under one timestamp is a duplicate key instead of a second copy.
+    """
+    return ObjectId(struct.pack(">IQ", load_timestamp, row))
+
+
+def object_id_row(object_id: ObjectId) -> int:
+    return struct.unpack(">IQ", object_id.binary)[1]
+
+
+def chunk_to_documents(chunk: pd.DataFrame, load_timestamp: int) -> list:
+    try:
+        ## missing values go in as null, like the json conversion did
+        if chunk.isna().any().any():
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+        documents = chunk.to_dict(orient="records")
+        for row, document in zip(chunk.index, documents):
+            document["_id"] = row_object_id(load_timestamp, int(row))
+        return documents
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def insert_documents(collection, documents: list) -> tuple:
+    """Unordered insert_many where rows already in the collection count as done. Returns (inserted, duplicates)."""
+    try:
+        collection.insert_many(documents, ordered=False)
+        return len(documents), 0
+
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR_CODE for error in write_errors):
+            raise NetworkSecurityException(e, sys)
+        return e.details.get("nInserted", 0), len(write_errors)
+
+
+def insert_resumed_documents(collection, documents: list, earlier_load_timestamps: list) -> tuple:
+    """
+    insert_documents for a chunk of a resumed load: rows that an earlier attempt already inserted,
+    under any of its timestamps, are left as they are and counted as duplicates.
+    """
+    try:
+        rows = [object_id_row(document["_id"]) for document in documents]
+        earlier_ids = [row_object_id(load_timestamp, row) for load_timestamp in earlier_load_timestamps for row in rows]
+        loaded = {object_id_row(document["_id"]) for document in collection.find({"_id": {"$in": earlier_ids}}, {"_id": 1})}
+        documents = [document for row, document in zip(rows, documents) if row not in loaded]
+        inserted, duplicates = insert_documents(collection, documents) if documents else (0, 0)
+        return inserted, duplicates + len(loaded)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+class BulkLoadCheckpoint:
+    """
+    Progress of loading one csv file, kept in a small yaml file. It ties the load to the
+    file's size and mtime and remembers the load timestamp the _id values are built from.
+
+    Chunks finish out of order, so when a load fails, rows of its unfinished chunks can be
+    missing below _ids that are already in the collection, and a feature store sync in
+    between may have moved its watermark past them. A resumed load therefore takes a fresh
+    load timestamp, later than every earlier one, and inserts the missing rows of the
+    unfinished chunks under it, above any watermark; the earlier timestamps are kept to find
+    the rows that did make it. The checkpoint is saved with the new timestamp before any
+    insert, so a resume that fails in turn is resumed the same way.
+    """
+
+    def __init__(self, checkpoint_file_path: str, file_path: str):
+        try:
+            self.checkpoint_file_path = checkpoint_file_path
+            stat = os.stat(file_path)
+            source = {"file_path": os.path.abspath(file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+            state = read_yaml_file(checkpoint_file_path) if os.path.exists(checkpoint_file_path) else None
+            ## a load of this very file that did not complete
+            self.resumed = state is not None and state["source"] == source and not state["completed"]
+            if state is None or state["source"] != source:
+                state = {"source": source, "load_timestamp": int(time.time()), "earlier_load_timestamps": [],
+                         "done_chunks": [], "completed": False}
+            self.state = state
+            self.done_chunks = set(state["done_chunks"])
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def resume(self):
+        """Start the remaining chunks under a fresh load timestamp, saved before anything is inserted."""
+        try:
+            load_timestamp = self.state["load_timestamp"]
+            self.state["earlier_load_timestamps"] = self.earlier_load_timestamps + [load_timestamp]
+            self.state["load_timestamp"] = max(int(time.time()), load_timestamp + 1)
+            self.save()
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    @property
+    def load_timestamp(self) -> int:
+        return self.state["load_timestamp"]
+
+
+    @property
+    def earlier_load_timestamps(self) -> list:
+        return self.state.get("earlier_load_timestamps", [])
+
+
+    @property
+    def completed(self) -> bool:
+        return self.state["completed"]
+
+
+    def save(self, completed: bool = False):
+        self.state["done_chunks"] = sorted(self.done_chunks)
+        self.state["completed"] = completed
+        tmp_file_path = f"{self.checkpoint_file_path}.tmp-{os.getpid()}"
+        write_yaml_file(tmp_file_path, self.state)
+        os.replace(tmp_file_path, self.checkpoint_file_path)
+
+
+def bulk_load_csv(collection, file_path: str, checkpoint_file_path: str, chunk_size: int = 5000,
+                  max_workers: int = 4) -> dict:
+    """
+    Stream a csv file into the collection: chunks are read with pandas, turned straight into
+    documents and sent as unordered insert_many batches from a thread pool, with at most
+    2 * max_workers chunks in memory. Finished chunks are recorded in the checkpoint, so a
+    failed load resumes with the chunks that did not finish, under a fresh load timestamp
+    (see BulkLoadCheckpoint); rows of a half written chunk are not inserted again. A feature
+    store sync that runs while a load is in progress can still pass over rows of chunks in
+    flight, so sync once the load has completed. Returns the load statistics.
+    """
+    try:
+        checkpoint = BulkLoadCheckpoint(checkpoint_file_path, file_path)
+        stats = {"documents": 0, "duplicates": 0, "skipped_chunks": len(checkpoint.done_chunks), "seconds": 0.0}
+        if checkpoint.completed:
+            logging.info(f"{file_path} was already loaded into {collection.name}, checkpoint {checkpoint_file_path}")
+            return stats
+        if checkpoint.resumed:
+            checkpoint.resume()
+            logging.info(f"Resuming the load of {file_path} into {collection.name} with {len(checkpoint.done_chunks)} "
+                         f"chunks done, under load timestamp {checkpoint.load_timestamp}")
+        else:
+            ## the timestamp is on disk before the first insert, a load that dies early resumes too
+            checkpoint.save()
+
+        start = time.perf_counter()
+        pending = {}
+
+        def collect(futures):
+            for future in futures:
+                inserted, duplicates = future.result()
+                stats["documents"] += inserted
+                stats["duplicates"] += duplicates
+                checkpoint.done_chunks.add(pending.pop(future))
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for chunk_index, chunk in enumerate(pd.read_csv(file_path, chunksize=chunk_size)):
+                    if chunk_index in checkpoint.done_chunks:
+                        continue
+                    documents = chunk_to_documents(chunk, checkpoint.load_timestamp)
+                    if checkpoint.earlier_load_timestamps:
+                        future = executor.submit(insert_resumed_documents, collection, documents,
+                                                 checkpoint.earlier_load_timestamps)
+                    else:
+                        future = executor.submit(insert_documents, collection, documents)
+                    pending[future] = chunk_index
+                    if len(pending) >= 2 * max_workers:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                        checkpoint.save()
+                collect(wait(pending).done)
+
+        finally:
+            ## the pool has drained by now, keep every chunk that made it even when another failed
+            collect([future for future in list(pending) if future.done() and future.exception() is None])
+            checkpoint.save()
+
+        checkpoint.save(completed=True)
+        stats["seconds"] = time.perf_counter() - start
+        logging.info(f"Loaded {stats['documents']} documents from {file_path} into {collection.name} in "
+                     f"{stats['seconds']:.2f}s ({stats['documents'] / max(stats['seconds'], 1e-9):.0f} docs/s), "
+                     f"{stats['duplicates']} already there")
+        return stats
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
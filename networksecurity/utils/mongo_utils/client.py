@@ -0,0 +1,196 @@
+import os
+import sys
+import time
+import threading
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+from networksecurity.constants.training_pipeline import (
+    MONGO_CLIENT_MAX_POOL_SIZE,
+    MONGO_CLIENT_MIN_POOL_SIZE,
+    MONGO_CLIENT_MAX_IDLE_TIME_MS,
+    MONGO_CLIENT_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_CLIENT_CONNECT_TIMEOUT_MS,
+    MONGO_CLIENT_SOCKET_TIMEOUT_MS
+)
+
+
+def uses_tls(mongo_db_url: str) -> bool:
+    ## srv urls (Atlas) default to tls, a CA file on a plain url would switch tls on and break it
+    url = (mongo_db_url or "").lower()
+    return url.startswith("mongodb+srv://") or "tls=true" in url or "ssl=true" in url
+
+
+class ConnectionPoolMetrics:
+    """Counters fed by a pymongo connection pool listener, to see how often connections are reused."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+
+
+    def increment(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+    def listener(self):
+        ## pymongo is only imported once a client is made, the api starts without it
+        from pymongo import monitoring
+
+        metrics = self
+
+        class _Listener(monitoring.ConnectionPoolListener):
+            def connection_created(self, event):
+                metrics.increment("connections_created")
+
+            def connection_closed(self, event):
+                metrics.increment("connections_closed")
+
+            def connection_checked_out(self, event):
+                metrics.increment("checkouts")
+
+            def connection_check_out_failed(self, event):
+                metrics.increment("checkout_failures")
+
+            def pool_created(self, event): pass
+            def pool_ready(self, event): pass
+            def pool_cleared(self, event): pass
+            def pool_closed(self, event): pass
+            def connection_ready(self, event): pass
+            def connection_check_out_started(self, event): pass
+            def connection_checked_in(self, event): pass
+
+        return _Listener()
+
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                ## share of checkouts served by a connection that was already open
+                "connection_reuse_ratio": (1 - self.connections_created / self.checkouts) if self.checkouts else None
+            }
+
+
+class MongoClientFactory:
+    """
+    One pooled MongoClient per process, shared by everything that talks to MongoDB.
+
+    The client is made on first use with connect=False, so creating the factory, or an api
+    that never touches the database, opens no connection. A forked child gets a client of
+    its own, pymongo clients must not be shared across fork.
+    """
+
+    def __init__(self, mongo_db_url: str = None, tls_ca_file: str = None,
+                 max_pool_size: int = MONGO_CLIENT_MAX_POOL_SIZE,
+                 min_pool_size: int = MONGO_CLIENT_MIN_POOL_SIZE,
+                 max_idle_time_ms: int = MONGO_CLIENT_MAX_IDLE_TIME_MS,
+                 server_selection_timeout_ms: int = MONGO_CLIENT_SERVER_SELECTION_TIMEOUT_MS,
+                 connect_timeout_ms: int = MONGO_CLIENT_CONNECT_TIMEOUT_MS,
+                 socket_timeout_ms: int = MONGO_CLIENT_SOCKET_TIMEOUT_MS):
+        self.mongo_db_url = mongo_db_url
+        self.tls_ca_file = tls_ca_file
+        self.client_options = {
+            "maxPoolSize": max_pool_size,
+            "minPoolSize": min_pool_size,
+            "maxIdleTimeMS": max_idle_time_ms,
+            "serverSelectionTimeoutMS": server_selection_timeout_ms,
+            "connectTimeoutMS": connect_timeout_ms,
+            "socketTimeoutMS": socket_timeout_ms
+        }
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        self.pool_metrics = ConnectionPoolMetrics()
+        self.clients_created = 0
+        self.client_requests = 0
+
+
+    def _make_client(self):
+        import pymongo
+
+        options = dict(self.client_options)
+        if uses_tls(self.mongo_db_url):
+            if self.tls_ca_file is None:
+                import certifi
+                self.tls_ca_file = certifi.where()
+            options["tlsCAFile"] = self.tls_ca_file
+
+        client = pymongo.MongoClient(self.mongo_db_url, connect=False,
+                                     event_listeners=[self.pool_metrics.listener()], **options)
+        self.clients_created += 1
+        logging.info(f"Created MongoDB client, pool of up to {options['maxPoolSize']} connections")
+        return client
+
+
+    def get_client(self):
+        try:
+            with self._lock:
+                self.client_requests += 1
+                if self._client is None or self._pid != os.getpid():
+                    self._client = self._make_client()
+                    self._pid = os.getpid()
+                return self._client
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def get_collection(self, database_name: str, collection_name: str):
+        return self.get_client()[database_name][collection_name]
+
+
+    def health_check(self) -> dict:
+        """Ping the server, connecting if nothing has yet. Never raises."""
+        start = time.perf_counter()
+        try:
+            self.get_client().admin.command("ping")
+            return {"status": "ok", "latency_ms": (time.perf_counter() - start) * 1000}
+
+        except Exception as e:
+            return {"status": "error", "latency_ms": (time.perf_counter() - start) * 1000, "error": str(e)}
+
+
+    def metrics(self) -> dict:
+        with self._lock:
+            connected = self._client is not None and self._pid == os.getpid()
+            metrics = {
+                "connected": connected,
+                "clients_created": self.clients_created,
+                "client_requests": self.client_requests
+            }
+        metrics.update(self.pool_metrics.as_dict())
+        return metrics
+
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+                logging.info("Closed MongoDB client")
+            self._client = None
+            self._pid = None
+
+
+_default_factory = None
+_default_factory_lock = threading.Lock()
+
+
+def get_mongo_client_factory() -> MongoClientFactory:
+    """The process wide factory for MONGO_DB_URL (and MONGO_TLS_CA_FILE when set)."""
+    global _default_factory
+    with _default_factory_lock:
+        if _default_factory is None:
+            _default_factory = MongoClientFactory(
+                mongo_db_url=os.getenv("MONGO_DB_URL"),
+                tls_ca_file=os.getenv("MONGO_TLS_CA_FILE")
+            )
+        return _default_factory
@@ -0,0 +1,248 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exception import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+
+def schema_column_dtypes(schema_config: dict) -> dict:
+    """Column name to numpy dtype, in schema order, from the columns list of schema.yaml."""
+    try:
+        column_dtypes = {}
+        for column in schema_config["columns"]:
+            for name, dtype in column.items():
+                column_dtypes[name] = np.dtype(dtype)
+        return column_dtypes
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+class ColumnArrays:
+    """
+    Preallocated typed arrays, one per column, filled chunk by chunk.
+    An integer column that receives a missing value is widened to float64 once.
+    """
+
+    def __init__(self, column_dtypes: dict, capacity: int):
+        try:
+            self.columns = list(column_dtypes)
+            self.arrays = {column: np.empty(max(capacity, 1), dtype=dtype) for column, dtype in column_dtypes.items()}
+            self.n_rows = 0
+            ## columns no document carried are left out of the frame, like pd.DataFrame(documents) does
+            self.seen_columns = set()
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self.arrays.values()))) if self.arrays else 0
+
+
+    def _grow(self, min_capacity: int):
+        capacity = max(min_capacity, 2 * self.capacity)
+        for column, array in self.arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.n_rows] = array[:self.n_rows]
+            self.arrays[column] = grown
+
+
+    def append(self, values: np.ndarray, seen_columns):
+        """Append a float64 (rows, columns) chunk, nan marks missing values."""
+        try:
+            n_rows = len(values)
+            if self.n_rows + n_rows > self.capacity:
+                self._grow(self.n_rows + n_rows)
+
+            for j, column in enumerate(self.columns):
+                array = self.arrays[column]
+                chunk = values[:, j]
+                if array.dtype.kind in "iub" and np.isnan(chunk).any():
+                    array = array.astype(np.float64)
+                    self.arrays[column] = array
+                array[self.n_rows:self.n_rows + n_rows] = chunk
+
+            self.n_rows += n_rows
+            self.seen_columns.update(seen_columns)
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def to_dataframe(self) -> pd.DataFrame:
+        try:
+            return pd.DataFrame(
+                {column: self.arrays[column][:self.n_rows] for column in self.columns if column in self.seen_columns},
+                copy=False
+            )
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+def documents_to_values(documents: list, columns: list, na_values: list) -> tuple:
+    """
+    Turn a chunk of documents into a float64 (rows, columns) array with nan for missing
+    values and na_values. Returns (values, seen_columns).
+    """
+    try:
+        getter = itemgetter(*columns)
+        try:
+            rows = [getter(document) for document in documents]
+            seen_columns = columns
+        except KeyError:
+            rows = [tuple(document.get(column) for column in columns) for document in documents]
+            seen_columns = [column for column in columns if any(column in document for document in documents)]
+
+        try:
+            ## None converts to nan on its own, only strings need the object path
+            values = np.array(rows, dtype=np.float64)
+        except (ValueError, TypeError):
+            values = np.array(rows, dtype=object)
+            for na_value in na_values:
+                values[values == na_value] = np.nan
+            values = values.astype(np.float64)
+        return values.reshape(len(documents), len(columns)), seen_columns
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def export_collection(collection, column_dtypes: dict, query: dict = None, batch_size: int = 2000,
+                      na_values: list = ("na",), expected_rows: int = None, sort: list = None) -> ColumnArrays:
+    """
+    Stream the documents matching query into ColumnArrays. At most one cursor batch of
+    documents is alive at a time, so memory beyond the result stays bounded by batch_size.
+    """
+    try:
+        columns = list(column_dtypes)
+        ## the documents hold the schema columns and _id, leaving out _id is enough
+        ## and spares the server from rebuilding every document
+        projection = {"_id": 0}
+
+        if expected_rows is None:
+            expected_rows = collection.estimated_document_count() if not query else batch_size
+        column_arrays = ColumnArrays(column_dtypes, expected_rows)
+
+        start = time.perf_counter()
+        cursor = collection.find(query or {}, projection, batch_size=batch_size)
+        if sort is not None:
+            cursor = cursor.sort(sort)
+        try:
+            while True:
+                documents = list(islice(cursor, batch_size))
+                if not documents:
+                    break
+                values, seen_columns = documents_to_values(documents, columns, na_values)
+                column_arrays.append(values, seen_columns)
+                ## let go of the batch before the next one is read, or two are alive at once
+                del documents, values
+        finally:
+            cursor.close()
+
+        seconds = time.perf_counter() - start
+        logging.info(f"Exported {column_arrays.n_rows} rows from {collection.name} in {seconds:.2f}s "
+                     f"({column_arrays.n_rows / max(seconds, 1e-9):.0f} rows/s)")
+        return column_arrays
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def concat_column_arrays(parts: list) -> ColumnArrays:
+    """
+    Join ColumnArrays in the given order. Parts are released column by column,
+    so only one column is held twice at any time.
+    """
+    try:
+        n_rows = sum(part.n_rows for part in parts)
+        column_arrays = ColumnArrays({column: parts[0].arrays[column].dtype for column in parts[0].columns}, 0)
+        for column in column_arrays.columns:
+            column_arrays.arrays[column] = np.concatenate([part.arrays[column][:part.n_rows] for part in parts])
+            for part in parts:
+                part.arrays[column] = None
+        column_arrays.n_rows = n_rows
+        column_arrays.seen_columns = set().union(*(part.seen_columns for part in parts))
+        return column_arrays
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def sample_id_boundaries(collection, n_partitions: int, query: dict = None, samples_per_partition: int = 64) -> list:
+    """
+    _id values splitting the documents matching query into n_partitions ranges of about equal
+    size, taken from the quantiles of a $sample of _id so nothing is skipped or counted.
+    """
+    try:
+        sample = sorted(document["_id"] for document in collection.aggregate([
+            {"$match": query or {}},
+            {"$sample": {"size": n_partitions * samples_per_partition}},
+            {"$project": {"_id": 1}}
+        ]))
+        boundaries = []
+        for i in range(1, n_partitions):
+            if sample:
+                boundary = sample[i * len(sample) // n_partitions]
+                if not boundaries or boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+        return boundaries
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def export_collection_partitioned(collection, column_dtypes: dict, n_partitions: int, batch_size: int = 2000,
+                                  na_values: list = ("na",), query: dict = None) -> ColumnArrays:
+    """
+    Export the documents matching query as _id ranges read at the same time, one thread and
+    one cursor per range over the collection's shared client. Ranges are read in _id order,
+    which the _id index gives for free, and joined in range order, so the result does not
+    depend on timing.
+    """
+    try:
+        total_rows = collection.count_documents(query) if query else collection.estimated_document_count()
+        if n_partitions < 2 or total_rows <= batch_size:
+            ## a whole collection is read in natural order, a range query walks the _id index anyway
+            return export_collection(collection, column_dtypes, query=query, batch_size=batch_size,
+                                     na_values=na_values, expected_rows=total_rows,
+                                     sort=[("_id", 1)] if query else None)
+
+        boundaries = sample_id_boundaries(collection, n_partitions, query)
+        bounds = [None] + boundaries + [None]
+        queries = []
+        for lower, upper in zip(bounds[:-1], bounds[1:]):
+            id_range = {}
+            if lower is not None:
+                id_range["$gte"] = lower
+            if upper is not None:
+                id_range["$lt"] = upper
+            range_query = {"_id": id_range} if id_range else {}
+            queries.append({"$and": [query, range_query]} if query else range_query)
+
+        expected_rows = -(-total_rows // len(queries))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            parts = list(executor.map(
+                lambda query: export_collection(collection, column_dtypes, query=query, batch_size=batch_size,
+                                                na_values=na_values, expected_rows=expected_rows,
+                                                sort=[("_id", 1)]),
+                queries
+            ))
+        column_arrays = concat_column_arrays(parts)
+
+        seconds = time.perf_counter() - start
+        logging.info(f"Exported {column_arrays.n_rows} rows from {collection.name} in {len(queries)} partitions "
+                     f"in {seconds:.2f}s ({column_arrays.n_rows / max(seconds, 1e-9):.0f} rows/s)")
+        return column_arrays
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -1,26 +1,24 @@
 import os
 import sys
-import certifi
 import pandas as pd
-import json
-import pymongo
 from networksecurity.exception.exception import NetworkSecurityException
 from networksecurity.logging.logger import logging
+from networksecurity.constants.training_pipeline import (
+    DATA_INGESTION_BULK_LOAD_CHUNK_SIZE,
+    DATA_INGESTION_BULK_LOAD_WORKERS,
+    DATA_INGESTION_BULK_LOAD_CHECKPOINT_DIR
+)
+from networksecurity.utils.mongo_utils.bulk_loader import bulk_load_csv
+from networksecurity.utils.mongo_utils.client import get_mongo_client_factory
 
 from dotenv import load_dotenv
 load_dotenv()
 
-MONGO_DB_URL = os.getenv("MONGO_DB_URL")
-print(MONGO_DB_URL)
-
-
-ca = certifi.where()
-
 
 class NetworkDataExtract():
     def __init__(self):
         try:
-            pass
+            self.mongo_client = get_mongo_client_factory().get_client()
 
         except Exception as e:
             raise NetworkSecurityException(e, sys)
@@ -28,9 +26,10 @@ class NetworkDataExtract():
     
     def csv_to_json_converter(self, file_path):
         try:
+            ## records straight from the frame, without serialising the whole file to json
             data = pd.read_csv(file_path)
-            data.reset_index(drop=True, inplace=True)
-            records = list(json.loads(data.T.to_json()).values())
+            data = data.astype(object).where(data.notna(), None)
+            records = data.to_dict(orient="records")
             return records
 
         except Exception as e:
@@ -43,29 +42,42 @@ class NetworkDataExtract():
             self.records = records
             self.collection = collection
 
-            self.mongo_client = pymongo.MongoClient(MONGO_DB_URL)
-
             self.database = self.mongo_client[self.database]
             self.collection = self.database[self.collection]
-            self.collection.insert_many(self.records)
+            self.collection.insert_many(self.records, ordered=False)
 
             return(len(self.records))
         
         except Exception as e:
             raise NetworkSecurityException(e, sys)
+
+
+    def bulk_load_mongodb(self, database, file_path, collection):
+        """Stream the csv into the collection in concurrent batches, resuming a load that failed part way."""
+        try:
+            checkpoint_file_path = os.path.join(
+                DATA_INGESTION_BULK_LOAD_CHECKPOINT_DIR, f"{database}.{collection}.{os.path.basename(file_path)}.yaml"
+            )
+            return bulk_load_csv(
+                collection=self.mongo_client[database][collection],
+                file_path=file_path,
+                checkpoint_file_path=checkpoint_file_path,
+                chunk_size=DATA_INGESTION_BULK_LOAD_CHUNK_SIZE,
+                max_workers=DATA_INGESTION_BULK_LOAD_WORKERS
+            )
+
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
         
 
 
 if __name__ == "__main__":
-    FILE_PATH = "Network_Data\phisingData.csv"
+    FILE_PATH = os.path.join("Network_Data", "phisingData.csv")
     DATABASE = "AmmarAI"
     Collection = "NetworkData"
     networkobj = NetworkDataExtract()
-    records = networkobj.csv_to_json_converter(file_path=FILE_PATH)
-    print(records)
-    no_of_records = networkobj.insert_data_mongodb(DATABASE, records, Collection)
-    print(no_of_records)
-
-
-
-
+    stats = networkobj.bulk_load_mongodb(DATABASE, FILE_PATH, Collection)
+    print(f"Inserted {stats['documents']} documents in {stats['seconds']:.2f}s "
+          f"({stats['documents'] / max(stats['seconds'], 1e-9):.0f} docs/s), "
+          f"{stats['duplicates']} were already there, {stats['skipped_chunks']} chunks done by an earlier run")
+    get_mongo_client_factory().close()